@@ -0,0 +1,699 @@
+"""Stand-in Jenkins server for benchmarking JAF without a real instance.
+
+Only the endpoints JAF talks to are emulated, with enough fidelity for the plugins to
+run their normal code paths. Response latency, the number of jobs, the folder layout
+and the size of build logs are configurable so that large instances can be simulated
+locally. Every request is timed so the harness can report server side latencies.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, unquote, urlparse
+
+FOLDER_CLASS = "com.cloudbees.hudson.plugins.folder.Folder"
+JOB_CLASS = "hudson.model.FreeStyleProject"
+BUILD_CLASS = "hudson.model.FreeStyleBuild"
+
+ROOT_PAGE = """<html><head><title>Dashboard [Jenkins]</title></head><body>
+<a href="/manage">Manage Jenkins</a>
+<a href="/view/all/newJob">New Item</a>
+<a href="/scriptler">Scriptler</a>
+</body></html>"""
+
+# Identifiers in the request path that are replaced to group requests per endpoint
+_NUMBER = re.compile(r"/\d+/")
+_JOB = re.compile(r"/job/[^/]+")
+
+
+def endpoint_name(method, path):
+    """Collapse a request path into an endpoint name, e.g. ``GET /job/*/N/consoleText``"""
+
+    path = urlparse(path).path
+    path = _NUMBER.sub("/N/", _JOB.sub("/job/*", path))
+    path = re.sub(r"(/job/\*)+", "/job/*", path)
+    path = re.sub(r"^/computer/(?!api/)[^/]+/", "/computer/*/", path)
+
+    return "%s %s" % (method, path)
+
+
+class MockJenkinsConfig(object):
+    """Shape of the emulated instance.
+
+    Every folder holds ``jobs`` jobs and, above ``folder_depth``, ``folders``
+    sub-folders, so the instance holds ``jobs * (1 + folders + ... + folders^depth)``
+    jobs in total.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jobs=100,
+        folders=0,
+        folder_depth=0,
+        builds=5,
+        log_size=64 * 1024,
+        nodes=5,
+        max_form_size=200000,
+        queue_seconds=0.0,
+        build_seconds=0.0,
+    ):
+        self.latency = latency
+        self.jobs = jobs
+        self.folders = folders
+        self.folder_depth = folder_depth
+        self.builds = builds
+        self.log_size = log_size
+        self.nodes = nodes
+        self.max_form_size = max_form_size
+        self.queue_seconds = queue_seconds
+        self.build_seconds = build_seconds
+
+
+class _Folder(object):
+    def __init__(self, path, config, level):
+        self.path = path
+        self.jobs = ["job%d" % i for i in range(config.jobs)]
+        self.folders = {}
+
+        if level < config.folder_depth:
+            for i in range(config.folders):
+                name = "folder%d" % i
+                self.folders[name] = _Folder(path + [name], config, level + 1)
+
+    def count_jobs(self):
+        return len(self.jobs) + sum(folder.count_jobs() for folder in self.folders.values())
+
+
+class MockJenkinsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    server_version = "Jetty(9.4.z-SNAPSHOT)"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type="application/json;charset=utf-8", code=200, headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Jenkins", "2.263.4")
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        self.end_headers()
+
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+        self._bytes_sent = len(body)
+
+    def _send_json(self, data):
+        self._send(json.dumps(data))
+
+    def _not_found(self):
+        self._send("<html><body>Not Found</body></html>", "text/html;charset=utf-8", 404)
+
+    def _timed(self, handler):
+        start = time.perf_counter()
+        self._bytes_sent = 0
+
+        if self.server.config.latency:
+            time.sleep(self.server.config.latency)
+
+        try:
+            handler()
+        finally:
+            self.server.record(
+                endpoint_name(self.command, self.path),
+                time.perf_counter() - start,
+                self._bytes_sent,
+            )
+
+    def do_GET(self):
+        self._timed(self._handle_get)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.request_body = self.rfile.read(length)
+
+        self._timed(self._handle_post)
+
+    def _split_job_path(self, path):
+        """Split ``/job/a/job/b/rest`` into ``(["a", "b"], "rest")``"""
+
+        names = []
+        parts = path.strip("/").split("/")
+
+        while len(parts) >= 2 and parts[0] == "job":
+            names.append(unquote(parts[1]))
+            parts = parts[2:]
+
+        return names, "/".join(parts)
+
+    def _handle_get(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+
+        if path == "/":
+            return self._send(ROOT_PAGE, "text/html;charset=utf-8")
+        elif path == "/crumbIssuer/api/json":
+            return self._send_json(
+                {
+                    "_class": "hudson.security.csrf.DefaultCrumbIssuer",
+                    "crumb": "0123456789abcdef",
+                    "crumbRequestField": "Jenkins-Crumb",
+                }
+            )
+        elif path == "/whoAmI/api/json":
+            return self._send_json(
+                {
+                    "_class": "hudson.security.WhoAmI",
+                    "anonymous": False,
+                    "authenticated": True,
+                    "authorities": ["authenticated"],
+                    "name": "benchmark",
+                }
+            )
+        elif path == "/script":
+            return self._send("<html><body>Script Console</body></html>", "text/html")
+        elif path == "/computer/api/json":
+            return self._send_json({"computer": self.server.node_list()})
+        elif path == "/computer/":
+            return self._send(self.server.node_page(), "text/html;charset=utf-8")
+        elif path.startswith("/computer/") and path.endswith("/api/json"):
+            return self._send_json({"displayName": path.split("/")[2], "offline": False})
+
+        match = re.match(r"^/queue/item/(\d+)/api/json$", path)
+
+        if match:
+            item = self.server.queue_item(int(match.group(1)))
+
+            return self._send_json(item) if item is not None else self._not_found()
+
+        names, rest = self._split_job_path(path)
+        tree = query.get("tree", [None])[0]
+
+        if rest == "api/json":
+            return self._item_info(names, tree)
+
+        match = re.match(r"^(\d+|lastBuild)/(consoleText|logText/progressiveText|api/json)$", rest)
+
+        if not names or not match or not self.server.job_exists(names):
+            return self._not_found()
+
+        if match.group(2) == "consoleText":
+            return self._send(self.server.log, "text/plain;charset=UTF-8")
+        elif match.group(2) == "api/json":
+            return self._send_json(self.server.build(names, match.group(1)))
+
+        start = int(query.get("start", ["0"])[0])
+        log, building = self.server.build_log(names, match.group(1))
+
+        return self._send(
+            log[start:],
+            "text/plain;charset=UTF-8",
+            headers={"X-Text-Size": str(len(log)), "X-More-Data": str(building).lower()},
+        )
+
+    def _item_info(self, names, tree):
+        folder = self.server.folder(names)
+
+        if folder is not None:
+            return self._send_json(
+                {"_class": FOLDER_CLASS, "jobs": self.server.render_jobs(folder, tree)}
+            )
+        elif self.server.job_exists(names):
+            return self._send_json(self.server.job(names, tree))
+
+        return self._not_found()
+
+    def _handle_post(self):
+        path = urlparse(self.path).path
+
+        if len(self.request_body) > self.server.config.max_form_size:
+            # Jetty rejects form submissions above its maxFormContentSize
+            return self._send("Form too large", "text/html;charset=utf-8", 400)
+
+        if path == "/scriptText" or re.match(r"^/computer/[^/]+/scriptText$", path):
+            form = parse_qs(self.request_body.decode("utf-8"))
+            output = self.server.run_script(form.get("script", [""])[0])
+
+            return self._send(output, "text/plain;charset=UTF-8")
+
+        names, rest = self._split_job_path(path)
+
+        if rest == "createItem":
+            folder = self.server.folder(names)
+            name = parse_qs(urlparse(self.path).query).get("name", [""])[0]
+
+            if folder is None or not name:
+                return self._not_found()
+
+            if name not in folder.jobs:
+                folder.jobs.append(name)
+
+            return self._send("")
+        elif rest in ("build", "buildWithParameters"):
+            number = self.server.trigger_build(names)
+
+            return self._send(
+                "", code=201, headers={"Location": "%squeue/item/%d/" % (self.server.url, number)}
+            )
+        elif rest in ("doDelete", "disable", "config.xml") or re.match(
+            r"^\d+/(doDelete|stop)$", rest
+        ):
+            return self._send("")
+
+        self._not_found()
+
+
+class MockJenkins(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server emulating a Jenkins instance described by a :class:`MockJenkinsConfig`"""
+
+    daemon_threads = True
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), MockJenkinsHandler)
+
+        self.config = config or MockJenkinsConfig()
+        self.url = "http://%s:%d/" % self.server_address[:2]
+        self.root = _Folder([], self.config, 0)
+
+        line = b"[Pipeline] echo benchmark console output line\n"
+        self.log = (line * (self.config.log_size // len(line) + 1))[: self.config.log_size]
+
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+        # Triggered builds: [(job names, build number, time triggered)], the queue item
+        # number is the index plus one
+        self.triggered = []
+        self._triggered_lock = threading.Lock()
+
+        # Files written by emulated UploadFile scripts: {path: bytes}
+        self.files = {}
+        self._files_lock = threading.Lock()
+        self.reset_stats()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, _type, value, traceback):
+        self.stop()
+
+    def record(self, endpoint, duration, size):
+        with self._stats_lock:
+            self.requests.append((endpoint, duration, size))
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.requests = []
+
+    def stats(self):
+        """Return a copy of the recorded ``(endpoint, seconds, bytes)`` tuples"""
+
+        with self._stats_lock:
+            return list(self.requests)
+
+    def run_script(self, script):
+        """Emulate the UploadFile and build deletion scripts, every other script prints nothing"""
+
+        match = re.match(
+            r"def part = new File\('(.*?)'\)\s*"
+            r"part.bytes = (new java.util.zip.InflaterInputStream)?.*?\[(.*?)\]",
+            script,
+            re.S,
+        )
+
+        if match:
+            data = base64.b64decode("".join(re.findall(r"'([^']*)'", match.group(3))))
+
+            if match.group(2):
+                data = zlib.decompress(data)
+
+            with self._files_lock:
+                self.files[match.group(1)] = data
+
+            return "%d\n" % len(data)
+
+        match = re.search(r"println '(JAF-BATCH-\w+) begin '", script)
+
+        if match:
+            # Batched scripts run instantly and print nothing
+            items = re.search(r"^def items = \[(.*)\]$", script, re.M).group(1)
+
+            return "".join(
+                "%s begin %d\n\n%s end %d ok 0\n" % (match.group(1), i, match.group(1), i)
+                for i in range(len(re.findall(r"\[[^\]]*\]", items)))
+            )
+
+        match = re.search(r"getItemByFullName\('(.*?)'\)[\s\S]*build\.delete\(\)", script)
+
+        if match:
+            names = match.group(1).replace("\\'", "'").replace("\\\\", "\\").split("/")
+
+            if not self.job_exists(names):
+                return "missing\n"
+
+            return "total %d\ndeleted %d failed 0\n" % (self.config.builds, self.config.builds)
+
+        match = re.match(r"def target = new File\('(.*?)'\)", script)
+
+        if not match:
+            return ""
+
+        target = match.group(1)
+        prefix = target + ".jafpart."
+
+        with self._files_lock:
+            parts = sorted(name for name in self.files if name.startswith(prefix))
+
+            if "println 'part '" in script:
+                output = ""
+
+                if target in self.files:
+                    output += "target %d" % len(self.files[target])
+                    hash_from = int(re.search(r"if \((-?\d+)L >= 0", script).group(1))
+
+                    if 0 <= hash_from <= len(self.files[target]):
+                        output += " " + hashlib.sha256(self.files[target][hash_from:]).hexdigest()
+
+                    output += "\n"
+
+                for name in parts:
+                    output += "part %s %d %s\n" % (
+                        name[len(prefix) :],
+                        len(self.files[name]),
+                        hashlib.sha256(self.files[name]).hexdigest(),
+                    )
+
+                return output
+            elif "for (offset in" in script:
+                for offset in re.findall(r"'(\d+)'", script):
+                    self.files.pop(prefix + offset, None)
+
+                return ""
+
+            data = b"".join(self.files.pop(name) for name in parts)
+
+            if "MessageDigest" not in script:
+                return ""
+
+            self.files[target] = self.files.get(target, b"") + data
+
+        return "sha256:%s\n" % hashlib.sha256(data).hexdigest()
+
+    def folder(self, names):
+        folder = self.root
+
+        for name in names:
+            folder = folder.folders.get(name)
+
+            if folder is None:
+                return None
+
+        return folder
+
+    def job_exists(self, names):
+        if not names:
+            return False
+
+        folder = self.folder(names[:-1])
+
+        return folder is not None and names[-1] in folder.jobs
+
+    def _item_url(self, names):
+        return self.url + "".join("job/%s/" % name for name in names)
+
+    def trigger_build(self, names):
+        """Queue a build of the job, return the queue item number"""
+
+        with self._triggered_lock:
+            number = self.config.builds + 1 + sum(1 for job, _, _ in self.triggered if job == names)
+            self.triggered.append((names, number, time.monotonic()))
+
+            return len(self.triggered)
+
+    def queue_item(self, number):
+        if not 0 < number <= len(self.triggered):
+            return None
+
+        names, build_number, triggered = self.triggered[number - 1]
+        item = {"_class": "hudson.model.Queue$WaitingItem", "cancelled": False, "why": None}
+
+        if time.monotonic() - triggered < self.config.queue_seconds:
+            item["why"] = "Waiting for next available executor"
+        else:
+            item["_class"] = "hudson.model.Queue$LeftItem"
+            item["executable"] = {
+                "_class": BUILD_CLASS,
+                "number": build_number,
+                "url": "%s%d/" % (self._item_url(names), build_number),
+            }
+
+        return item
+
+    def _build_progress(self, names, number):
+        """Fraction of a triggered build that has run, None if it is not a triggered build"""
+
+        for job, build_number, triggered in self.triggered:
+            if job == names and build_number == number:
+                elapsed = time.monotonic() - triggered - self.config.queue_seconds
+
+                if elapsed < 0:
+                    return None
+
+                return min(
+                    1.0, elapsed / self.config.build_seconds if self.config.build_seconds else 1.0
+                )
+
+        return None
+
+    def build_log(self, names, number):
+        """Return the log written so far and whether the build is still running"""
+
+        number = self.config.builds if number == "lastBuild" else int(number)
+        progress = self._build_progress(names, number)
+
+        if progress is None or progress >= 1.0:
+            return self.log, False
+
+        return self.log[: int(len(self.log) * progress)], True
+
+    def build(self, names, number):
+        if number == "lastBuild":
+            number = len([job for job, _, _ in self.triggered if job == names]) + self.config.builds
+
+        progress = self._build_progress(names, int(number))
+        building = progress is not None and progress < 1.0
+
+        return {
+            "_class": BUILD_CLASS,
+            "number": int(number),
+            "id": str(number),
+            "result": None if building else "SUCCESS",
+            "building": building,
+            "url": "%s%s/" % (self._item_url(names), number),
+        }
+
+    def job(self, names, tree=None):
+        job = {
+            "_class": JOB_CLASS,
+            "name": names[-1],
+            "url": self._item_url(names),
+            "color": "blue",
+        }
+
+        if not tree or "lastBuild" in tree:
+            job["lastBuild"] = self.build(names, "lastBuild") if self.config.builds else None
+
+        if tree and "allBuilds" in tree:
+            job["allBuilds"] = [
+                {"_class": BUILD_CLASS, "number": number}
+                for number in range(self.config.builds, 0, -1)
+            ]
+        elif not tree or "builds" in tree:
+            limit = self.config.builds
+            match = re.search(r"builds\[[^\]]*\]\{0,(\d+)\}", tree or "")
+
+            if match:
+                limit = min(limit, int(match.group(1)))
+
+            job["builds"] = [
+                self.build(names, number)
+                for number in range(self.config.builds, self.config.builds - limit, -1)
+            ]
+
+        return job
+
+    def render_jobs(self, folder, tree):
+        """Render the children of ``folder`` for a ``tree=jobs[...,jobs[...]]`` query.
+
+        Folders nested deeper than the query asks for are rendered as objects holding
+        only ``_class``, just like Jenkins does.
+        """
+
+        tree = tree or "jobs"
+
+        return self._render_jobs(folder, tree, tree.count("jobs["))
+
+    def _render_jobs(self, folder, tree, levels):
+        if levels <= 0:
+            return [{"_class": JOB_CLASS} for _ in folder.jobs] + [
+                {"_class": FOLDER_CLASS} for _ in folder.folders
+            ]
+
+        jobs = [self.job(folder.path + [name], tree) for name in folder.jobs]
+
+        for name, child in folder.folders.items():
+            jobs.append(
+                {
+                    "_class": FOLDER_CLASS,
+                    "name": name,
+                    "url": self._item_url(child.path),
+                    "jobs": self._render_jobs(child, tree, levels - 1),
+                }
+            )
+
+        return jobs
+
+    def node_list(self):
+        return [
+            {"displayName": "master" if i == 0 else "agent%d" % i, "offline": False}
+            for i in range(self.config.nodes)
+        ]
+
+    def node_page(self):
+        rows = "".join(
+            '<tr id="node_%s"><td></td><td>%s</td><td>Linux (amd64)</td></tr>'
+            % (node["displayName"], node["displayName"])
+            for node in self.node_list()
+        )
+
+        return "<html><body><table>%s</table></body></html>" % rows
+
+
+def add_config_arguments(parser):
+    """Add the :class:`MockJenkinsConfig` options to an ``argparse`` parser"""
+
+    defaults = MockJenkinsConfig()
+
+    parser.add_argument(
+        "--latency",
+        metavar="<Milliseconds>",
+        help="Delay added to every response. Defaults to: 0",
+        type=float,
+        default=defaults.latency * 1000,
+    )
+    parser.add_argument(
+        "--jobs",
+        metavar="<Number>",
+        help="Jobs per folder. Defaults to: %d" % defaults.jobs,
+        type=int,
+        default=defaults.jobs,
+    )
+    parser.add_argument(
+        "--folders",
+        metavar="<Number>",
+        help="Sub-folders per folder. Defaults to: %d" % defaults.folders,
+        type=int,
+        default=defaults.folders,
+    )
+    parser.add_argument(
+        "--folder-depth",
+        metavar="<Number>",
+        help="Levels of nested folders. Defaults to: %d" % defaults.folder_depth,
+        type=int,
+        default=defaults.folder_depth,
+    )
+    parser.add_argument(
+        "--builds",
+        metavar="<Number>",
+        help="Builds per job. Defaults to: %d" % defaults.builds,
+        type=int,
+        default=defaults.builds,
+    )
+    parser.add_argument(
+        "--log-size",
+        metavar="<Bytes>",
+        help="Size of every build log. Defaults to: %d" % defaults.log_size,
+        type=int,
+        default=defaults.log_size,
+    )
+    parser.add_argument(
+        "--queue-seconds",
+        metavar="<Seconds>",
+        help="Time a triggered build waits in the queue. Defaults to: %g" % defaults.queue_seconds,
+        type=float,
+        default=defaults.queue_seconds,
+    )
+    parser.add_argument(
+        "--build-seconds",
+        metavar="<Seconds>",
+        help="Time a triggered build runs. Defaults to: %g" % defaults.build_seconds,
+        type=float,
+        default=defaults.build_seconds,
+    )
+    parser.add_argument(
+        "--max-form-size",
+        metavar="<Bytes>",
+        help="Largest accepted POST body. Defaults to: %d" % defaults.max_form_size,
+        type=int,
+        default=defaults.max_form_size,
+    )
+
+
+def config_from_args(args):
+    return MockJenkinsConfig(
+        latency=args.latency / 1000.0,
+        jobs=args.jobs,
+        folders=args.folders,
+        folder_depth=args.folder_depth,
+        builds=args.builds,
+        log_size=args.log_size,
+        max_form_size=args.max_form_size,
+        queue_seconds=args.queue_seconds,
+        build_seconds=args.build_seconds,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Jenkins server for benchmarks")
+    parser.add_argument("--port", metavar="<Port>", type=int, default=8080)
+    add_config_arguments(parser)
+
+    args = parser.parse_args()
+
+    server = MockJenkins(config_from_args(args), port=args.port)
+    print("Serving %d jobs at %s" % (server.root.count_jobs(), server.url))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
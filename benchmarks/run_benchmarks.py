@@ -0,0 +1,246 @@
+"""Run JAF plugins against a local :class:`~benchmarks.mock_jenkins.MockJenkins` and report performance.
+
+Every scenario runs ``jaf.py`` in a fresh interpreter exactly as a user would, so CLI
+startup, argument parsing and plugin import time are part of the measurement. For each
+run the harness reports the number of requests the server received, requests per
+second over the wall clock time, server side p50/p99 latency and the peak RSS of the
+JAF process.
+
+Usage::
+
+    python -m benchmarks.run_benchmarks --latency 20 --jobs 500 ListJobs ConsoleOutput
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .mock_jenkins import MockJenkins, add_config_arguments, config_from_args
+
+JAF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jaf.py")
+
+
+def _list_jobs(url, args, workdir):
+    return ["ListJobs", "-s", url]
+
+
+def _console_output(url, args, workdir):
+    return ["ConsoleOutput", "-s", url, "-t", str(args.threads)]
+
+
+def _access_check(url, args, workdir):
+    credential_file = os.path.join(workdir, "credentials.txt")
+
+    with open(credential_file, "w") as f:
+        for i in range(args.credentials):
+            f.write("user%d:password%d\n" % (i, i))
+
+    return ["AccessCheck", "-s", url, "-t", str(args.threads), "-c", credential_file]
+
+
+def _upload_file(url, args, workdir):
+    upload_file = os.path.join(workdir, "upload.bin")
+
+    with open(upload_file, "wb") as f:
+        f.write(os.urandom(args.upload_size))
+
+    return ["UploadFile", "-s", url, "-a", "user:password", upload_file, "/tmp/upload.bin"]
+
+
+SCENARIOS = {
+    "ListJobs": _list_jobs,
+    "ConsoleOutput": _console_output,
+    "AccessCheck": _access_check,
+    "UploadFile": _upload_file,
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list, None if it is empty"""
+
+    if not values:
+        return None
+
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def _run_jaf(argv):
+    """Run jaf.py and return ``(exit code, wall seconds, peak RSS bytes or None, stderr)``"""
+
+    start = time.perf_counter()
+
+    process = subprocess.Popen(
+        [sys.executable, JAF] + argv,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+    # Drain stderr before waiting so a chatty run cannot block on a full pipe
+    stderr = process.stderr.read()
+
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    else:
+        process.wait()
+        peak_rss = None
+
+    process.stderr.close()
+
+    return (
+        process.returncode,
+        time.perf_counter() - start,
+        peak_rss,
+        stderr.decode(errors="replace"),
+    )
+
+
+def run_scenario(name, server, args):
+    """Run one scenario ``args.repeat`` times and return a result ``dict`` for the fastest run"""
+
+    best = None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        argv = SCENARIOS[name](server.url, args, workdir) + ["-n", str(args.timeout)]
+
+        for _ in range(args.repeat):
+            server.reset_stats()
+
+            returncode, wall, peak_rss, stderr = _run_jaf(argv)
+            requests = server.stats()
+
+            if returncode != 0:
+                raise RuntimeError("%s exited with %d:\n%s" % (name, returncode, stderr))
+
+            latencies = [duration for _, duration, _ in requests]
+            endpoints = {}
+
+            for endpoint, _, _ in requests:
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + 1
+
+            result = {
+                "scenario": name,
+                "requests": len(requests),
+                "bytes": sum(size for _, _, size in requests),
+                "wall_seconds": wall,
+                "requests_per_second": len(requests) / wall if wall else 0.0,
+                "p50_ms": (percentile(latencies, 0.50) or 0.0) * 1000,
+                "p99_ms": (percentile(latencies, 0.99) or 0.0) * 1000,
+                "peak_rss_bytes": peak_rss,
+                "endpoints": endpoints,
+            }
+
+            if best is None or result["wall_seconds"] < best["wall_seconds"]:
+                best = result
+
+    return best
+
+
+def print_report(results, file=sys.stdout):
+    print(
+        "%-14s %9s %10s %10s %9s %9s %10s"
+        % ("Scenario", "Requests", "Wall (s)", "Req/s", "p50 (ms)", "p99 (ms)", "RSS (MB)"),
+        file=file,
+    )
+
+    for result in results:
+        rss = result["peak_rss_bytes"]
+
+        print(
+            "%-14s %9d %10.2f %10.1f %9.2f %9.2f %10s"
+            % (
+                result["scenario"],
+                result["requests"],
+                result["wall_seconds"],
+                result["requests_per_second"],
+                result["p50_ms"],
+                result["p99_ms"],
+                "%.1f" % (rss / (1024.0 * 1024.0)) if rss else "n/a",
+            ),
+            file=file,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark JAF plugins against a local stand-in Jenkins server"
+    )
+    parser.add_argument(
+        "scenarios",
+        metavar="<Scenario>",
+        nargs="*",
+        help="Scenarios to run (default: all): " + " ".join(SCENARIOS),
+    )
+    add_config_arguments(parser)
+    parser.add_argument(
+        "--threads",
+        metavar="<Threads>",
+        help="Value passed to -t for threaded plugins. Defaults to: 4",
+        type=int,
+        default=4,
+    )
+    parser.add_argument(
+        "--credentials",
+        metavar="<Number>",
+        help="Credentials checked by AccessCheck. Defaults to: 10",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--upload-size",
+        metavar="<Bytes>",
+        help="Size of the file sent by UploadFile. Defaults to: 1048576",
+        type=int,
+        default=1024 * 1024,
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="<Seconds>",
+        help="Value passed to -n. Defaults to: 30",
+        type=int,
+        default=30,
+    )
+    parser.add_argument(
+        "--repeat",
+        metavar="<Number>",
+        help="Runs per scenario, the fastest is reported. Defaults to: 1",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--json",
+        metavar="<File>",
+        help="Also write the results as JSON, e.g. to compare against a baseline",
+        dest="json_file",
+    )
+
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+
+    if unknown:
+        parser.error("Unknown scenario(s): %s" % " ".join(unknown))
+
+    results = []
+
+    with MockJenkins(config_from_args(args)) as server:
+        for name in args.scenarios or list(SCENARIOS):
+            results.append(run_scenario(name, server, args))
+
+    print_report(results)
+
+    if args.json_file:
+        with open(args.json_file, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure how long ``jaf.py`` takes to start, parse its arguments and exit.
+
+Each invocation runs several times in a fresh interpreter and the minimum and median
+wall clock times are reported, along with the slowest imports of the first invocation
+(from ``python -X importtime``) to show where startup time goes.
+
+Usage::
+
+    python -m benchmarks.startup --runs 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .mock_jenkins import MockJenkins, MockJenkinsConfig
+
+JAF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jaf.py")
+
+
+def invocations(url):
+    """Command lines to time: help output only, and a real run of the cheapest plugin"""
+
+    return [
+        [],
+        ["ListJobs", "-h"],
+        ["ConsoleOutput", "-h"],
+        ["ListJobs", "-s", url],
+    ]
+
+
+def time_invocation(argv, runs):
+    timings = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.call(
+            [sys.executable, JAF] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), statistics.median(timings)
+
+
+def slowest_imports(argv, count):
+    """Return ``(cumulative microseconds, module)`` of the slowest top-level imports"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", JAF] + argv,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    imports = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, module = line[len("import time:") :].split("|")
+
+        # Only count imports made directly by JAF, nested ones are part of their parent
+        if cumulative.strip().isdigit() and module.startswith(" ") and not module.startswith("  "):
+            imports.append((int(cumulative), module.strip()))
+
+    return sorted(imports, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure JAF command line startup time")
+    parser.add_argument(
+        "--runs",
+        metavar="<Number>",
+        help="Runs per invocation. Defaults to: 10",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--imports",
+        metavar="<Number>",
+        help="Number of slowest imports to list per invocation. Defaults to: 5",
+        type=int,
+        default=5,
+    )
+
+    args = parser.parse_args(argv)
+
+    with MockJenkins(MockJenkinsConfig(jobs=10)) as server:
+        print("%-50s %10s %10s" % ("Invocation", "Min (ms)", "Median (ms)"))
+
+        for invocation in invocations(server.url):
+            minimum, median = time_invocation(invocation, args.runs)
+            print(
+                "%-50s %10.1f %10.1f"
+                % (" ".join(["jaf.py"] + invocation), minimum * 1000, median * 1000)
+            )
+
+            for cumulative, module in slowest_imports(invocation, args.imports):
+                print("    %-46s %10.1f" % ("import " + module, cumulative / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
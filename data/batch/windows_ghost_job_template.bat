@@ -16,6 +16,8 @@ DEL /Q "@{helper_file_name}.b64" >NUL 2>NUL
 
 @{helper_file_name} @!{executor}@{file_name}@!{additional_args}
 
+ECHO @{ready_marker}
+
 timeout 5 >nul
 
 DEL /Q "@{helper_file_name}" >NUL 2>NUL
@@ -0,0 +1,26 @@
+import org.codehaus.groovy.control.CompilerConfiguration
+import org.codehaus.groovy.control.customizers.ImportCustomizer
+
+def imports = new ImportCustomizer()
+imports.addStarImports('jenkins', 'jenkins.model', 'hudson', 'hudson.model')
+def configuration = new CompilerConfiguration()
+configuration.addCompilationCustomizers(imports)
+
+def items = [@{items}]
+
+items.eachWithIndex { item, index ->
+    println '@{marker} begin ' + index
+    def status = 'ok'
+    def start = System.nanoTime()
+
+    try {
+        def shell = new GroovyShell(this.class.classLoader, new Binding(out: out), configuration)
+        shell.evaluate(new String(item.join('').decodeBase64(), 'UTF-8'))
+    } catch (Throwable e) {
+        status = 'error'
+        println e
+    }
+
+    println ''
+    println '@{marker} end ' + index + ' ' + status + ' ' + (System.nanoTime() - start)
+}
@@ -0,0 +1,22 @@
+def job = jenkins.model.Jenkins.instance.getItemByFullName('@{job_name}')
+
+if (job == null) {
+    println "missing"
+    return
+}
+
+def builds = new ArrayList(job.builds)
+def failed = 0
+
+println "total ${builds.size()}"
+
+for (build in builds) {
+    try {
+        build.delete()
+    } catch (Exception ex) {
+        failed++
+        println "failed ${build.number} ${String.valueOf(ex.message).replaceAll('[\\r\\n]+', ' ')}"
+    }
+}
+
+println "deleted ${builds.size() - failed} failed ${failed}"
@@ -0,0 +1,25 @@
+def target = new File('@{target}')
+def prefix = target.name + '.jafpart.'
+def parts = (target.absoluteFile.parentFile.listFiles() ?: []).findAll { it.name.startsWith(prefix) }.sort { it.name }
+def size = parts.sum(0L) { it.length() }
+
+if (parts.size() != @{count} || size != @{length}L) {
+    println 'Expected @{count} parts holding @{length} bytes, found ' + parts.size() + ' parts holding ' + size + ' bytes'
+    return
+}
+
+def digest = java.security.MessageDigest.getInstance('SHA-256')
+def out = new FileOutputStream(target, true)
+
+try {
+    for (part in parts) {
+        def bytes = part.bytes
+        digest.update(bytes)
+        out.write(bytes)
+    }
+} finally {
+    out.close()
+}
+
+parts.each { it.delete() }
+println 'sha256:' + digest.digest().encodeHex()
@@ -0,0 +1,7 @@
+def part = new File('@{part}')
+#if(@{compressed})
+part.bytes = new java.util.zip.InflaterInputStream(new ByteArrayInputStream([@{data}].join('').decodeBase64())).bytes
+#else
+part.bytes = [@{data}].join('').decodeBase64()
+#end
+println part.length()
@@ -0,0 +1,3 @@
+def target = new File('@{target}')
+def prefix = target.name + '.jafpart.'
+(target.absoluteFile.parentFile.listFiles() ?: []).findAll { it.name.startsWith(prefix) }.each { it.delete() }
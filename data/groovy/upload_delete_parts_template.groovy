@@ -0,0 +1,5 @@
+def target = new File('@{target}')
+
+for (offset in [@{offsets}]) {
+    new File(target.path + '.jafpart.' + offset).delete()
+}
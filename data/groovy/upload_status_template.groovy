@@ -0,0 +1,27 @@
+def target = new File('@{target}')
+def prefix = target.name + '.jafpart.'
+
+if (target.exists()) {
+    def hash = ''
+
+    if (@{hash_from}L >= 0 && target.length() >= @{hash_from}L) {
+        def digest = java.security.MessageDigest.getInstance('SHA-256')
+        def buffer = new byte[65536]
+
+        target.withInputStream { input ->
+            input.skip(@{hash_from}L)
+            for (int n = input.read(buffer); n > 0; n = input.read(buffer)) {
+                digest.update(buffer, 0, n)
+            }
+        }
+
+        hash = ' ' + digest.digest().encodeHex()
+    }
+
+    println 'target ' + target.length() + hash
+}
+
+(target.absoluteFile.parentFile.listFiles() ?: []).findAll { it.name.startsWith(prefix) }.sort { it.name }.each {
+    def digest = java.security.MessageDigest.getInstance('SHA-256').digest(it.bytes).encodeHex()
+    println 'part ' + it.name.substring(prefix.length()) + ' ' + it.length() + ' ' + digest
+}
@@ -3,6 +3,7 @@ import base64
 import inspect
 import os
 import signal
+import sys
 import time
 import zlib
 
@@ -22,5 +23,9 @@ def handler(*ignored):
 
 signal.signal(signal.SIGTERM, handler)
 
+# Tells JAF the handler is in place, so the build can be stopped
+sys.stdout.write("@{ready_marker}\n")
+sys.stdout.flush()
+
 while True:
     time.sleep(100000)
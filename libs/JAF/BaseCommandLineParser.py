@@ -13,13 +13,26 @@ class BaseCommandLineParser:
     THREADNUMBER = 4
     TIMEOUT = 30
 
+    # Subcommand names, if not every plugin parser is mixed in (see libs.JAF.JAF)
+    _available_commands = None
+
+    # Argument values to parse instead of sys.argv (see libs.JAF.run_plugin)
+    _options = None
+
     def parse(self):
         """Top-level method to handle argument parsing and return parsed, sanity checked arguments"""
 
+        return getattr(self, "cmd_" + self.parse_command())()
+
+    def parse_command(self):
+        """Parse and return the subcommand name, showing help and exiting if none was given"""
+
         self.parser = ArgumentParser(formatter_class=Formatter, description=self._description)
 
         # Dynamically derive sub commands:
-        choices = [name[4:] for name in dir(self) if name.startswith("cmd_")]
+        choices = self._available_commands or [
+            name[4:] for name in dir(self) if name.startswith("cmd_")
+        ]
 
         self.parser.add_argument(
             dest="command",
@@ -39,12 +52,14 @@ class BaseCommandLineParser:
             # Ensure user gets full help if they don't specify subcommand args
             sys.argv.append("-h")
 
-        return getattr(self, "cmd_" + args.command)()
+        return args.command
 
     def _create_contextual_parser(self, cmd, description):
         """Creates context-specific argparse parser after subcommand is choosen"""
 
-        self.parser = ArgumentParser(description=self._description, formatter_class=Formatter)
+        self.parser = ArgumentParser(
+            description=self._description, formatter_class=Formatter, options=self._options
+        )
         self.parser.add_argument(dest="subcommand", metavar=cmd, help=description, action="store")
 
         return self.parser
@@ -89,12 +104,49 @@ class BaseCommandLineParser:
             "-o",
             "--output",
             metavar="Output File",
-            help="Write Output to File",
+            help="Write Output to File, gzip compressed if the name ends in .gz",
             action="store",
             dest="output_file",
             required=False,
         )
 
+        self.parser.add_argument(
+            "--cache-dir",
+            metavar="<Directory>",
+            help="Cache GET responses on disk and revalidate them on later runs",
+            action="store",
+            dest="cache_dir",
+            required=False,
+        )
+
+        self.parser.add_argument(
+            "--cache-max-age",
+            metavar="<Seconds>",
+            help="Serve cached responses younger than this without asking the server. Defaults to: 0",
+            action="store",
+            dest="cache_max_age",
+            type=int,
+            required=False,
+            default=0,
+        )
+
+        self.parser.add_argument(
+            "--stats",
+            help="Print per-endpoint request timing statistics to stderr when finished",
+            action="store_true",
+            dest="stats",
+            required=False,
+        )
+
+        self.parser.add_argument(
+            "--trace",
+            metavar="<Trace File>",
+            help="Write every request with its timings to a JSON lines file",
+            action="store",
+            dest="trace_file",
+            required=False,
+        )
+
         if allows_threading:
             self.parser.add_argument(
                 "-t",
@@ -173,28 +225,19 @@ class BaseCommandLineParser:
                 with open(args.output_file, "wb"):
                     return
             except Exception:
-                sys.stdout = sys.stderr
-                self.parser.print_usage()
-                print("\nError: Specified Output File Path is invalid or inaccessible.")
-                exit(1)
+                self.parser.fail("Specified Output File Path is invalid or inaccessible.")
 
     def _validate_thread_number(self, args):
         """Utility method to check if provided thread number > 0"""
 
         if args.thread_number < 1:
-            sys.stdout = sys.stderr
-            self.parser.print_usage()
-            print("\nError: Specified Thread Number is invalid.")
-            exit(1)
+            self.parser.fail("Specified Thread Number is invalid.")
 
     def _validate_timeout_number(self, args):
         """Utility method to check if provided timeout number > 0"""
 
         if args.timeout < 1:
-            sys.stdout = sys.stderr
-            self.parser.print_usage()
-            print("\nError: Specified Timeout Number is invalid.")
-            exit(1)
+            self.parser.fail("Specified Timeout Number is invalid.")
 
     def _validate_server_url(self, args):
         """Utility method to check if provided server is a valid url"""
@@ -204,10 +247,7 @@ class BaseCommandLineParser:
             if not all([result.scheme, result.netloc]):
                 raise Exception()
         except Exception:
-            sys.stdout = sys.stderr
-            self.parser.print_usage()
-            print("\nError: Specified Server is not a valid URL.")
-            exit(1)
+            self.parser.fail("Specified Server is not a valid URL.")
 
     def _handle_authentication(self, args):
         """Utility method to handle parsing of credentials and credential files"""
@@ -234,10 +274,9 @@ class BaseCommandLineParser:
 
                 delattr(args, "credential_file")
             except Exception:
-                sys.stdout = sys.stderr
-                self.parser.print_usage()
-                print("\nError: Invalid Credential File Path was passed or no credentials present.")
-                exit(1)
+                self.parser.fail(
+                    "Invalid Credential File Path was passed or no credentials present."
+                )
 
         elif args.credential:
             temp = self._parse_credential(args.credential)
@@ -246,10 +285,7 @@ class BaseCommandLineParser:
                 creds.append(temp)
 
             if len(creds) == 0:
-                sys.stdout = sys.stderr
-                self.parser.print_usage()
-                print("\nError: Invalid Credential Format.")
-                exit(1)
+                self.parser.fail("Invalid Credential Format.")
 
             delattr(args, "credential")
         else:
@@ -1,40 +1,294 @@
+import atexit
 import base64
 import logging
+import os
 import queue
 import sys
+import threading
+import time
 from urllib.parse import urlparse
 
 import requests.exceptions as req_exc
 
-from libs import jenkinslib
+from libs import jenkinslib, quik
 
+from .OutputSink import OutputSink, open_output_file
+from .RequestStats import RequestStats
 
-def _logging_fatal(msg, *args, **kwargs):
-    logging.critical(msg, *args, **kwargs)
-    exit(1)
 
+class CommandContext:
+    """Cleanup of one command, see at_command_exit
+
+    A command run by jaf.py uses the default context, whose handlers run at interpreter exit.
+    run_plugin, iter_plugin and the daemon run each command in a context of its own, made
+    current on the running thread with ``with context:``, and call its run_exit_handlers once
+    the command finished, so commands running side by side only clean up after themselves.
+    """
+
+    def __init__(self):
+        self._exit_handlers = []
+        self._previous = None
+
+    def at_exit(self, func):
+        self._exit_handlers.append(func)
+
+    def run_exit_handlers(self):
+        """Call and forget the registered handlers, most recent first"""
+
+        while self._exit_handlers:
+            self._exit_handlers.pop()()
 
-class HijackStdOut:
     def __enter__(self):
-        # Preserve old stdout because we may already have hijacked it
-        self.old_stdout = sys.stdout
-        sys.stdout = sys.stderr
+        self._previous = getattr(_current_context, "context", None)
+        _current_context.context = self
 
-        return sys.stdout
+        return self
 
     def __exit__(self, _type, value, traceback):
-        sys.stdout = self.old_stdout
+        _current_context.context = self._previous
+
+
+_current_context = threading.local()
+_default_context = CommandContext()
+
+atexit.register(_default_context.run_exit_handlers)
+
+
+def current_command_context():
+    """Return the CommandContext of the command running on this thread"""
+
+    return getattr(_current_context, "context", None) or _default_context
+
+
+def at_command_exit(func):
+    """Register func to be called when the current command finishes
+
+    That is at interpreter exit for a command run by jaf.py, and once the command returns
+    for one run by run_plugin, iter_plugin or the daemon (see CommandContext). Plugins leave
+    through exit() in many places, so this is the place for cleanup that must always happen.
+    """
+
+    current_command_context().at_exit(func)
+
+
+class FatalError(SystemExit):
+    """Raised by logging.fatal
+
+    Being a SystemExit, it ends jaf.py with status 1 like exit(1) did, while run_plugin and
+    iter_plugin turn it into a JAFError carrying the message.
+    """
+
+    def __init__(self, message):
+        super().__init__(1)
+        self.message = message
+
+
+def _logging_fatal(msg, *args, **kwargs):
+    logging.critical(msg, *args, **kwargs)
+    raise FatalError(msg % args if args else msg)
+
+
+class TaskTimeoutError(Exception):
+    """A WorkerPool task did not finish within the pool's task_timeout"""
+
+
+class WorkerPool:
+    """Runs func(item) for a stream of items on a bounded number of worker threads
+
+    At most ``workers`` items are processed at once and at most ``queue_size`` items wait on
+    either side of the workers, so memory use does not grow with the number of items: a
+    thread feeds the items in and waits while the pool is full, and the workers wait while
+    the caller has not taken their results yet.
+
+    :param func: Called with each item on a worker thread, its return value is the result
+    :param workers: Number of worker threads, ``int``
+    :param queue_size: Items waiting to be processed (and results waiting to be taken).
+                       Defaults to twice the number of workers, ``int``
+    :param task_timeout: Seconds after which a task is given up on, ``float`` or None
+    """
+
+    # How often idle workers and the feeding thread check whether the pool was cancelled
+    POLL_INTERVAL = 0.1
+
+    # Tells a worker that no items are left, as None may well be an item
+    _END = object()
+
+    def __init__(self, func, workers, queue_size=None, task_timeout=None):
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = queue_size or 2 * self.workers
+        self.task_timeout = task_timeout
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.started = None
+        self.finished = None
+
+        self._tasks = queue.Queue(self.queue_size)
+        self._results = queue.Queue(self.queue_size)
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._running = {}
+
+    def map_unordered(self, items):
+        """Yield ``(item, result)`` for each of items, as soon as its task has finished
+
+        items may be any iterable, including a generator that is still producing them. An
+        exception raised by func, or while producing items, cancels the pool and is raised
+        here, and so is SystemExit (e.g. from logging.fatal in a worker). A task running
+        longer than task_timeout yields ``(item, TaskTimeoutError)`` and its result is
+        dropped when it finally arrives, while a new worker takes its place. Closing the
+        generator early cancels the pool.
+        """
+
+        self.started = time.perf_counter()
+
+        feeder = threading.Thread(target=self._feed, args=(iter(items),), name="jaf-feeder")
+        feeder.daemon = True
+        feeder.start()
+
+        for _ in range(self.workers):
+            self._start_worker()
+
+        finished_workers = 0
+
+        try:
+            while finished_workers < self.workers:
+                try:
+                    kind, item, value = self._results.get(
+                        timeout=self.POLL_INTERVAL if self.task_timeout else None
+                    )
+                except queue.Empty:
+                    kind = None
+
+                if kind == "result":
+                    yield item, value
+                elif kind == "error":
+                    raise value
+                elif kind == "finished":
+                    finished_workers += 1
+
+                for item in self._expired_tasks():
+                    yield item, TaskTimeoutError(
+                        "Task did not finish within %s seconds" % self.task_timeout
+                    )
+        finally:
+            self.finished = time.perf_counter()
+            self.cancel()
+
+    def cancel(self):
+        """Stop feeding items and let the workers exit once their current task is done"""
+
+        self._cancelled.set()
+
+    def stats(self):
+        """Return the task counters and the throughput (completed tasks per second)"""
+
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "seconds": elapsed,
+            "per_second": self.completed / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _put(self, destination, entry):
+        """Put entry on a bounded queue, giving up if the pool is cancelled meanwhile"""
+
+        while not self._cancelled.is_set():
+            try:
+                destination.put(entry, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _feed(self, items):
+        try:
+            for item in items:
+                if not self._put(self._tasks, item):
+                    return
+
+                self.submitted += 1
+        except BaseException as ex:
+            self._put(self._results, ("error", None, ex))
+            return
+
+        # One end marker per worker, workers replacing timed out ones take over theirs
+        for _ in range(self.workers):
+            if not self._put(self._tasks, self._END):
+                return
+
+    def _start_worker(self):
+        thread = threading.Thread(target=self._work, name="jaf-worker")
+        thread.daemon = True
+        thread.start()
+
+    def _work(self):
+        while not self._cancelled.is_set():
+            try:
+                item = self._tasks.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if item is self._END:
+                self._put(self._results, ("finished", None, None))
+                return
+
+            task = object()
+
+            with self._lock:
+                self._running[task] = (item, time.monotonic())
+
+            try:
+                entry = ("result", item, self.func(item))
+            except BaseException as ex:
+                entry = ("error", item, ex)
+
+            with self._lock:
+                if self._running.pop(task, None) is None:
+                    # Timed out, another worker has taken over from this one
+                    return
+
+                if entry[0] == "result":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+            self._put(self._results, entry)
+
+    def _expired_tasks(self):
+        if not self.task_timeout:
+            return []
+
+        deadline = time.monotonic() - self.task_timeout
+
+        with self._lock:
+            expired = [task for task, (_, started) in self._running.items() if started < deadline]
+            items = [self._running.pop(task)[0] for task in expired]
+            self.timed_out += len(items)
+
+        for _ in items:
+            self._start_worker()
+
+        return items
 
 
 class BasePlugin:
     """JAF Plugin Base Class"""
 
-    results_queue = queue.Queue()
-    jobs_queue = queue.Queue()
-
     def __init__(self, args):
         self.args = args
 
+        # Receives every result instead of stdout when run through run_plugin/iter_plugin
+        self.sink = getattr(args, "sink", None)
+
         logging.basicConfig(format="%(asctime)s - %(message)s")
 
         self.logging = logging.getLogger()
@@ -42,11 +296,93 @@ class BasePlugin:
 
         self.server_url = urlparse(self.args.server)
 
-        if args.output_file:
+        # Every server object created by this plugin (and its worker threads) shares one pool
+        jenkinslib.configure_connection_pool(getattr(self.args, "thread_number", 1))
+
+        if getattr(self.args, "cache_dir", None):
             try:
-                sys.stdout = open(args.output_file, "w")
-            except Exception:
-                self.logging.fatal("Specified Output File Path is invalid or inaccessible.")
+                jenkinslib.configure_response_cache(
+                    self.args.cache_dir, max_age=self.args.cache_max_age
+                )
+                quik.configure_compiled_cache(os.path.join(self.args.cache_dir, "templates"))
+            except OSError:
+                self.logging.fatal("Specified Cache Directory is invalid or inaccessible.")
+
+        if getattr(self.args, "stats", False) or getattr(self.args, "trace_file", None):
+            try:
+                request_stats = RequestStats(self.args.stats, self.args.trace_file)
+            except OSError:
+                self.logging.fatal("Specified Trace File Path is invalid or inaccessible.")
+
+            at_command_exit(request_stats.close)
+
+        # Printed output is written by a thread of its own (see OutputSink), so that plugins
+        # do not wait for the terminal or the output file on every print
+        self.output_sink = None
+
+        if self.sink is None:
+            if args.output_file:
+                try:
+                    self.output_sink = open_output_file(args.output_file)
+                except Exception:
+                    self.logging.fatal("Specified Output File Path is invalid or inaccessible.")
+            else:
+                self.output_sink = OutputSink(sys.stdout)
+
+            self._install_output_sink()
+
+    def _install_output_sink(self):
+        """Make the output sink sys.stdout until the command finishes"""
+
+        output_sink, saved_stdout = self.output_sink, sys.stdout
+
+        def restore():
+            try:
+                output_sink.close()
+            finally:
+                if sys.stdout is output_sink:
+                    sys.stdout = saved_stdout
+
+        sys.stdout = output_sink
+        at_command_exit(restore)
+
+    def _map_unordered(self, func, items, workers=None, task_timeout=None):
+        """Run func over items on a WorkerPool, yielding ``(item, result)`` as tasks finish
+
+        :param workers: Number of worker threads, the -t option if None
+        """
+
+        pool = WorkerPool(func, workers or self.args.thread_number, task_timeout=task_timeout)
+
+        try:
+            yield from pool.map_unordered(items)
+        finally:
+            if getattr(self.args, "stats", False):
+                stats = pool.stats()
+
+                print(
+                    "Worker pool: {0} tasks in {1:.2f}s ({2:.1f}/s), {3} failed, {4} timed out".format(
+                        stats["completed"],
+                        stats["seconds"],
+                        stats["per_second"],
+                        stats["failed"],
+                        stats["timed_out"],
+                    ),
+                    file=sys.stderr,
+                )
+
+    def output(self, record, text=None):
+        """Report one result of the plugin
+
+        On the command line text (or the record itself, if no text is given) is printed.
+        When the plugin is run through run_plugin or iter_plugin, the record is passed on
+        to the caller instead, so it should be a plain value, list or dict.
+        """
+
+        if self.sink is not None:
+            self.sink(record)
+        else:
+            print(record if text is None else text)
 
     def _get_jenkins_server(self, cred):
         """Setup initial connection to the jenkins server and handle authentication
@@ -127,6 +463,34 @@ class BasePlugin:
         else:
             return "Cookie (User Unknown)"
 
+    def _read_batch_file(self, path):
+        """Return the entries of a batch file: one per line, skipping blank and # comment lines"""
+
+        with open(path) as f:
+            return [
+                line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")
+            ]
+
+    def _print_batch_results(self, names, results):
+        """Output the results of Jenkins.execute_script_batch, printed under a header per script"""
+
+        for i, (name, result) in enumerate(zip(names, results)):
+            if result["seconds"] is None:
+                status = "did not finish"
+            elif result["error"]:
+                status = "failed after %.1f ms" % (result["seconds"] * 1000)
+            else:
+                status = "%.1f ms" % (result["seconds"] * 1000)
+
+            lines = ["[{0}/{1}] {2} ({3})".format(i + 1, len(names), name, status)]
+
+            if result["output"]:
+                lines.append(result["output"])
+
+            lines.append("")
+
+            self.output(dict(result, name=name), "\n".join(lines))
+
     def _validate_jenkins_server_accessible(self):
         """Utility function to return if we appear to have access to the jenkins server or not"""
 
@@ -3,23 +3,82 @@ import re
 import sys
 
 
+class OptionsError(Exception):
+    """Invalid options were given to an ArgumentParser parsing options instead of sys.argv"""
+
+
 class ArgumentParser(argparse.ArgumentParser):
+    def __init__(self, *args, options=None, **kwargs):
+        """options maps argument destinations to values and is parsed instead of sys.argv,
+        see libs.JAF.run_plugin. None and False values are left out. Errors then raise
+        OptionsError rather than printing usage and exiting."""
+
+        super().__init__(*args, **kwargs)
+        self.options = options
+
+    def error(self, message):
+        if self.options is not None:
+            raise OptionsError(message)
+
+        super().error(message)
+
+    def fail(self, message):
+        """Reject arguments that parsed but are not valid: print usage and message to stderr
+        and exit(1), or raise OptionsError when parsing options"""
+
+        if self.options is not None:
+            raise OptionsError(message)
+
+        self.print_usage(sys.stderr)
+        print("\nError: " + message, file=sys.stderr)
+        exit(1)
+
+    def _options_to_argv(self, options):
+        unknown = set(options) - set(action.dest for action in self._actions)
+
+        if unknown:
+            self.error("unrecognized options: %s" % " ".join(sorted(unknown)))
+
+        argv = []
+
+        for action in self._actions:
+            value = options.get(action.dest)
+
+            if value is None or value is False:
+                continue
+            elif not action.option_strings:
+                argv.append(str(value))
+            elif action.nargs == 0:
+                argv.append(action.option_strings[-1])
+            elif action.option_strings[-1].startswith("--"):
+                # Attached, so values starting with "-" are not taken for options
+                argv.append("%s=%s" % (action.option_strings[-1], value))
+            else:
+                argv.extend([action.option_strings[-1], str(value)])
+
+        return argv
+
     def parse_args(self, args=None, namespace=None):
         """
-        Since we handle some positional arguments at the end of our arguments and some at the beginning we need 
-        to do some hackery to make argparse play nicely with optional positional arguments at the end of our 
-        arguments list. This solution is fragile, but sufficient for our needs. What we do, is check to see if 
-        parse_known_args returns any "unknown args". If so, we shuffle arguments so that all the unknown args appear 
-        at the front (after the command arg that should always be first). Then we try again. If we still get an 
+        Since we handle some positional arguments at the end of our arguments and some at the beginning we need
+        to do some hackery to make argparse play nicely with optional positional arguments at the end of our
+        arguments list. This solution is fragile, but sufficient for our needs. What we do, is check to see if
+        parse_known_args returns any "unknown args". If so, we shuffle arguments so that all the unknown args appear
+        at the front (after the command arg that should always be first). Then we try again. If we still get an
         error, we throw the error just like argparse would, otherwise everything is golden.
         """
 
+        if args is None and self.options is not None:
+            args = self._options_to_argv(self.options)
+
+        all_args = sys.argv[1:] if args is None else list(args)
+
         args, argv = self.parse_known_args(args, namespace)
 
         new_argv = []
 
         if argv:
-            new_argv = [x for x in sys.argv[1:] if x not in argv]
+            new_argv = [x for x in all_args if x not in argv]
 
             for i in range(len(argv)):
                 new_argv.insert(i + 1, argv[i])
@@ -35,8 +94,8 @@ class ArgumentParser(argparse.ArgumentParser):
 
 class Formatter(argparse.HelpFormatter):
     """Argparse Formatter to override usage creation.
-        Created to force argparse to respect positional order
-        Also move [-h] option to more expected location"""
+    Created to force argparse to respect positional order
+    Also move [-h] option to more expected location"""
 
     # use defined argument order to display usage
     def _format_usage(self, usage, actions, groups, prefix):
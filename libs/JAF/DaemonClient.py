@@ -0,0 +1,115 @@
+"""Thin client for the JAF daemon (see plugin_Daemon)
+
+Kept to the standard library, so that forwarding a command costs no more than starting
+the interpreter. The client sends one JSON line with the command line, the working
+directory and the FORWARDED_ENV variables, then relays frames until the exit frame
+arrives. A frame is a channel byte and the payload length (see FRAME_HEADER) followed by
+the payload.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+
+# Environment variable holding the daemon socket path. When it is set, jaf.py forwards
+# commands to the daemon instead of running them itself
+SOCKET_ENV = "JAF_DAEMON_SOCKET"
+
+DEFAULT_SOCKET = os.path.join("~", ".jaf-daemon.sock")
+
+FRAME_HEADER = struct.Struct("!cI")
+
+# Environment variables that change how a command connects, sent along with each command
+# and set in the daemon while it runs
+FORWARDED_ENV = (
+    "HTTP_PROXY",
+    "HTTPS_PROXY",
+    "ALL_PROXY",
+    "NO_PROXY",
+    "http_proxy",
+    "https_proxy",
+    "all_proxy",
+    "no_proxy",
+    "REQUESTS_CA_BUNDLE",
+    "CURL_CA_BUNDLE",
+    "SSL_CERT_FILE",
+    "SSL_CERT_DIR",
+    "KRB5CCNAME",
+)
+
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+
+
+def default_socket_path():
+    return os.path.expanduser(os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET)
+
+
+def can_forward(argv):
+    """Return True if the command line argv (without the program name) can run on the daemon
+
+    The daemon does not read the client's stdin (and refuses to prompt), so commands
+    reading a credential file from "-" always run locally, as does the Daemon command itself.
+    """
+
+    return bool(argv) and argv[0] != "Daemon" and "-" not in argv[1:]
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+
+    if len(data) < size:
+        raise EOFError()
+
+    return data
+
+
+def run_remote(socket_path, argv):
+    """Run a command on the daemon listening on socket_path, relaying its output
+
+    :param socket_path: Path of the daemon's Unix domain socket, ``str``
+    :param argv: Command line without the program name, ``list``
+    :returns: Exit code of the command, or None if no daemon is listening
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(os.path.expanduser(socket_path))
+    except OSError:
+        sock.close()
+        return None
+
+    with sock, sock.makefile("rb") as stream:
+        request = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+        }
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+        while True:
+            try:
+                channel, size = FRAME_HEADER.unpack(_read_exactly(stream, FRAME_HEADER.size))
+                payload = _read_exactly(stream, size)
+            except (EOFError, OSError):
+                sys.stdout.flush()
+                sys.stderr.write("JAF daemon closed the connection before the command finished\n")
+                return 1
+
+            if channel == EXIT:
+                sys.stdout.flush()
+                return int(payload)
+            elif channel == STDERR:
+                # Keep stdout and stderr in the order the daemon wrote them
+                sys.stdout.flush()
+                sys.stderr.buffer.write(payload)
+                sys.stderr.flush()
+            else:
+                sys.stdout.buffer.write(payload)
@@ -0,0 +1,363 @@
+import codecs
+import gzip
+import io
+import queue
+import shutil
+import threading
+
+# Bytes collected from writes before they are handed to the writer thread at once
+BUFFER_SIZE = 1024 * 1024
+
+# Handed over buffers that may wait for the writer thread before writes start to block
+QUEUE_SIZE = 8
+
+# Seconds after which output sitting in the buffer is written even though it is not full
+FLUSH_INTERVAL = 0.2
+
+# Chunk size for copying spooled files to the output
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class _BinaryWriter:
+    """Stands in for sys.stdout.buffer, writing bytes through the same OutputSink"""
+
+    def __init__(self, sink):
+        self._sink = sink
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._sink._append(bytes(data))
+
+        return len(data)
+
+    def flush(self):
+        self._sink.flush()
+
+
+class _TextWriter:
+    """Target for a text stream without a binary buffer (e.g. io.StringIO), decoding the bytes"""
+
+    def __init__(self, stream, encoding):
+        self._stream = stream
+        self._decoder = codecs.getincrementaldecoder(encoding)("replace")
+
+    def write(self, data):
+        self._stream.write(self._decoder.decode(data))
+
+        return len(data)
+
+    def flush(self):
+        self._stream.flush()
+
+
+class OutputSink:
+    """Text stream that collects what is written to it and leaves the writing to a thread
+
+    BasePlugin installs it as sys.stdout, so print() only appends to a buffer and the
+    thread of the caller (e.g. the one taking results from a WorkerPool) does not wait for
+    the terminal or disk. Full buffers (BUFFER_SIZE) are handed to the writer thread, which
+    writes them in one go. Once QUEUE_SIZE buffers are waiting, writes block until the
+    writer catches up, so memory use stays bounded however slow the output is.
+
+    Writes appear in the order they were made. ``write_record`` writes a whole record at
+    once, which may include spooled files that are then copied by the writer thread.
+    ``reorder_buffer`` returns a ReorderBuffer for records that should appear in the order
+    their work was submitted instead of the order it finished.
+
+    A text stream that has no binary buffer beneath it (e.g. io.StringIO) is written to right
+    away instead, as it lives in memory.
+
+    :param stream: Text or binary stream to write to, ``sys.stdout`` or a file
+    :param compress: Gzip compress the output on the fly, ``bool``
+    :param close_stream: Close stream when the sink is closed, ``bool``
+    """
+
+    def __init__(self, stream, compress=False, close_stream=False):
+        self.stream = stream
+        self.compress = compress
+        self.close_stream = close_stream
+
+        self.encoding = getattr(stream, "encoding", None) or "utf-8"
+        self.errors = "replace"
+        self.buffer = _BinaryWriter(self)
+
+        # Text already written to a text stream must come before the bytes written beneath it
+        stream.flush()
+
+        target = getattr(stream, "buffer", None)
+        self._in_memory = target is None and isinstance(stream, io.TextIOBase)
+
+        if self._in_memory:
+            target = _TextWriter(stream, self.encoding)
+        elif target is None:
+            target = stream
+
+        if compress:
+            target = gzip.GzipFile(fileobj=target, mode="wb")
+
+        self._target = target
+
+        # Someone may be watching, so do not hold back output for a full buffer
+        try:
+            self._interactive = not compress and stream.isatty()
+        except (AttributeError, ValueError):
+            self._interactive = False
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_size = 0
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._reorder_buffers = []
+        self._error = None
+        self.closed = False
+
+        self._writer = threading.Thread(target=self._write_loop, name="jaf-output")
+        self._writer.daemon = True
+        self._writer.start()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return self._interactive
+
+    def write(self, text):
+        self._append(text.encode(self.encoding, self.errors))
+
+        return len(text)
+
+    def write_record(self, parts):
+        """Write parts (``str``, ``bytes`` or binary files, which are closed once copied) together
+
+        A part that is None is skipped.
+        """
+
+        with self._lock:
+            for part in parts:
+                if isinstance(part, str):
+                    part = part.encode(self.encoding, self.errors)
+
+                if part is not None:
+                    self._append_locked(part)
+
+    def reorder_buffer(self, window):
+        """Return a ReorderBuffer writing to this sink, see ReorderBuffer"""
+
+        reorder_buffer = ReorderBuffer(self, window)
+        self._reorder_buffers.append(reorder_buffer)
+
+        return reorder_buffer
+
+    def flush(self):
+        """Wait until everything written so far has reached the stream"""
+
+        if self.closed:
+            return
+
+        with self._lock:
+            self._hand_off()
+
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Write out what is left, stop the writer thread and close the stream if it is owned"""
+
+        if self.closed:
+            return
+
+        for reorder_buffer in self._reorder_buffers:
+            reorder_buffer.close()
+
+        with self._lock:
+            self._hand_off()
+            self._queue.put(None)
+
+        self._writer.join()
+        self.closed = True
+
+        try:
+            if self.compress:
+                self._target.close()
+
+            if self.close_stream:
+                self.stream.close()
+            else:
+                self.stream.flush()
+        finally:
+            self._raise_error()
+
+    def _append(self, data):
+        with self._lock:
+            self._append_locked(data)
+
+    def _append_locked(self, data):
+        if self.closed or self._in_memory:
+            # Written after the sink was closed (e.g. during interpreter shutdown) or to memory
+            try:
+                self._write_to_target(data)
+                self._target.flush()
+            finally:
+                if not isinstance(data, bytes):
+                    data.close()
+
+            return
+
+        # Fail the writes as the writer thread failed, instead of carrying on into the void
+        self._raise_error()
+
+        if isinstance(data, bytes):
+            self._pending.append(data)
+            self._pending_size += len(data)
+
+            if self._pending_size >= BUFFER_SIZE or self._interactive:
+                self._hand_off()
+        else:
+            # A file goes to the writer thread as is, after what was written before it
+            self._hand_off()
+            self._queue.put(data)
+
+    def _hand_off(self):
+        """Queue the pending bytes for the writer thread, called holding the lock
+
+        Buffers are only queued while holding the lock, which keeps them in order.
+        """
+
+        if self._pending:
+            data = b"".join(self._pending)
+            self._pending = []
+            self._pending_size = 0
+
+            self._queue.put(data)
+
+    def _write_loop(self):
+        while True:
+            try:
+                data = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                # Nothing arrived for a while, write out a partly filled buffer
+                if self._lock.acquire(blocking=False):
+                    try:
+                        self._hand_off()
+                    finally:
+                        self._lock.release()
+                continue
+
+            try:
+                if data is None:
+                    return
+
+                if self._error is None:
+                    self._write_to_target(data)
+
+                    if self._queue.empty() and not self.compress:
+                        self._target.flush()
+            except Exception as ex:
+                # Raised by the next write, flush or close
+                self._error = ex
+            finally:
+                if not isinstance(data, bytes) and data is not None:
+                    data.close()
+
+                self._queue.task_done()
+
+    def _write_to_target(self, data):
+        if isinstance(data, bytes):
+            self._target.write(data)
+        else:
+            shutil.copyfileobj(data, self._target, COPY_CHUNK_SIZE)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+class ReorderBuffer:
+    """Writes records to an OutputSink in the order they were submitted rather than finished
+
+    Whoever submits the work (e.g. the generator feeding a WorkerPool) takes a ticket with
+    ``reserve`` for each item, and the record of each item is written with its ticket. A
+    record finishing early is held back until the records of all earlier tickets have been
+    written. At most ``window`` tickets may be outstanding: further ``reserve`` calls wait,
+    so a slow item holds up the submission of new work rather than filling memory with the
+    records finished after it.
+
+    :param sink: OutputSink to write to
+    :param window: Maximum number of tickets reserved but not yet written, ``int``
+    """
+
+    # How often a reserve call waiting for the window checks whether the sink was closed
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, sink, window):
+        self.sink = sink
+        self.window = max(1, window)
+
+        self._slots = threading.Semaphore(self.window)
+        self._lock = threading.Lock()
+        self._held = {}
+        self._next_reserved = 0
+        self._next_written = 0
+        self._closed = threading.Event()
+
+    def reserve(self):
+        """Return the ticket of the next item, waiting while the window is full
+
+        :raises RuntimeError: If the sink is closed meanwhile
+        """
+
+        while not self._slots.acquire(timeout=self.POLL_INTERVAL):
+            if self._closed.is_set():
+                raise RuntimeError("Output was closed")
+
+        with self._lock:
+            ticket = self._next_reserved
+            self._next_reserved += 1
+
+        return ticket
+
+    def write_record(self, ticket, parts):
+        """Write the record of ticket (see OutputSink.write_record) once its turn has come
+
+        parts may be None for an item that has no record, to let the following ones through.
+        """
+
+        with self._lock:
+            self._held[ticket] = parts
+
+            while self._next_written in self._held:
+                parts = self._held.pop(self._next_written)
+                self._next_written += 1
+
+                if parts is not None:
+                    self.sink.write_record(parts)
+
+                self._slots.release()
+
+    def close(self):
+        """Let reserve calls waiting for the window give up, held back records are dropped"""
+
+        self._closed.set()
+
+        with self._lock:
+            for parts in self._held.values():
+                for part in parts or ():
+                    if hasattr(part, "close"):
+                        part.close()
+
+            self._held.clear()
+
+
+def open_output_file(path):
+    """Return an OutputSink writing to the file at path, gzip compressed if it ends in .gz
+
+    :raises OSError: If the file cannot be opened
+    """
+
+    return OutputSink(open(path, "wb"), compress=path.endswith(".gz"), close_stream=True)
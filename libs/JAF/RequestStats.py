@@ -0,0 +1,196 @@
+import json
+import sys
+import threading
+import time
+
+from libs import jenkinslib
+
+# Upper bounds (in seconds) of the latency histogram buckets, the last bucket is open ended
+HISTOGRAM_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def _milliseconds(value):
+    return "-" if value is None else "%.1f" % (value * 1000)
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.totals = []
+        self.errors = 0
+        self.cached = 0
+        self.retries = 0
+        self.bytes = 0
+        self.phases = {"dns": [], "connect": [], "tls": [], "ttfb": []}
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def add(self, record):
+        self.totals.append(record.total)
+        self.bytes += record.bytes
+        self.retries += record.retries
+
+        if record.error or (record.status is not None and record.status >= 400):
+            self.errors += 1
+
+        if record.from_cache:
+            self.cached += 1
+
+        for phase, values in self.phases.items():
+            value = getattr(record, phase)
+
+            if value is not None:
+                values.append(value)
+
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if record.total <= bound:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def average(self, phase):
+        values = self.phases[phase]
+        return sum(values) / len(values) if values else None
+
+
+class RequestStats:
+    """Collects every request made through jenkinslib and summarises them per endpoint
+
+    Records are gathered with a jenkinslib request hook. The report splits request time
+    into DNS, connect and TLS (network), time to first byte (mostly server) and the rest
+    of the total (body transfer), and compares the time spent in requests with the wall
+    clock time of the run (the remainder is spent in JAF itself or waiting on it).
+
+    :param report: Print the summary when :meth:`close` is called, ``bool``
+    :param trace_file: Path of a file to write every request to as a JSON line, ``str``
+    """
+
+    def __init__(self, report=True, trace_file=None):
+        self.report_enabled = report
+        self.started = time.perf_counter()
+        self._pool_baseline = jenkinslib.connection_pool_stats()
+
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._trace = open(trace_file, "w") if trace_file else None
+        self._hook = jenkinslib.add_request_hook(post=self.record)
+
+    def record(self, record):
+        key = "%s %s" % (record.method, record.endpoint)
+
+        with self._lock:
+            if key not in self._endpoints:
+                self._endpoints[key] = _EndpointStats()
+
+            self._endpoints[key].add(record)
+
+            if self._trace:
+                self._trace.write(json.dumps(record.as_dict()) + "\n")
+
+    def close(self):
+        """Stop collecting, close the trace file and print the report if enabled"""
+
+        jenkinslib.remove_request_hook(self._hook)
+
+        with self._lock:
+            if self._trace:
+                self._trace.close()
+                self._trace = None
+
+        if self.report_enabled:
+            self.report()
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        wall = time.perf_counter() - self.started
+
+        with self._lock:
+            endpoints = sorted(
+                self._endpoints.items(), key=lambda item: sum(item[1].totals), reverse=True
+            )
+
+        requests = sum(len(stats.totals) for _, stats in endpoints)
+        request_time = sum(sum(stats.totals) for _, stats in endpoints)
+        pool = jenkinslib.connection_pool_stats()
+        pool = {key: value - self._pool_baseline[key] for key, value in pool.items()}
+
+        print("\nRequest Statistics", file=file)
+        print("==================", file=file)
+        print(
+            "%d requests in %.2fs wall time, %.2fs spent in requests (summed over threads)"
+            % (requests, wall, request_time),
+            file=file,
+        )
+        print(
+            "Connections: %d reused, %d opened, %d discarded"
+            % (pool["hits"], pool["misses"], pool["discards"]),
+            file=file,
+        )
+
+        if not endpoints:
+            return
+
+        width = max(len("Endpoint"), max(len(key) for key, _ in endpoints))
+
+        print(
+            "\n%-*s %7s %6s %6s %7s %10s %8s %8s %8s %8s %8s %8s %8s %8s"
+            % (
+                width,
+                "Endpoint",
+                "Count",
+                "Errors",
+                "Cached",
+                "Retries",
+                "Bytes",
+                "p50 ms",
+                "p90 ms",
+                "p99 ms",
+                "max ms",
+                "dns ms",
+                "conn ms",
+                "tls ms",
+                "ttfb ms",
+            ),
+            file=file,
+        )
+
+        for key, stats in endpoints:
+            print(
+                "%-*s %7d %6d %6d %7d %10d %8s %8s %8s %8s %8s %8s %8s %8s"
+                % (
+                    width,
+                    key,
+                    len(stats.totals),
+                    stats.errors,
+                    stats.cached,
+                    stats.retries,
+                    stats.bytes,
+                    _milliseconds(_percentile(stats.totals, 0.5)),
+                    _milliseconds(_percentile(stats.totals, 0.9)),
+                    _milliseconds(_percentile(stats.totals, 0.99)),
+                    _milliseconds(max(stats.totals)),
+                    _milliseconds(stats.average("dns")),
+                    _milliseconds(stats.average("connect")),
+                    _milliseconds(stats.average("tls")),
+                    _milliseconds(stats.average("ttfb")),
+                ),
+                file=file,
+            )
+
+        labels = ["<=%gms" % (bound * 1000) for bound in HISTOGRAM_BUCKETS]
+        labels.append(">%gms" % (HISTOGRAM_BUCKETS[-1] * 1000))
+
+        print(
+            "\n%-*s " % (width, "Latency Histogram") + " ".join("%8s" % label for label in labels),
+            file=file,
+        )
+
+        for key, stats in endpoints:
+            print(
+                "%-*s " % (width, key) + " ".join("%8d" % count for count in stats.histogram),
+                file=file,
+            )
@@ -1,43 +1,199 @@
+import argparse
 import glob
 import importlib
 import os
+import queue
 import sys
+import threading
 
+from . import DaemonClient
 from .BaseCommandLineParser import BaseCommandLineParser
+from .CustomArgumentParser import OptionsError
+
+# Results iter_plugin buffers before the plugin has to wait for the caller to catch up
+ITER_QUEUE_SIZE = 1000
+
+
+class JAFError(Exception):
+    """A plugin run through run_plugin or iter_plugin was given invalid options or failed"""
+
+
+def _available_commands():
+    """Derive subcommand names from plugin file names, so that no plugin has to be imported
+
+    Every libs/JAF/plugin_<Name>.py provides a <Name>Parser class with a cmd_<Name> method.
+    """
+
+    return sorted(
+        (os.path.split(plugin)[1])[7:-3]
+        for plugin in glob.glob(
+            os.path.join(os.path.dirname(os.path.realpath(__file__)), "plugin_*.py")
+        )
+    )
 
 
 def JAF():
     """
     Primary JAF Function
     This function handles the dynamic plugin loading.
-    Commandline Parsers are loaded as mixins to the BaseCommandLindParser class.
+    The subcommand is chosen first, then only that plugin is imported and its Commandline
+    Parser is loaded as a mixin to the BaseCommandLindParser class.
     Once parsing occurs, the correct Plugin Class is called that inherits from BasePlugin.
+    If a JAF daemon socket is configured, the command is forwarded to the daemon instead
+    and only runs here if no daemon is listening.
     """
 
-    plugins = [BaseCommandLineParser]
+    socket_path = os.environ.get(DaemonClient.SOCKET_ENV)
 
-    for plugin in glob.glob(
-        os.path.join(os.path.dirname(os.path.realpath(__file__)), "plugin_*.py")
-    ):
-        plugin = (os.path.split(plugin)[1])[7:-3]
+    if socket_path and DaemonClient.can_forward(sys.argv[1:]):
+        exit_code = DaemonClient.run_remote(socket_path, sys.argv[1:])
 
-        try:
-            module = importlib.import_module("libs.JAF.plugin_" + plugin)
-            parser_class = getattr(module, plugin + "Parser")
-            plugins.append(parser_class)
-        except AttributeError as ex:
-            sys.stderr.write("An error occurred loading plugin {0}:\n\t{1}\n".format(plugin, ex))
-            exit(-1)
+        if exit_code is not None:
+            exit(exit_code)
+
+        sys.stderr.write("JAF daemon is not listening at %s, running locally\n" % socket_path)
+
+    return run_command()
+
+
+def run_command():
+    """Parse sys.argv and run the chosen plugin in this process"""
 
-    command_line_parser = type("CommandLineParser", tuple(plugins), {})()
-    args = command_line_parser.parse()
+    command_line_parser = type(
+        "CommandLineParser",
+        (BaseCommandLineParser,),
+        {"_available_commands": _available_commands()},
+    )()
+    command = command_line_parser.parse_command()
 
     try:
-        module = importlib.import_module("libs.JAF.plugin_" + args.subcommand)
-    except ModuleNotFoundError as ex:
-        sys.stderr.write(
-            "An error occurred loading plugin {0}:\n\t{1}\n".format(args.subcommand, ex)
-        )
+        module = importlib.import_module("libs.JAF.plugin_" + command)
+        parser_class = getattr(module, command + "Parser")
+    except (ImportError, AttributeError) as ex:
+        sys.stderr.write("An error occurred loading plugin {0}:\n\t{1}\n".format(command, ex))
         exit(-1)
 
+    command_line_parser = type("CommandLineParser", (BaseCommandLineParser, parser_class), {})()
+    args = getattr(command_line_parser, "cmd_" + command)()
+
     return getattr(module, args.subcommand)(args)
+
+
+def _merge_options(options, kwargs):
+    if options is None:
+        options = {}
+    elif isinstance(options, argparse.Namespace):
+        options = vars(options)
+
+    return dict(options, **kwargs)
+
+
+def _parse_options(command, options):
+    """Return the plugin module and the checked arguments for options, as jaf.py would parse them"""
+
+    if command not in _available_commands():
+        raise JAFError("Unknown command: %s" % command)
+
+    module = importlib.import_module("libs.JAF.plugin_" + command)
+
+    command_line_parser = type(
+        "CommandLineParser",
+        (BaseCommandLineParser, getattr(module, command + "Parser")),
+        {"_options": dict(options, subcommand=command)},
+    )()
+
+    try:
+        return module, getattr(command_line_parser, "cmd_" + command)()
+    except OptionsError as ex:
+        raise JAFError(str(ex)) from None
+
+
+def _run_plugin(command, options, sink):
+    # Imported here, as loading jenkinslib would slow down every command forwarded to a daemon
+    from .BasePlugin import CommandContext, FatalError
+
+    module, args = _parse_options(command, options)
+    args.sink = sink
+
+    context = CommandContext()
+
+    try:
+        with context:
+            getattr(module, command)(args)
+    except FatalError as ex:
+        raise JAFError(ex.message) from None
+    except SystemExit as ex:
+        if ex.code:
+            message = ex.code if isinstance(ex.code, str) else "exited with status %s" % ex.code
+            raise JAFError("%s %s" % (command, message)) from None
+    finally:
+        context.run_exit_handlers()
+
+
+def run_plugin(command, options=None, **kwargs):
+    """Run a plugin in this process and return the list of its results
+
+    Options are given as a dict, an argparse.Namespace and/or keyword arguments, named
+    after the attributes the command line options are stored in (e.g. server,
+    credential, thread_number), and are checked like the command line. Results are the
+    records each plugin reports through BasePlugin.output, rather than printed text.
+
+        jobs = run_plugin("ListJobs", server="https://jenkins", credential="user:token")
+
+    :raises JAFError: If the options are invalid or the plugin failed
+    """
+
+    results = []
+    _run_plugin(command, _merge_options(options, kwargs), results.append)
+
+    return results
+
+
+def iter_plugin(command, options=None, **kwargs):
+    """Run a plugin in a background thread and yield its results as they are reported
+
+    Takes the same arguments as run_plugin. Once ITER_QUEUE_SIZE results are waiting,
+    the plugin blocks until the caller takes the next one. If the caller stops early,
+    the plugin runs to completion in the background and its remaining results are
+    dropped.
+
+    :raises JAFError: If the options are invalid or the plugin failed
+    """
+
+    options = _merge_options(options, kwargs)
+    items = queue.Queue(ITER_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run():
+        try:
+            _run_plugin(command, options, lambda record: put((True, record)))
+        except BaseException as ex:
+            put((False, ex))
+        else:
+            put((False, None))
+
+    thread = threading.Thread(target=run, name="jaf-" + command)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            is_record, value = items.get()
+
+            if not is_record:
+                if value is not None:
+                    raise value
+
+                return
+
+            yield value
+    finally:
+        stopped.set()
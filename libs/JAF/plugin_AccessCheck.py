@@ -6,6 +6,15 @@ from libs import jenkinslib
 
 from .BasePlugin import BasePlugin
 
+# How each access check is reported on the command line
+ACCESS_CHECK_LABELS = {
+    "read": "can View Jenkins",
+    "build": "can Create Job",
+    "admin": "has some Administrative Access",
+    "script": "can Access Script Console",
+    "scriptler": "can Access Scriptler",
+}
+
 
 class AccessCheck(BasePlugin):
     """Class for managing AccessCheck SubCommand"""
@@ -13,14 +22,15 @@ class AccessCheck(BasePlugin):
     def __init__(self, args):
         super().__init__(args)
 
-        access_checks = ["read", "build", "admin", "script", "scriptler"]
+        access_checks = list(ACCESS_CHECK_LABELS)
 
         self._validate_jenkins_server_accessible()
 
+        error = False
+
         for cred in self.args.credentials:
             username = self._get_username(cred)
 
-            threads = []
             thread_number = min(self.args.thread_number, len(access_checks))
 
             server = self._get_jenkins_server(cred)
@@ -32,112 +42,87 @@ class AccessCheck(BasePlugin):
                         "%s: Invalid Credentials or unable to access Jenkins server.", username
                     )
                 else:
-                    print(
-                        "{0}: Invalid Credentials or unable to access Jenkins server.".format(
-                            username
-                        )
-                    )
+                    message = "Invalid Credentials or unable to access Jenkins server."
+                    self.output({"user": username, "error": message}, username + ": " + message)
 
                 continue
 
-            for _ in range(thread_number):
-                t = threading.Thread(target=self._get_user_check_access, args=(server, username))
-                t.start()
-                threads.append(t)
-
-            for job in access_checks:
-                self.jobs_queue.put(job)
+            # Set on the first auth error, so the remaining checks make no more requests
+            failed = threading.Event()
 
-            for _ in range(len(access_checks)):
-                result = self.results_queue.get()
+            for _, result in self._map_unordered(
+                lambda access_type: self._get_user_check_access(
+                    server, username, access_type, failed
+                ),
+                access_checks,
+                workers=thread_number,
+            ):
                 if result:
-                    print(result)
-
-            for _ in range(thread_number):
-                self.jobs_queue.put(None)
-
-            for t in threads:
-                t.join()
-
-    def _get_user_check_access(self, server, username):
-        error = False
-
-        while True:
-            access_type = self.jobs_queue.get()
-
-            if access_type is None:
-                break
-
-            # We had an auth error, consume tasks, but don't make any more requests.
-            if error:
-                self.results_queue.put(None)
-                self.jobs_queue.task_done()
-                continue
-
-            try:
-                if access_type == "script":
-                    self.results_queue.put(
-                        username
-                        + " can Access Script Console: "
-                        + str(server.can_access_script_console())
-                    )
-                elif access_type == "admin":
-                    self.results_queue.put(
-                        username + " has some Administrative Access: " + str(server.is_admin())
+                    access_type, allowed = result
+                    self.output(
+                        {"user": username, "access": access_type, "allowed": allowed},
+                        "%s %s: %s" % (username, ACCESS_CHECK_LABELS[access_type], allowed),
                     )
-                elif access_type == "build":
-                    self.results_queue.put(
-                        username + " can Create Job: " + str(server.can_create_job())
-                    )
-                elif access_type == "read":
-                    self.results_queue.put(
-                        username + " can View Jenkins: " + str(server.can_read_jenkins())
-                    )
-                elif access_type == "scriptler":
-                    if server.can_access_scriptler():
-                        self.results_queue.put(username + " can Access Scriptler: True")
-                    else:
-                        self.results_queue.put(None)
 
-            except jenkinslib.JenkinsException as ex:
-                error = True
+            error = error or failed.is_set()
+
+        if error:  # So we have consistent exit codes on major error
+            exit(1)
 
-                if "[403]" in str(ex).split("\n")[0]:
-                    self.logging.error("%s authentication failed or no access", username)
+    def _get_user_check_access(self, server, username, access_type, failed):
+        """Run one access check, returning a tuple of access type and result or None"""
+
+        # We had an auth error, so don't make any more requests.
+        if failed.is_set():
+            return None
+
+        try:
+            if access_type == "script":
+                return access_type, server.can_access_script_console()
+            elif access_type == "admin":
+                return access_type, server.is_admin()
+            elif access_type == "build":
+                return access_type, server.can_create_job()
+            elif access_type == "read":
+                return access_type, server.can_read_jenkins()
+            elif access_type == "scriptler":
+                if server.can_access_scriptler():
+                    return access_type, True
                 else:
-                    self.logging.error(
-                        "Unable to access Jenkins at: %s With User: %s For Reason:\n\t%s"
-                        % (
-                            (
-                                self.server_url.netloc
-                                if len(self.server_url.netloc) > 0
-                                else self.args.server
-                            ),
-                            username,
-                            str(ex).split("\n")[0],
-                        )
-                    )
+                    return None
 
-            except (req_exc.SSLError, req_exc.ConnectionError):
-                error = True
+        except jenkinslib.JenkinsException as ex:
+            failed.set()
 
+            if "[403]" in str(ex).split("\n")[0]:
+                self.logging.error("%s authentication failed or no access", username)
+            else:
                 self.logging.error(
-                    "Unable to connect to: "
-                    + (
-                        self.server_url.netloc
-                        if len(self.server_url.netloc) > 0
-                        else self.args.server
+                    "Unable to access Jenkins at: %s With User: %s For Reason:\n\t%s"
+                    % (
+                        (
+                            self.server_url.netloc
+                            if len(self.server_url.netloc) > 0
+                            else self.args.server
+                        ),
+                        username,
+                        str(ex).split("\n")[0],
                     )
                 )
 
-            except Exception:
-                error = True
-                self.logging.exception("")
+        except (req_exc.SSLError, req_exc.ConnectionError):
+            failed.set()
 
-            self.jobs_queue.task_done()
+            self.logging.error(
+                "Unable to connect to: "
+                + (self.server_url.netloc if len(self.server_url.netloc) > 0 else self.args.server)
+            )
 
-        if error:  # So we have consistent exit codes on major error
-            exit(1)
+        except Exception:
+            failed.set()
+            self.logging.exception("")
+
+        return None
 
 
 class AccessCheckParser:
@@ -1,5 +1,5 @@
 import sys
-import threading
+import tempfile
 from urllib.parse import urlparse
 
 import requests.exceptions as req_exc
@@ -8,6 +8,14 @@ from libs import jenkinslib
 
 from .BasePlugin import BasePlugin
 
+# Streamed logs larger than this are spooled to a temporary file instead of memory
+SPOOL_MEMORY_LIMIT = 4 * 1024 * 1024
+
+# Jobs per thread whose output --ordered may hold back while waiting for an earlier job
+REORDER_WINDOW_PER_THREAD = 4
+
+SEPARATOR = "----------------------------------------------------------------\n"
+
 
 class ConsoleOutput(BasePlugin):
     """Class for managing ConsoleOutput SubCommand"""
@@ -15,7 +23,8 @@ class ConsoleOutput(BasePlugin):
     def __init__(self, args):
         super().__init__(args)
 
-        threads = []
+        # The folder listing workers run alongside the console output workers
+        jenkinslib.configure_connection_pool(2 * self.args.thread_number)
 
         try:
             cred = self.args.credentials[0]
@@ -27,40 +36,42 @@ class ConsoleOutput(BasePlugin):
                     self._get_username(cred),
                 )
 
-            jobs = server.get_all_jobs()
+            jobs = server.iter_all_jobs(
+                extra_fields=self._build_fields(), workers=self.args.thread_number
+            )
 
-            for _ in range(self.args.thread_number):
-                t = threading.Thread(target=self._get_job_console_output, args=(server,))
-                t.start()
-                threads.append(t)
+            if self.args.use_async:
+                jobs = [self._add_folder(job) for job in jobs]
 
-            for job in jobs:
-                job["folder"] = urlparse(job["url"]).path[len(self.server_url.path) :]
-                self.jobs_queue.put(job)
+                if not self._get_all_console_output_async(server, jobs):
+                    self.logging.fatal(
+                        "%s: No Jobs or Unable to see Jobs on Server.", self._get_username(cred)
+                    )
 
-            jobs_exist = False
+                return
 
-            for job in jobs:
-                output = self.results_queue.get()
+            self.jobs_exist = False
 
-                if output:
-                    jobs_exist = True
-                    print("----------------------------------------------------------------")
-                    print(output)
-                    print("----------------------------------------------------------------")
-                else:
-                    print("%s has no builds" % (job["folder"]), file=sys.stderr)
+            # With --ordered, output finished early waits for the jobs listed before it
+            self._reorder_buffer = None
+
+            if getattr(self.args, "ordered", False) and self.output_sink is not None:
+                self._reorder_buffer = self.output_sink.reorder_buffer(
+                    REORDER_WINDOW_PER_THREAD * self.args.thread_number
+                )
 
-            for _ in range(self.args.thread_number):
-                self.jobs_queue.put(None)
+            # Workers start on the first jobs while the remaining folders are still being
+            # listed, and finished output is printed as soon as it arrives (or its turn comes)
+            for (ticket, job), output in self._map_unordered(
+                lambda item: self._get_job_console_output(server, item[1]),
+                ((self._reserve_ticket(), self._add_folder(job)) for job in jobs),
+            ):
+                self._print_result(job, output, ticket)
 
-            if not jobs_exist:
+            if not self.jobs_exist:
                 self.logging.fatal(
                     "%s: No Jobs or Unable to see Jobs on Server.", self._get_username(cred)
                 )
-
-            for t in threads:
-                t.join()
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
                 self.logging.fatal(
@@ -90,66 +101,193 @@ class ConsoleOutput(BasePlugin):
             self.logging.exception("")
             exit(1)
 
-    def _get_job_console_output(self, server):
-        while True:
-            job = self.jobs_queue.get()
+    def _get_job_console_output(self, server, job):
+        try:
+            return self._get_console_output(server, job)
+        except Exception:
+            print(job["folder"], "failed", file=sys.stderr)
+            return None
 
-            if job is None:
-                break
+    def _add_folder(self, job):
+        job["folder"] = urlparse(job["url"]).path[len(self.server_url.path) :]
+
+        return job
+
+    def _reserve_ticket(self):
+        if self._reorder_buffer is None:
+            return None
+
+        return self._reorder_buffer.reserve()
+
+    def _print_result(self, job, output, ticket=None):
+        if output:
+            self.jobs_exist = True
+            self._output_console_output(job, *output, ticket=ticket)
+        else:
+            print("%s has no builds" % (job["folder"]), file=sys.stderr)
+
+            if ticket is not None:
+                self._reorder_buffer.write_record(ticket, None)
+
+    def _build_fields(self):
+        """Tree fields prefetched with the job list so workers need no per-job metadata requests"""
 
+        build_attempts = getattr(self.args, "build_attempts", 3)
+
+        # If build_attempts is -1, fetch all builds Jenkins returns
+        builds_range = "{0,%d}" % build_attempts if build_attempts > 0 else ""
+
+        return "lastBuild[number,result],builds[number,result]" + builds_range
+
+    def _get_console_output(self, server, job):
+        """Retrieve console output of the first usable build of a job
+
+        :returns: Tuple of build number and console output (``bytes``, or a spooled file when
+                  streaming) or None
+        """
+
+        if not job.get("lastBuild"):
+            # No builds exist for this job (or it is a folder)
+            return None
+
+        for build_number in self._builds_to_try(job):
             try:
-                # First, try to get job info to see if there are any builds
-                job_info = server.get_job_info(job["fullname"])
-                
-                if job_info.get("builds"):
-                    # No builds exist for this job
-                    self.results_queue.put(None)
-                    continue
-                
-                # Try to get console output from the last build
-                console = None
-                build_number = None
-                build_attempts = getattr(self.args, 'build_attempts', 3)
-                include_failed = getattr(self.args, 'include_failed', False)
-                
-                # First try lastBuild
-                try:
-                    console = server.get_build_console_output(job["folder"], "lastBuild")
-                    build_number = "lastBuild"
-                except jenkinslib.JenkinsException:
-                    # If lastBuild fails, try the most recent build numbers
-                    builds_to_try = job_info["builds"]
-                    if build_attempts > 0:
-                        builds_to_try = job_info["builds"][:build_attempts]
-                    # If build_attempts is -1, try all builds
-                    
-                    for build in builds_to_try:
-                        try:
-                            # Check if we should skip failed builds
-                            if not include_failed:
-                                build_info = server.get_build_info(job["fullname"], build["number"])
-                                if build_info.get("result") != "SUCCESS":
-                                    continue
-                            
-                            build_number = build["number"]
-                            console = server.get_build_console_output(job["folder"], build_number)
-                            break
-                        except jenkinslib.JenkinsException:
-                            continue
-                
-                if console:
-                    output = "Job: %s (Build: %s)\n\n" % (job["url"], build_number)
-                    output = output + console
-                    self.results_queue.put(output)
+                return self._read_build_console_output(server, job, build_number)
+            except jenkinslib.JenkinsException:
+                continue
+
+        # No console output could be retrieved
+        return None
+
+    def _builds_to_try(self, job):
+        """Yield the last build number, then the most recent build numbers allowed by the arguments"""
+
+        # Numbered URLs (unlike the lastBuild alias) keep pointing at the same log
+        yield job["lastBuild"]["number"]
+
+        build_attempts = getattr(self.args, "build_attempts", 3)
+        include_failed = getattr(self.args, "include_failed", False)
+
+        # If build_attempts is -1, try all builds
+        builds_to_try = job.get("builds") or []
+        if build_attempts > 0:
+            builds_to_try = builds_to_try[:build_attempts]
+
+        for build in builds_to_try:
+            # lastBuild was already tried
+            if build["number"] == job["lastBuild"]["number"]:
+                continue
+
+            # Check if we should skip failed builds
+            if not include_failed and build.get("result") != "SUCCESS":
+                continue
+
+            yield build["number"]
+
+    def _is_completed(self, job, build_number):
+        """Return True if the prefetched metadata shows the build has finished"""
+
+        for build in [job["lastBuild"]] + (job.get("builds") or []):
+            if build["number"] == build_number:
+                return build.get("result") is not None
+
+        return False
+
+    def _read_build_console_output(self, server, job, build_number):
+        if not getattr(self.args, "stream", False):
+            # The log is passed through to stdout as is, it is never decoded
+            return build_number, server.get_build_console_output(
+                job["folder"],
+                build_number,
+                completed=self._is_completed(job, build_number),
+                as_bytes=True,
+            )
+
+        # Small logs stay in memory, large ones spill to disk instead of piling up in the worker pool
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_LIMIT)
+
+        try:
+            server.stream_build_console_output(job["folder"], build_number, spool)
+        except Exception:
+            spool.close()
+            raise
+
+        spool.seek(0)
+        return build_number, spool
+
+    def _output_console_output(self, job, build_number, output, ticket=None):
+        if self.sink is not None:
+            if not isinstance(output, (bytes, str)):
+                with output:
+                    output = output.read()
+
+            self.output({"job": job["url"], "build": build_number, "output": output})
+            return
+
+        # The log (bytes, or a spooled file copied by the writer thread) is written as is,
+        # together with its header so that records from different jobs never interleave
+        record = [
+            SEPARATOR + "Job: %s (Build: %s)\n\n" % (job["url"], build_number),
+            output,
+            "\n" + SEPARATOR,
+        ]
+
+        if ticket is not None:
+            self._reorder_buffer.write_record(ticket, record)
+        else:
+            self.output_sink.write_record(record)
+
+    def _get_all_console_output_async(self, server, jobs):
+        """Fetch console output for every job from one event loop instead of worker threads.
+
+        :returns: True if any job had console output
+        """
+
+        # asyncio is only imported when the asynchronous transport is used
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+
+        try:
+            return loop.run_until_complete(self._async_console_output_main(server, jobs))
+        finally:
+            loop.close()
+
+    async def _async_console_output_main(self, server, jobs):
+        jobs_exist = False
+
+        async with jenkinslib.AsyncJenkins(server, self.args.thread_number) as async_server:
+            async for job, output in async_server.scheduler.imap_unordered(
+                lambda job: self._get_job_console_output_async(async_server, job), jobs
+            ):
+                if output:
+                    jobs_exist = True
+                    self._output_console_output(job, *output)
                 else:
-                    # No console output could be retrieved
-                    self.results_queue.put(None)
+                    print("%s has no builds" % (job["folder"]), file=sys.stderr)
+
+        return jobs_exist
+
+    async def _get_job_console_output_async(self, server, job):
+        """Coroutine equivalent of _get_console_output
+
+        :returns: Tuple of job and a tuple of build number and console output (or None)
+        """
 
+        if not job.get("lastBuild"):
+            return job, None
+
+        for build_number in self._builds_to_try(job):
+            try:
+                console = await server.get_build_console_output(job["folder"], build_number)
+                return job, (build_number, console)
+            except jenkinslib.JenkinsException:
+                continue
             except Exception:
-                print(job["folder"], "failed")
-                self.results_queue.put(None)
+                print(job["folder"], "failed", file=sys.stderr)
+                break
 
-            self.jobs_queue.task_done()
+        return job, None
 
 
 class ConsoleOutputParser:
@@ -182,13 +320,44 @@ class ConsoleOutputParser:
             required=False,
         )
 
+        self.parser.add_argument(
+            "-A",
+            "--async",
+            help="Use the asyncio transport: one thread with up to <Threads> requests in flight (requires aiohttp)",
+            action="store_true",
+            dest="use_async",
+            required=False,
+        )
+
+        self.parser.add_argument(
+            "-O",
+            "--ordered",
+            help="Print console output in the order jobs are listed rather than as it arrives",
+            action="store_true",
+            dest="ordered",
+            required=False,
+        )
+
+        self.parser.add_argument(
+            "-S",
+            "--stream",
+            help="Stream logs via progressiveText and spool large ones to disk instead of holding them in memory",
+            action="store_true",
+            dest="stream",
+            required=False,
+        )
+
         args = self.parser.parse_args()
 
+        for flag, enabled in (("-S", args.stream), ("-O", args.ordered)):
+            if args.use_async and enabled:
+                self.parser.fail("Cannot specify both -A and %s at the same time." % flag)
+
         self._validate_server_url(args)
         self._validate_thread_number(args)
         self._validate_timeout_number(args)
         self._validate_output_file(args)
-        
+
         # Validate build_attempts
         if args.build_attempts < -1 or args.build_attempts == 0:
             self.logging.fatal("Build attempts must be -1 (for all builds) or a positive number")
@@ -19,7 +19,7 @@ class CreateAPIToken(BasePlugin):
                 token_name=self.args.token_name, selected_username=self.args.user_name
             )
 
-            print("Your new API Token is: {0}".format(result))
+            self.output(result, "Your new API Token is: {0}".format(result))
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
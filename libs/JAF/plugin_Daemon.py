@@ -0,0 +1,333 @@
+import getpass
+import importlib
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+
+from libs import jenkinslib, quik
+
+from . import DaemonClient, _available_commands, run_command
+from .BasePlugin import CommandContext, _logging_fatal
+
+
+class _StreamProxy:
+    """Stands in for sys.stdout or sys.stderr and writes to the stream of the current request
+
+    Loggers and anything else holding on to sys.stdout/sys.stderr across requests end up
+    writing to whichever client is being served, or to the daemon's own stream in between.
+    """
+
+    def __init__(self, stream):
+        self.default = stream
+        self.target = stream
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+# Raised instead of prompting, as a prompt would read from the daemon's own terminal
+NO_INPUT_MESSAGE = (
+    "Commands run by the JAF daemon cannot prompt for input. Unset %s to run this "
+    "command locally." % DaemonClient.SOCKET_ENV
+)
+
+
+class _NoInput(io.TextIOBase):
+    """Stands in for sys.stdin, failing every read with NO_INPUT_MESSAGE"""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        raise EOFError(NO_INPUT_MESSAGE)
+
+    def readline(self, size=-1):
+        raise EOFError(NO_INPUT_MESSAGE)
+
+
+def _no_getpass(prompt="Password: ", stream=None):
+    raise EOFError(NO_INPUT_MESSAGE)
+
+
+class _FrameWriter(io.RawIOBase):
+    """Raw stream sending everything written to it as frames of one channel to a client"""
+
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.client.send(self.channel, bytes(data))
+
+        return len(data)
+
+
+class _Client:
+    """Connection of one client, shared by its stdout and stderr channels"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.connected = True
+
+        self._lock = threading.Lock()
+
+    def send(self, channel, payload):
+        with self._lock:
+            if not self.connected:
+                # The client went away, the command still runs to completion
+                return
+
+            try:
+                self.connection.sendall(
+                    DaemonClient.FRAME_HEADER.pack(channel, len(payload)) + payload
+                )
+            except OSError:
+                self.connected = False
+
+    def text_stream(self, channel, **kwargs):
+        return io.TextIOWrapper(
+            io.BufferedWriter(_FrameWriter(self, channel), jenkinslib.STREAM_CHUNK_SIZE),
+            encoding="utf-8",
+            errors="replace",
+            **kwargs,
+        )
+
+
+class Daemon:
+    """Class for managing Daemon SubCommand
+
+    Every command that jaf.py forwards (see DaemonClient) runs in this process, one at a
+    time, so imports, compiled templates, keep-alive connections (and their TLS
+    sessions) and the crumbs and auth schemes memoized by jenkinslib carry over from one
+    command to the next. Commands still run one after another, because plugins share
+    sys.stdout and module level state. Each command runs in the client's working directory
+    and with the client's proxy and CA bundle settings (DaemonClient.FORWARDED_ENV), but
+    cannot read the client's stdin or prompt for input.
+    """
+
+    def __init__(self, args):
+        self.args = args
+
+        self.stdout = _StreamProxy(sys.stdout)
+        self.stderr = _StreamProxy(sys.stderr)
+
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+
+        # Set up logging before any plugin does, so that it writes to the proxy
+        logging.basicConfig(format="%(asctime)s - %(message)s")
+
+        self.logging = logging.getLogger()
+        self.logging.fatal = _logging_fatal
+
+        if not hasattr(socket, "AF_UNIX"):
+            self.logging.fatal("The daemon needs Unix domain sockets, which are not available.")
+
+        for command in _available_commands():
+            importlib.import_module("libs.JAF.plugin_" + command)
+
+        listener = self._listen(self.args.socket_path)
+
+        # Commands may exit() at will, so stop on SIGTERM as on Ctrl-C and remove the socket
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        print(
+            "JAF daemon (pid %d) listening on %s. Set %s=%s to use it."
+            % (os.getpid(), self.args.socket_path, DaemonClient.SOCKET_ENV, self.args.socket_path),
+            file=sys.stderr,
+        )
+
+        try:
+            with listener:
+                while True:
+                    connection, _ = listener.accept()
+                    self._serve(connection)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(self.args.socket_path)
+
+    def _listen(self, path):
+        if os.path.exists(path):
+            if self._is_listening(path):
+                self.logging.fatal("A JAF daemon is already listening on %s", path)
+
+            # Left behind by a daemon that was killed
+            os.remove(path)
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        # Only the owner may connect, as commands run with the daemon's privileges
+        umask = os.umask(0o177)
+
+        try:
+            listener.bind(path)
+        except OSError as ex:
+            listener.close()
+            self.logging.fatal("Unable to listen on %s: %s", path, ex)
+        finally:
+            os.umask(umask)
+
+        listener.listen(128)
+
+        return listener
+
+    def _is_listening(self, path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+                return True
+            except OSError:
+                return False
+
+    def _serve(self, connection):
+        with connection:
+            try:
+                with connection.makefile("rb") as f:
+                    request = json.loads(f.readline().decode("utf-8"))
+
+                argv = [str(arg) for arg in request["argv"]]
+                cwd = str(request["cwd"])
+                env = {
+                    name: str(value)
+                    for name, value in request.get("env", {}).items()
+                    if name in DaemonClient.FORWARDED_ENV
+                }
+            except (ValueError, KeyError, TypeError, AttributeError, OSError):
+                return
+
+            client = _Client(connection)
+            stdout = client.text_stream(DaemonClient.STDOUT)
+            stderr = client.text_stream(DaemonClient.STDERR, line_buffering=True)
+
+            exit_code = self._run(argv, cwd, env, stdout, stderr)
+
+            for stream in (stdout, stderr):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+
+            client.send(DaemonClient.EXIT, str(exit_code).encode("ascii"))
+
+    def _run(self, argv, cwd, env, stdout, stderr):
+        """Run one command as jaf.py would, with its output going to the client
+
+        :param env: The client's values of the DaemonClient.FORWARDED_ENV variables, ``dict``
+        :returns: Exit code of the command, ``int``
+        """
+
+        saved_argv, saved_cwd, saved_stdin = sys.argv, os.getcwd(), sys.stdin
+        saved_getpass = getpass.getpass
+        saved_env = {name: os.environ.get(name) for name in DaemonClient.FORWARDED_ENV}
+
+        self.stdout.target = stdout
+        self.stderr.target = stderr
+
+        # The previous command may have enabled these, plugins only ever turn them on
+        jenkinslib.configure_response_cache(None)
+        quik.configure_compiled_cache(None)
+
+        context = CommandContext()
+        exit_code = 0
+
+        try:
+            sys.argv = saved_argv[:1] + argv
+            sys.stdin = _NoInput()
+            getpass.getpass = _no_getpass
+            self._set_environment({name: env.get(name) for name in DaemonClient.FORWARDED_ENV})
+            os.chdir(cwd)
+
+            with context:
+                run_command()
+        except SystemExit as ex:
+            if ex.code is None or isinstance(ex.code, int):
+                exit_code = ex.code or 0
+            else:
+                print(ex.code, file=sys.stderr)
+                exit_code = 1
+        except EOFError as ex:
+            # Most likely a prompt, see _NoInput
+            print(ex, file=sys.stderr)
+            exit_code = 1
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            try:
+                context.run_exit_handlers()
+                jenkinslib.get_background_executor().shutdown()
+            except Exception:
+                traceback.print_exc()
+
+            self._restore_stream("stdout", self.stdout)
+            self._restore_stream("stderr", self.stderr)
+
+            self.stdout.target = self.stdout.default
+            self.stderr.target = self.stderr.default
+
+            sys.argv, sys.stdin = saved_argv, saved_stdin
+            getpass.getpass = saved_getpass
+            self._set_environment(saved_env)
+            os.chdir(saved_cwd)
+
+        return exit_code
+
+    def _set_environment(self, values):
+        """Set the environment variables in values, removing those whose value is None"""
+
+        for name, value in values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    def _restore_stream(self, name, proxy):
+        """Put proxy back as sys.<name>, closing an output file a plugin may have opened"""
+
+        stream = getattr(sys, name)
+
+        if stream is not self.stdout and stream is not self.stderr:
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+
+        setattr(sys, name, proxy)
+
+
+class DaemonParser:
+    def cmd_Daemon(self):
+        """Handles parsing of Daemon Subcommand arguments"""
+
+        self._create_contextual_parser(
+            "Daemon", "Run commands forwarded by jaf.py, keeping sessions to servers warm"
+        )
+
+        self.parser.add_argument(
+            "-S",
+            "--socket",
+            metavar="<Socket Path>",
+            help="Unix domain socket to listen on. Defaults to: $%s or %s"
+            % (DaemonClient.SOCKET_ENV, DaemonClient.DEFAULT_SOCKET),
+            action="store",
+            dest="socket_path",
+            required=False,
+        )
+
+        args = self.parser.parse_args()
+
+        args.socket_path = os.path.abspath(
+            os.path.expanduser(args.socket_path or DaemonClient.default_socket_path())
+        )
+
+        return args
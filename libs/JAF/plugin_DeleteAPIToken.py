@@ -18,23 +18,22 @@ class DeleteAPIToken(BasePlugin):
             if not self.args.token_name:
                 tokens = server.list_api_tokens(self.args.user_name)
 
-                print("Current API Tokens:")
-
-                for i, token in enumerate(tokens):
-                    print(
-                        "\tToken Name: {0}\n\tCreate Date: {1}\n\tUUID: {2}".format(
-                            token["name"], token["creation_date"], token["uuid"]
-                        )
+                listing = "\n\n".join(
+                    "\tToken Name: {0}\n\tCreate Date: {1}\n\tUUID: {2}".format(
+                        token["name"], token["creation_date"], token["uuid"]
                     )
-                    if i != len(tokens) - 1:
-                        print("")
+                    for token in tokens
+                )
 
-                if len(tokens) == 0:
-                    print("\tThere are no API tokens for this user.")
+                self.output(
+                    tokens,
+                    "Current API Tokens:\n"
+                    + (listing or "\tThere are no API tokens for this user."),
+                )
             else:
                 server.delete_api_token(self.args.token_name, self.args.user_name)
 
-                print("Token Deleted Successfully.")
+                self.output({"deleted": self.args.token_name}, "Token Deleted Successfully.")
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
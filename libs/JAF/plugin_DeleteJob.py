@@ -1,8 +1,11 @@
+import sys
+import time
+
 import requests.exceptions as req_exc
 
 from libs import jenkinslib
 
-from .BasePlugin import BasePlugin, HijackStdOut
+from .BasePlugin import BasePlugin
 
 
 class NonCriticalException(Exception):
@@ -15,13 +18,15 @@ class DeleteJob(BasePlugin):
     def __init__(self, args):
         super().__init__(args)
 
+        self._last_progress = 0
+
         cred = self.args.credentials[0]
         server = self._get_jenkins_server(cred)
 
         try:
             server.delete_job(self.args.task_name)
 
-            print("Successfully deleted the job.")
+            self.output({"deleted": self.args.task_name}, "Successfully deleted the job.")
             return
         except (
             jenkinslib.JenkinsException,
@@ -29,17 +34,24 @@ class DeleteJob(BasePlugin):
             req_exc.ConnectionError,
             req_exc.HTTPError,
         ):
-            with HijackStdOut():
-                print(
-                    "WARNING: Unable to delete the job, attempting secondary clean-up.  You should double check."
-                )
+            print(
+                "WARNING: Unable to delete the job, attempting secondary clean-up.  You should double check.",
+                file=sys.stderr,
+            )
 
         # We were unable to delete the the task, so we need to do secondary clean-up as best we can:
         # First we delete all console output and run history:
         try:
-            server.delete_all_job_builds(self.args.task_name)
+            server.delete_all_job_builds(
+                self.args.task_name, workers=self.args.thread_number, progress=self._progress
+            )
+        except jenkinslib.JenkinsException as ex:
+            print(str(ex), file=sys.stderr)
+
+            print(
+                "WARNING: Unable to clean-up console output.  You should definitely try to do this yourself."
+            )
         except (
-            jenkinslib.JenkinsException,
             req_exc.SSLError,
             req_exc.ConnectionError,
             req_exc.HTTPError,
@@ -76,13 +88,26 @@ class DeleteJob(BasePlugin):
 
         exit(1)
 
+    def _progress(self, deleted, failed, total):
+        # Report at most about once a second, and always when done
+        now = time.monotonic()
+
+        if deleted + failed < total and now - self._last_progress < 1:
+            return
+
+        self._last_progress = now
+
+        print(
+            "Deleted {0} of {1} builds ({2} failed)".format(deleted, total, failed), file=sys.stderr
+        )
+
 
 class DeleteJobParser:
     def cmd_DeleteJob(self):
         """Handles parsing of DeleteJob Subcommand arguments"""
 
         self._create_contextual_parser("DeleteJob", "Delete Jenkins Jobs")
-        self._add_common_arg_parsers()
+        self._add_common_arg_parsers(allows_threading=True)
 
         self.parser.add_argument(
             metavar="<Task Name>", help="Task to Delete", action="store", dest="task_name"
@@ -91,6 +116,7 @@ class DeleteJobParser:
         args = self.parser.parse_args()
 
         self._validate_server_url(args)
+        self._validate_thread_number(args)
 
         return_data = self._handle_authentication(args)
 
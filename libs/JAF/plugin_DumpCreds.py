@@ -35,7 +35,7 @@ class DumpCreds(BasePlugin):
                 result,
             ).strip()
 
-            print(result)
+            self.output(result)
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
                 self.logging.fatal(
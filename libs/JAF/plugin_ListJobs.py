@@ -30,10 +30,14 @@ class ListJobs(BasePlugin):
                 )
                 return
 
-            jobs = server.get_all_jobs()
+            if getattr(self.args, "unordered", False):
+                # Jobs are printed as soon as the folder listing them has been fetched
+                jobs = server.iter_all_jobs(workers=self.args.thread_number)
+            else:
+                jobs = server.get_all_jobs(workers=self.args.thread_number)
 
             for job in jobs:
-                print(urlparse(job["url"]).path[len(self.server_url.path) :])
+                self.output(job, urlparse(job["url"]).path[len(self.server_url.path) :])
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
@@ -70,12 +74,22 @@ class ListJobsParser:
         """Handles parsing of ListJobs Subcommand arguments"""
 
         self._create_contextual_parser("ListJobs", "Get List of All Jenkins Job Names")
-        self._add_common_arg_parsers()
+        self._add_common_arg_parsers(allows_threading=True)
+
+        self.parser.add_argument(
+            "-U",
+            "--unordered",
+            help="Print jobs as soon as their folder has been fetched instead of breadth-first",
+            action="store_true",
+            dest="unordered",
+            required=False,
+        )
 
         args = self.parser.parse_args()
 
         self._validate_server_url(args)
         self._validate_timeout_number(args)
+        self._validate_thread_number(args)
         self._validate_output_file(args)
 
         return self._handle_authentication(args)
@@ -15,21 +15,34 @@ class RunCommand(BasePlugin):
         super().__init__(args)
 
         loader = quik.FileLoader(os.path.join("data", "groovy"))
-        cmd_template = loader.load_template("run_command_template.groovy")
-
-        cmd = cmd_template.render(
-            {"command": self.args.system_command.replace("\\", "\\\\").replace('"', '\\"')}
-        )
+        self.cmd_template = loader.load_template("run_command_template.groovy")
 
         try:
             cred = self.args.credentials[0]
             server = self._get_jenkins_server(cred)
 
-            result = server.execute_script(cmd, not self.args.no_wait, node=self.args.node)
+            if self.args.batch_file:
+                commands = self._read_batch_file(self.args.batch_file)
+                results = server.execute_script_batch(
+                    [self._render_command(command) for command in commands],
+                    not self.args.no_wait,
+                    node=self.args.node,
+                )
+
+                if not self.args.no_wait:
+                    for result in results:
+                        result["output"] = self._clean_output(result["output"])
+
+                    self._print_batch_results(commands, results)
+            else:
+                result = server.execute_script(
+                    self._render_command(self.args.system_command),
+                    not self.args.no_wait,
+                    node=self.args.node,
+                )
 
-            if result:
-                result = re.sub(r"[\r\n][\r\n]{2,}", "\n\n", result).strip()
-                print(result)
+                if result and not self.args.no_wait:
+                    self.output(self._clean_output(result))
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
@@ -57,10 +70,21 @@ class RunCommand(BasePlugin):
                 + (self.server_url.netloc if len(self.server_url.netloc) > 0 else self.args.server)
             )
 
+        except OSError:
+            self.logging.fatal("Specified Batch File does not exist or is not accessible.")
+
         except Exception:
             self.logging.exception("")
             exit(1)
 
+    def _render_command(self, command):
+        return self.cmd_template.render(
+            {"command": command.replace("\\", "\\\\").replace('"', '\\"')}
+        )
+
+    def _clean_output(self, output):
+        return re.sub(r"[\r\n][\r\n]{2,}", "\n\n", output).strip()
+
 
 class RunCommandParser:
     def cmd_RunCommand(self):
@@ -90,11 +114,22 @@ class RunCommandParser:
             required=False,
         )
 
+        self.parser.add_argument(
+            "-B",
+            "--batch",
+            metavar="<Batch File>",
+            help="File with one System Command per line, all run in a single request",
+            action="store",
+            dest="batch_file",
+            required=False,
+        )
+
         self.parser.add_argument(
             metavar="<System Command>",
             help="System Command To Run",
             action="store",
             dest="system_command",
+            nargs="?",
         )
 
         args = self.parser.parse_args()
@@ -103,4 +138,12 @@ class RunCommandParser:
         self._validate_timeout_number(args)
         self._validate_output_file(args)
 
-        return self._handle_authentication(args)
+        return_data = self._handle_authentication(args)
+
+        if bool(args.batch_file) == bool(args.system_command):
+            self.parser.fail("Specify either a System Command or a Batch File.")
+
+        if args.batch_file and not self._file_accessible(args.batch_file):
+            self.parser.fail("Specified Batch File does not exist or cannot be accessed.")
+
+        return return_data
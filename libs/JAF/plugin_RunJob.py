@@ -1,8 +1,9 @@
 import base64
+import io
 import os
 import random
 import string
-import time
+import sys
 import xml.sax.saxutils
 import zlib
 
@@ -10,7 +11,7 @@ import requests.exceptions as req_exc
 
 from libs import jenkinslib, quik
 
-from .BasePlugin import BasePlugin, HijackStdOut
+from .BasePlugin import BasePlugin
 
 
 def xmlescape(data):
@@ -24,13 +25,14 @@ class NonCriticalException(Exception):
 class RunJob(BasePlugin):
     """Class for managing RunJob SubCommand"""
 
-    template_cache = None
-
     def __init__(self, args):
         super().__init__(args)
 
         state = 1
 
+        # Printed by ghost job payloads once they are ready for the build to be stopped
+        self.ready_marker = "".join(random.choices(string.ascii_letters + string.digits, k=16))
+
         try:
             cred = self.args.credentials[0]
             server = self._get_jenkins_server(cred)
@@ -131,7 +133,7 @@ class RunJob(BasePlugin):
             Step 4: Start the job
             """
 
-            server.build_job(self.args.task_name)
+            queue_item = server.build_job(self.args.task_name)
             state += 1
 
             """
@@ -139,22 +141,23 @@ class RunJob(BasePlugin):
             """
 
             if not self.args.no_wait:
-                while True:
-                    time.sleep(1)
-                    try:
-                        results = server.get_build_info(self.args.task_name, "lastBuild")
-                        break
-                    except jenkinslib.JenkinsException:
-                        pass
-
-                job_id = results["id"]
-
                 if self.args.ghost:
-                    time.sleep(3)
+                    # The payload prints the marker once it survives the build being stopped
+                    tracker = server.track_build(self.args.task_name, queue_item)
+
+                    if not tracker.wait_for_output(self.ready_marker):
+                        # The build finished, so the payload is not running in the background
+                        self.logging.fatal(
+                            "The ghost job payload never became ready, build %s finished without it.",
+                            tracker.number,
+                        )
                 else:
-                    while results["building"]:
-                        time.sleep(3)
-                        results = server.get_build_info(self.args.task_name, "lastBuild")
+                    log = sys.stdout.buffer if self.sink is None else io.BytesIO()
+                    tracker = server.track_build(self.args.task_name, queue_item, sink=log)
+                    tracker.wait_for_completion()
+
+                    if self.sink is not None:
+                        self.output(log.getvalue())
 
             state += 1
 
@@ -162,20 +165,11 @@ class RunJob(BasePlugin):
             Step 6: Retrieve Results or Terminate Job (Depending on options)
             """
 
-            if not self.args.no_wait:
-                if self.args.ghost:
-                    server.stop_build(self.args.task_name, job_id)
-                    with HijackStdOut():
-                        print("Job should be successfully running.")
-                else:
-                    print(
-                        server.get_build_console_output(
-                            "job/" + self.args.task_name + "/", "lastBuild"
-                        )
-                    )
-            else:
-                with HijackStdOut():
-                    print("Job should be successfully running.")
+            if self.args.ghost:
+                server.stop_build(self.args.task_name, tracker.number)
+
+            if self.args.ghost or self.args.no_wait:
+                print("Job should be successfully running.", file=sys.stderr)
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
@@ -203,8 +197,7 @@ class RunJob(BasePlugin):
             )
 
         except NonCriticalException as ex:
-            with HijackStdOut():
-                print(str(ex))
+            print(str(ex), file=sys.stderr)
 
         except Exception:
             self.logging.exception("")
@@ -213,10 +206,10 @@ class RunJob(BasePlugin):
         finally:
             # Do Cleanup
             if self.args.no_wait:
-                with HijackStdOut():
-                    print(
-                        "WARNING: Unable to delete the job, do to -x option.  You need to manually go do cleanup."
-                    )
+                print(
+                    "WARNING: Unable to delete the job, do to -x option.  You need to manually go do cleanup.",
+                    file=sys.stderr,
+                )
             elif state > 3:
                 try:
                     server.delete_job(self.args.task_name)
@@ -227,10 +220,10 @@ class RunJob(BasePlugin):
                     req_exc.ConnectionError,
                     req_exc.HTTPError,
                 ):
-                    with HijackStdOut():
-                        print(
-                            "WARNING: Unable to delete the job, attempting secondary clean-up.  You should double check."
-                        )
+                    print(
+                        "WARNING: Unable to delete the job, attempting secondary clean-up.  You should double check.",
+                        file=sys.stderr,
+                    )
 
                 # We were unable to delete the the task, so we need to do secondary clean-up as best we can:
                 # First we delete all console output and run history:
@@ -276,6 +269,7 @@ class RunJob(BasePlugin):
                     )
 
     def _posix_payload(self):
+        ready_marker = self.ready_marker
         file_name = "".join(random.choices(string.ascii_letters + string.digits, k=8))
 
         if "." in self.args.script_path:
@@ -302,6 +296,7 @@ class RunJob(BasePlugin):
         return cmd_template.render(locals())
 
     def _windows_payload(self):
+        ready_marker = self.ready_marker
         file_name = "".join(random.choices(string.ascii_letters + string.digits, k=8))
 
         if "." in self.args.script_path:
@@ -444,31 +439,19 @@ class RunJobParser:
         return_data = self._handle_authentication(args)
 
         if not self._file_accessible(args.script_path):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print("\nError: Specified Script File does not exist or cannot be accessed.")
-                exit(1)
+            self.parser.fail("Specified Script File does not exist or cannot be accessed.")
 
         if args.no_wait and args.ghost:
-            with HijackStdOut():
-                self.parser.print_usage()
-                print("\nError: Cannot specify both -g and -x at the same time.")
-                exit(1)
+            self.parser.fail("Cannot specify both -g and -x at the same time.")
 
         if not args.task_name or any(
             x not in (string.ascii_letters + string.digits + "/") for x in args.task_name
         ):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print(
-                    "\nError: Task Name must be alphanumeric string with optional subfolder pathing via forward slashes."
-                )
-                exit(1)
+            self.parser.fail(
+                "Task Name must be alphanumeric string with optional subfolder pathing via forward slashes."
+            )
 
         if (args.node and not args.node_type) or (args.node_type and not args.node):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print("\nError: You must either specify both Node and Node Type or neither")
-                exit(1)
+            self.parser.fail("You must either specify both Node and Node Type or neither")
 
         return return_data
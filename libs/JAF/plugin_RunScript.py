@@ -1,8 +1,10 @@
+import os
+
 import requests.exceptions as req_exc
 
 from libs import jenkinslib
 
-from .BasePlugin import BasePlugin, HijackStdOut
+from .BasePlugin import BasePlugin
 
 
 class RunScript(BasePlugin):
@@ -15,11 +17,30 @@ class RunScript(BasePlugin):
             cred = self.args.credentials[0]
             server = self._get_jenkins_server(cred)
 
-            with open(self.args.script_path) as f:
-                result = server.execute_script(f.read(), not self.args.no_wait, node=self.args.node)
+            if self.args.batch_file:
+                script_paths = self._read_batch_file(self.args.batch_file)
+                batch_directory = os.path.dirname(self.args.batch_file)
+                scripts = []
+
+                for script_path in script_paths:
+                    # Relative paths are relative to the batch file, not the working directory
+                    with open(os.path.join(batch_directory, script_path)) as f:
+                        scripts.append(f.read())
+
+                results = server.execute_script_batch(
+                    scripts, not self.args.no_wait, node=self.args.node
+                )
+
+                if not self.args.no_wait:
+                    self._print_batch_results(script_paths, results)
+            else:
+                with open(self.args.script_path) as f:
+                    result = server.execute_script(
+                        f.read(), not self.args.no_wait, node=self.args.node
+                    )
 
-                if result:
-                    print(result)
+                    if result and not self.args.no_wait:
+                        self.output(result)
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
@@ -48,7 +69,9 @@ class RunScript(BasePlugin):
             )
 
         except OSError:
-            self.logging.fatal("Specified Groovy Script does not exist or is not accessible.")
+            self.logging.fatal(
+                "Specified Groovy Script or Batch File does not exist or is not accessible."
+            )
 
         except Exception:
             self.logging.exception("")
@@ -83,11 +106,22 @@ class RunScriptParser:
             required=False,
         )
 
+        self.parser.add_argument(
+            "-B",
+            "--batch",
+            metavar="<Batch File>",
+            help="File with one Groovy File Path per line, all run in a single request",
+            action="store",
+            dest="batch_file",
+            required=False,
+        )
+
         self.parser.add_argument(
             metavar="<Groovy File Path>",
             help="Groovy File Path to Run via Script Console",
             action="store",
             dest="script_path",
+            nargs="?",
         )
 
         args = self.parser.parse_args()
@@ -98,10 +132,13 @@ class RunScriptParser:
 
         return_data = self._handle_authentication(args)
 
-        if not self._file_accessible(args.script_path):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print("\nError: Specified Groovy File does not exist or cannot be accessed.")
-                exit(1)
+        if bool(args.batch_file) == bool(args.script_path):
+            self.parser.fail("Specify either a Groovy File Path or a Batch File.")
+
+        if args.batch_file and not self._file_accessible(args.batch_file):
+            self.parser.fail("Specified Batch File does not exist or cannot be accessed.")
+
+        if args.script_path and not self._file_accessible(args.script_path):
+            self.parser.fail("Specified Groovy File does not exist or cannot be accessed.")
 
         return return_data
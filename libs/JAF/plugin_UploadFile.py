@@ -1,10 +1,206 @@
 import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
 
 import requests.exceptions as req_exc
 
-from libs import jenkinslib
+from libs import jenkinslib, quik
 
-from .BasePlugin import BasePlugin, HijackStdOut
+from .BasePlugin import BasePlugin
+
+# Chunks start at a size known to fit in a scriptText request, then adapt to request times
+INITIAL_CHUNK_SIZE = 45000
+MIN_CHUNK_SIZE = 4096
+DEFAULT_MAX_CHUNK_SIZE = 128 * 1024
+
+# Chunk sizes are chosen so that a single chunk request takes about this long
+TARGET_CHUNK_SECONDS = 2.0
+
+# Compressed chunks may cover at most this many times the raw bytes of an uncompressed one
+MAX_COMPRESSION_GAIN = 16
+
+# Chunks are written to "<Upload File Path>.jafpart.<offset>" and joined once all arrived
+PART_SUFFIX = ".jafpart."
+
+# The manifest of an upload defaults to "<Upload File>.jafupload"
+MANIFEST_SUFFIX = ".jafupload"
+MANIFEST_VERSION = 1
+
+# Acknowledged chunks are written to the manifest at most this often (and when done)
+MANIFEST_SAVE_INTERVAL = 1.0
+
+
+class UploadError(Exception):
+    pass
+
+
+def _groovy_string(value):
+    """Escape value for use in a single quoted Groovy string"""
+
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+class _ChunkSizer:
+    """Picks the size of the next chunk from how long previous chunk requests took
+
+    Sizes are in bytes sent, i.e. after compression. Sizes grow (at most doubling each time)
+    while requests finish faster than TARGET_CHUNK_SECONDS and shrink when they take longer.
+    A failed request halves the size and cuts the ceiling to three quarters of the failed
+    size, as the usual cause is the server's limit on the size of form submissions. From
+    then on sizes never grow past the largest size that went through, so the limit is not
+    probed again and again.
+    """
+
+    def __init__(self, maximum):
+        self.lock = threading.Lock()
+        self.limit = maximum
+        self.size = min(INITIAL_CHUNK_SIZE, maximum)
+        self.failures = 0
+
+        # Largest size that succeeded since the last failure
+        self.largest_success = 0
+
+    def next_size(self):
+        with self.lock:
+            return self.size
+
+    def succeeded(self, size, seconds):
+        with self.lock:
+            self.largest_success = max(self.largest_success, size)
+
+            ceiling = self.limit
+
+            if self.failures:
+                ceiling = min(ceiling, max(MIN_CHUNK_SIZE, self.largest_success))
+
+            factor = min(2.0, TARGET_CHUNK_SECONDS / max(seconds, 0.001))
+            self.size = int(max(MIN_CHUNK_SIZE, min(ceiling, max(size, self.size) * factor)))
+
+    def failed(self, size):
+        with self.lock:
+            self.failures += 1
+            self.largest_success = 0
+            self.limit = max(MIN_CHUNK_SIZE, min(self.limit, size * 3 // 4))
+            self.size = max(MIN_CHUNK_SIZE, min(self.limit, size // 2))
+
+
+class _UploadManifest:
+    """Local record of the chunks the server has acknowledged, so an upload can be resumed
+
+    The manifest identifies the upload (server, node, remote path and the size and
+    modification time of the local file), holds the length of the remote file before the
+    upload started and lists every acknowledged chunk as ``[offset, length, sha256]``.
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self.lock = threading.Lock()
+        self.last_saved = 0.0
+        self.writable = True
+
+    @classmethod
+    def create(cls, path, args, size, mtime, target_length):
+        return cls(
+            path,
+            {
+                "version": MANIFEST_VERSION,
+                "server": args.server,
+                "node": args.node,
+                "remote_file_path": args.remote_file_path,
+                "size": size,
+                "mtime": mtime,
+                "target_length": target_length,
+                "chunks": [],
+            },
+        )
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            raise ValueError("Unsupported manifest version")
+
+        return cls(path, data)
+
+    def mismatch(self, args, size, mtime):
+        """Return why this manifest does not belong to the requested upload, None if it does"""
+
+        if (self.data["server"], self.data["node"], self.data["remote_file_path"]) != (
+            args.server,
+            args.node,
+            args.remote_file_path,
+        ):
+            return "The manifest belongs to an upload to a different server, node or path"
+        elif (self.data["size"], self.data["mtime"]) != (size, mtime):
+            return "The local file changed since the manifest was written"
+
+        return None
+
+    @property
+    def target_length(self):
+        return self.data["target_length"]
+
+    @property
+    def chunks(self):
+        with self.lock:
+            return [tuple(chunk) for chunk in self.data["chunks"]]
+
+    def keep_only(self, chunks):
+        with self.lock:
+            self.data["chunks"] = [list(chunk) for chunk in chunks]
+
+    def acknowledge(self, offset, length, sha256):
+        with self.lock:
+            self.data["chunks"].append([offset, length, sha256])
+
+            if time.monotonic() - self.last_saved >= MANIFEST_SAVE_INTERVAL:
+                self._save()
+
+    def save(self):
+        with self.lock:
+            self._save()
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _save(self):
+        self.last_saved = time.monotonic()
+
+        if not self.writable:
+            return
+
+        try:
+            fd, temp_name = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp"
+            )
+
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.data, f)
+
+                os.replace(temp_name, self.path)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+        except OSError as ex:
+            self.writable = False
+            logging.getLogger().warning(
+                "Unable to write upload manifest %s, the upload cannot be resumed: %s",
+                self.path,
+                ex,
+            )
 
 
 class UploadFile(BasePlugin):
@@ -14,37 +210,18 @@ class UploadFile(BasePlugin):
         super().__init__(args)
 
         try:
-            i = 0
             cred = self.args.credentials[0]
             server = self._get_jenkins_server(cred)
 
             with open(self.args.local_file_path, "rb") as f:
-                fail = False
-
-                while True:
-                    data = f.read(45000)
-                    if not data:
-                        break
+                self._upload(server, f)
 
-                    result = server.execute_script(
-                        'new File("{0}").append("{1}".decodeBase64())'.format(
-                            self.args.remote_file_path.replace("\\", "\\\\"),
-                            base64.b64encode(data).decode("ascii"),
-                        ),
-                        node=self.args.node,
-                    ).strip()
+        except UploadError as ex:
+            if self.sink is not None:
+                self.logging.fatal("File failed to upload completely: %s", ex)
 
-                    if len(result) == 0:
-                        i += 1
-                        print("Successfully Uploaded Chunk {0}".format(i))
-                    else:
-                        fail = True
-                        print("File failed to upload completely.  See following error:")
-                        print(result)
-                        break
-
-                if not fail:
-                    print("Successfully uploaded file.")
+            print("File failed to upload completely.  See following error:")
+            print(ex)
 
         except jenkinslib.JenkinsException as ex:
             if "[403]" in str(ex).split("\n")[0]:
@@ -79,6 +256,359 @@ class UploadFile(BasePlugin):
         except Exception:
             self.logging.exception("")
 
+    def _upload(self, server, local_file):
+        """Send local_file as concurrently uploaded part files, then join them server side"""
+
+        self.loader = quik.FileLoader(os.path.join("data", "groovy"))
+        self.chunk_template = self.loader.load_template("upload_chunk_template.groovy")
+        self.target = _groovy_string(self.args.remote_file_path)
+
+        stat = os.fstat(local_file.fileno())
+        size = stat.st_size
+        local_digest = self._hash_local_file(local_file)
+        manifest_path = self.args.manifest_file or self.args.local_file_path + MANIFEST_SUFFIX
+
+        if self.args.resume:
+            self.manifest = self._resume_manifest(
+                server, manifest_path, size, stat.st_mtime, local_digest
+            )
+
+            if self.manifest is None:
+                self.output(
+                    {"path": self.args.remote_file_path, "sha256": local_digest},
+                    "File was already uploaded completely.",
+                )
+                return
+        else:
+            target_length, _, parts = self._remote_status(server)
+
+            # Remove parts left behind by an earlier, failed upload to the same path
+            if parts:
+                self._run_script(server, "upload_cleanup_template.groovy", {"target": self.target})
+
+            self.manifest = _UploadManifest.create(
+                manifest_path, self.args, size, stat.st_mtime, target_length or 0
+            )
+
+        self.manifest.save()
+
+        # Ranges of the local file that still have to be sent, as [start, end] lists
+        self.pending = []
+        position = 0
+
+        for offset, length, _ in sorted(self.manifest.chunks):
+            if offset > position:
+                self.pending.append([position, offset])
+
+            position = offset + length
+
+        if position < size:
+            self.pending.append([position, size])
+
+        self.local_file = local_file
+        self.sizer = _ChunkSizer(self.args.max_chunk_size)
+        self.read_lock = threading.Lock()
+        self.print_lock = threading.Lock()
+        self.chunks_uploaded = 0
+        self.bytes_uploaded = 0
+        self.bytes_sent = 0
+        self.errors = []
+        self.stop = threading.Event()
+
+        start = time.perf_counter()
+        threads = []
+
+        for _ in range(self.args.thread_number):
+            t = threading.Thread(target=self._upload_worker, args=(server,))
+            t.start()
+            threads.append(t)
+
+        for t in threads:
+            t.join()
+
+        self.manifest.save()
+
+        if self.errors:
+            if self.manifest.writable:
+                print(
+                    "{0} of {1} bytes are on the server. Run again with --resume to send "
+                    "the rest.".format(sum(chunk[1] for chunk in self.manifest.chunks), size)
+                )
+
+            raise self.errors[0]
+
+        result = self._run_script(
+            server,
+            "upload_assemble_template.groovy",
+            {"target": self.target, "count": len(self.manifest.chunks), "length": size},
+        )
+
+        if result != "sha256:" + local_digest:
+            if result.startswith("sha256:"):
+                result = "Uploaded file checksum %s does not match local checksum %s" % (
+                    result[7:],
+                    local_digest,
+                )
+
+            raise UploadError(result)
+
+        self.manifest.remove()
+        elapsed = time.perf_counter() - start
+
+        lines = [
+            "Successfully uploaded file.",
+            "Sent {0} bytes in {1} chunks in {2:.2f}s ({3:.1f} KB/s), SHA-256: {4}".format(
+                self.bytes_uploaded,
+                self.chunks_uploaded,
+                elapsed,
+                self.bytes_uploaded / 1024.0 / max(elapsed, 0.001),
+                local_digest,
+            ),
+        ]
+
+        if self.args.compress and self.bytes_sent:
+            lines.append(
+                "Compressed {0} bytes to {1} bytes (ratio {2:.2f})".format(
+                    self.bytes_uploaded,
+                    self.bytes_sent,
+                    self.bytes_uploaded / float(self.bytes_sent),
+                )
+            )
+
+        self.output(
+            {
+                "path": self.args.remote_file_path,
+                "sha256": local_digest,
+                "bytes": self.bytes_uploaded,
+                "bytes_sent": self.bytes_sent,
+                "chunks": self.chunks_uploaded,
+                "seconds": elapsed,
+            },
+            "\n".join(lines),
+        )
+
+    def _resume_manifest(self, server, manifest_path, size, mtime, local_digest):
+        """Load the manifest of an interrupted upload and reconcile it with the server
+
+        Parts on the server that match an acknowledged chunk are kept, every other part is
+        deleted so that it is sent again. Returns None if the upload had already finished.
+        """
+
+        try:
+            manifest = _UploadManifest.load(manifest_path)
+        except (OSError, ValueError) as ex:
+            raise UploadError("Unable to read upload manifest %s: %s" % (manifest_path, ex))
+
+        problem = manifest.mismatch(self.args, size, mtime)
+
+        if problem:
+            raise UploadError(problem + ", start the upload again without --resume.")
+
+        target_length, target_hash, parts = self._remote_status(server, manifest.target_length)
+
+        if (
+            not parts
+            and target_length == manifest.target_length + size
+            and target_hash == local_digest
+        ):
+            manifest.remove()
+            return None
+
+        if (target_length or 0) != manifest.target_length:
+            raise UploadError(
+                "The Upload File Path changed since the upload was interrupted, start the "
+                "upload again without --resume."
+            )
+
+        kept = [chunk for chunk in manifest.chunks if parts.get(chunk[0]) == chunk[1:]]
+        stale = sorted(set(parts) - set(chunk[0] for chunk in kept))
+
+        if stale:
+            self._run_script(
+                server,
+                "upload_delete_parts_template.groovy",
+                {
+                    "target": self.target,
+                    "offsets": ", ".join("'%015d'" % offset for offset in stale),
+                },
+            )
+
+        manifest.keep_only(kept)
+
+        print(
+            "Resuming upload: {0} of {1} bytes already on the server in {2} chunks".format(
+                sum(chunk[1] for chunk in kept), size, len(kept)
+            )
+        )
+
+        return manifest
+
+    def _hash_local_file(self, local_file):
+        digest = hashlib.sha256()
+
+        for block in iter(lambda: local_file.read(1024 * 1024), b""):
+            digest.update(block)
+
+        return digest.hexdigest()
+
+    def _run_script(self, server, template_name, namespace):
+        return server.execute_script(
+            self.loader.load_template(template_name).render(namespace), node=self.args.node
+        ).strip()
+
+    def _remote_status(self, server, hash_from=-1):
+        """Ask the server about the upload file and its parts
+
+        :returns: (length of the upload file or None if it does not exist, SHA-256 of its
+                  content from hash_from onwards or None, {part offset: (length, sha256)})
+        """
+
+        result = self._run_script(
+            server, "upload_status_template.groovy", {"target": self.target, "hash_from": hash_from}
+        )
+
+        target_length = target_hash = None
+        parts = {}
+
+        for line in result.splitlines():
+            fields = line.split()
+
+            try:
+                if fields[0] == "target" and len(fields) in (2, 3):
+                    target_length = int(fields[1])
+                    target_hash = fields[2] if len(fields) == 3 else None
+                elif fields[0] == "part" and len(fields) == 4:
+                    parts[int(fields[1])] = (int(fields[2]), fields[3])
+                else:
+                    raise ValueError(line)
+            except (IndexError, ValueError):
+                raise UploadError(result)
+
+        return target_length, target_hash, parts
+
+    def _next_chunk(self):
+        """Cut the next chunk from the pending ranges of the local file, sized by the chunk sizer"""
+
+        with self.read_lock:
+            while self.pending and self.pending[0][0] >= self.pending[0][1]:
+                self.pending.pop(0)
+
+            if not self.pending:
+                return None
+
+            offset, end = self.pending[0]
+            length = min(self._raw_chunk_size(), end - offset)
+
+            # Rather than leaving a tiny chunk at the end of the range, split the rest evenly
+            if 0 < end - offset - length < MIN_CHUNK_SIZE:
+                length = (end - offset + 1) // 2
+            self.pending[0][0] += length
+
+            self.local_file.seek(offset)
+            data = self.local_file.read(length)
+
+            if len(data) != length:
+                raise UploadError("The local file changed during the upload.")
+
+            return offset, data
+
+    def _upload_worker(self, server):
+        try:
+            while not self.stop.is_set():
+                chunk = self._next_chunk()
+
+                if chunk is None:
+                    break
+
+                self._send_chunk(server, *chunk)
+        except Exception as ex:
+            self.errors.append(ex)
+            self.stop.set()
+
+    def _raw_chunk_size(self):
+        """Bytes of the local file to put in the next chunk
+
+        With compression, chunks cover as many more raw bytes as compression saved so far.
+        """
+
+        size = self.sizer.next_size()
+
+        if self.args.compress:
+            with self.print_lock:
+                if self.bytes_sent:
+                    gain = self.bytes_uploaded / float(self.bytes_sent)
+                    size = int(size * max(1.0, min(MAX_COMPRESSION_GAIN, gain)))
+
+        return size
+
+    def _send_chunk(self, server, offset, data):
+        payload = data
+        compressed = False
+
+        if self.args.compress:
+            deflated = zlib.compress(data)
+
+            # Incompressible chunks are sent as they are
+            if len(deflated) < len(data):
+                payload = deflated
+                compressed = True
+
+        encoded = base64.b64encode(payload).decode("ascii")
+
+        script = self.chunk_template.render(
+            {
+                "part": _groovy_string(
+                    "%s%s%015d" % (self.args.remote_file_path, PART_SUFFIX, offset)
+                ),
+                "data": ", ".join(
+                    "'%s'" % encoded[i : i + jenkinslib.GROOVY_LITERAL_SIZE]
+                    for i in range(0, len(encoded), jenkinslib.GROOVY_LITERAL_SIZE)
+                ),
+                "compressed": compressed,
+            }
+        )
+
+        start = time.perf_counter()
+
+        try:
+            result = server.execute_script(script, node=self.args.node).strip()
+        except jenkinslib.JenkinsException as ex:
+            # A rejected or timed out request most likely means the chunk was too large
+            if "[403]" in str(ex).split("\n")[0] or len(payload) <= MIN_CHUNK_SIZE:
+                raise
+
+            self.sizer.failed(len(payload))
+            size = min(self._raw_chunk_size(), (len(data) + 1) // 2)
+
+            for i in range(0, len(data), size):
+                self._send_chunk(server, offset + i, data[i : i + size])
+
+            return
+
+        if result != str(len(data)):
+            raise UploadError(result)
+
+        self.sizer.succeeded(len(payload), time.perf_counter() - start)
+        self.manifest.acknowledge(offset, len(data), hashlib.sha256(data).hexdigest())
+
+        with self.print_lock:
+            self.chunks_uploaded += 1
+            self.bytes_uploaded += len(data)
+            self.bytes_sent += len(payload)
+
+            if compressed:
+                print(
+                    "Successfully Uploaded Chunk {0} ({1} bytes, {2} compressed)".format(
+                        self.chunks_uploaded, len(data), len(payload)
+                    )
+                )
+            else:
+                print(
+                    "Successfully Uploaded Chunk {0} ({1} bytes)".format(
+                        self.chunks_uploaded, len(data)
+                    )
+                )
+
 
 class UploadFileParser:
     def cmd_UploadFile(self):
@@ -86,9 +616,50 @@ class UploadFileParser:
 
         self._create_contextual_parser(
             "UploadFile",
-            "Upload file to Jenkins Server via chunked upload through Jenkins Console (slow for large files)",
+            "Upload file to Jenkins Server via parallel chunked upload through Jenkins Console",
+        )
+        self._add_common_arg_parsers(allows_threading=True)
+
+        self.parser.add_argument(
+            "-C",
+            "--max-chunk-size",
+            metavar="<Bytes>",
+            help="Largest chunk (in bytes, after compression) sent per request. Chunk sizes "
+            "adapt to the server, but never exceed this. Defaults to: %d" % DEFAULT_MAX_CHUNK_SIZE,
+            type=int,
+            dest="max_chunk_size",
+            required=False,
+            default=DEFAULT_MAX_CHUNK_SIZE,
+        )
+
+        self.parser.add_argument(
+            "-z",
+            "--compress",
+            help="Compress chunks with zlib before sending them, the server decompresses them "
+            "with java.util.zip",
+            action="store_true",
+            dest="compress",
+        )
+
+        self.parser.add_argument(
+            "-r",
+            "--resume",
+            help="Resume an interrupted upload, only sending the chunks the server does not "
+            "already have",
+            action="store_true",
+            dest="resume",
+        )
+
+        self.parser.add_argument(
+            "-M",
+            "--manifest",
+            metavar="<Manifest File>",
+            help="Local file recording the progress of the upload, so it can be resumed. "
+            "Defaults to: <Upload File>%s" % MANIFEST_SUFFIX,
+            action="store",
+            dest="manifest_file",
+            required=False,
         )
-        self._add_common_arg_parsers()
 
         self.parser.add_argument(
             "-N",
@@ -118,14 +689,15 @@ class UploadFileParser:
 
         self._validate_server_url(args)
         self._validate_timeout_number(args)
+        self._validate_thread_number(args)
         self._validate_output_file(args)
 
+        if args.max_chunk_size < MIN_CHUNK_SIZE:
+            self.parser.fail("Maximum Chunk Size must be at least %d bytes." % MIN_CHUNK_SIZE)
+
         return_data = self._handle_authentication(args)
 
         if not self._file_accessible(args.local_file_path):
-            with HijackStdOut():
-                self.parser.print_usage()
-                print("\nError: Specified Upload File does not exist or cannot be accessed.")
-                exit(1)
+            self.parser.fail("Specified Upload File does not exist or cannot be accessed.")
 
         return return_data
@@ -49,99 +49,1282 @@
 See examples at :doc:`examples`
 """
 
+import atexit
+import base64
+import codecs
+import hashlib
 import json
 import os
+import queue
 import re
 import socket
 import sys
+import tempfile
 import threading
+import time
+import uuid
 import warnings
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from http.client import BadStatusLine
-from multiprocessing import Process
 from urllib.error import URLError
-from urllib.parse import quote, urlencode, urljoin
+from urllib.parse import parse_qs, quote, urlencode, urljoin
 
 import requests
 import requests.exceptions as req_exc
-from bs4 import BeautifulSoup
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool,
+)
+from requests.packages.urllib3.exceptions import (
+    InsecureRequestWarning,
+    NewConnectionError,
+)
+
+from libs import quik
+
+try:
+    import requests_kerberos
+except ImportError:
+    requests_kerberos = None
+
+# aiohttp is optional and slow to import, so it is only loaded once AsyncJenkins is used.
+# For the same reason asyncio is imported inside the asynchronous transport's methods.
+aiohttp = None
+
+if sys.version_info < (2, 7, 0):
+    warnings.warn("Support for python 2.6 is deprecated and will be removed.")
+
+DEFAULT_HEADERS = {"Content-Type": "text/xml; charset=utf-8"}
+
+# Connection pool sizing for the transport shared by every Jenkins instance
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Maximum in-flight requests for the asyncio transport
+DEFAULT_ASYNC_CONCURRENCY = 100
+
+# Read size and retry count when streaming build logs
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_RETRIES = 3
+
+# First and longest wait (in seconds) between polls while following a triggered build
+BUILD_POLL_INITIAL_INTERVAL = 0.25
+BUILD_POLL_MAX_INTERVAL = 5.0
+
+# Folder levels fetched per request and folders fetched at once by iter_all_jobs. Few
+# levels keep every response small and let sibling folders be fetched in parallel
+DEFAULT_FOLDER_DEPTH_PER_REQUEST = 3
+DEFAULT_TRAVERSAL_WORKERS = 4
+
+# Jobs iter_all_jobs parses ahead of its caller before the folder requests wait, and
+# jobs handed over to the caller at once
+TRAVERSAL_QUEUE_SIZE = 1000
+TRAVERSAL_BATCH_SIZE = 50
+
+# Concurrent doDelete requests made by delete_all_job_builds
+DEFAULT_DELETE_WORKERS = 4
+
+# Maximum concurrent fire-and-forget calls, e.g. execute_script(wait=False)
+DEFAULT_BACKGROUND_WORKERS = 4
+
+# Seconds the root page, crumb and resolved auth scheme are reused per server and identity
+DEFAULT_MEMO_TTL = 300
+
+# Largest Groovy payload (in characters) execute_script_batch sends in one request
+MAX_BATCH_SCRIPT_SIZE = 150000
+
+# Java class files limit string constants to 65535 bytes, so long strings are sent to the
+# script console as several literals of at most this many characters
+GROOVY_LITERAL_SIZE = 60000
+
+# Codec of bodies whose Content-Type names no charset. Build logs and script console
+# output are always decoded with the codec of their endpoint, since Jenkins writes them
+# as UTF-8 but does not always say so. Either way requests never has to guess the
+# charset, which means scanning the whole body
+DEFAULT_ENCODING = "utf-8"
+ENDPOINT_ENCODINGS = {
+    "consoleText": "utf-8",
+    "progressiveText": "utf-8",
+    "scriptText": "utf-8",
+}
+
+# Jenkins's message when it rejects a request for a missing or expired crumb
+CRUMB_REJECTION = "No valid crumb"
+
+# On-disk response cache bound and entry file suffix
+DEFAULT_CACHE_MAX_SIZE = 512 * 1024 * 1024
+CACHE_ENTRY_SUFFIX = ".entry"
+
+# REST Endpoints
+INFO = "api/json"
+CRUMB_URL = "crumbIssuer/api/json"
+JOBS_QUERY = "?tree=%s"
+JOBS_QUERY_TREE = "jobs[url,color,name%s,%s]"
+JOB_INFO = "%(folder_url)sjob/%(short_name)s/api/json?depth=%(depth)s"
+JOB_INFO_TREE = "%(folder_url)sjob/%(short_name)s/api/json?tree=%(tree)s"
+JOB_NAME = "%(folder_url)sjob/%(short_name)s/api/json?tree=name"
+ALL_BUILDS = "%(folder_url)sjob/%(short_name)s/api/json?tree=allBuilds[number,url]"
+CREATE_JOB = "%(folder_url)screateItem?name=%(short_name)s"
+CONFIG_JOB = "%(folder_url)sjob/%(short_name)s/config.xml"
+BUILD_JOB = "%(folder_url)sjob/%(short_name)s/build"
+BUILD_WITH_PARAMS_JOB = "%(folder_url)sjob/%(short_name)s/buildWithParameters"
+BUILD_INFO = "%(folder_url)sjob/%(short_name)s/%(number)s/api/json?depth=%(depth)s"
+BUILD_INFO_TREE = "%(folder_url)sjob/%(short_name)s/%(number)s/api/json?tree=%(tree)s"
+STOP_BUILD = "%(folder_url)sjob/%(short_name)s/%(number)s/stop"
+DELETE_JOB = "%(folder_url)sjob/%(short_name)s/doDelete"
+DISABLE_JOB = "%(folder_url)sjob/%(short_name)s/disable"
+DELETE_BUILD = "%(folder_url)sjob/%(short_name)s/%(number)s/doDelete"
+GET_CREDENTIAL_LIST = "%(folder_url)sjob/%(short_name)s/descriptorByName/%(credential_provider)s/fillCredentialsIdItems"
+GET_API_TOKEN_LIST = "user/%(user)s/configure"
+CREATE_API_TOKEN = (
+    "user/%(user)s/descriptorByName/jenkins.security.ApiTokenProperty/generateNewToken"
+)
+DELETE_API_TOKEN = "user/%(user)s/descriptorByName/jenkins.security.ApiTokenProperty/revoke"
+BUILD_CONSOLE_OUTPUT = "%(folder_url)s%(number)s/consoleText"
+BUILD_PROGRESSIVE_OUTPUT = "%(folder_url)s%(number)s/logText/progressiveText?start=%(start)d"
+QUEUE_ITEM = "queue/item/%(number)s/api/json?tree=cancelled,why,executable[number,url]"
+SCRIPT_URL = "%(node)sscriptText"
+WHOAMI_URL = "whoAmI/api/json"
+NODE_LIST = "computer/api/json?tree=computer[displayName,offline]"
+NODE_RAW = "computer/?depth=%(depth)s"
+NODE_INFO = "computer/%(name)s/api/json?depth=%(depth)s"
+NODE_INFO_TREE = "computer/%(name)s/api/json?tree=%(tree)s"
+
+# Projection used to poll running builds, see Jenkins.get_build_status
+BUILD_STATUS_FIELDS = ["building", "result", "id", "number"]
+
+
+class JenkinsException(Exception):
+    """General exception type for jenkins-API-related failures."""
+
+
+class NotFoundException(JenkinsException):
+    """A special exception to call out the case of receiving a 404."""
+
+
+class EmptyResponseException(JenkinsException):
+    """A special exception to call out the case receiving an empty response."""
+
+
+class BadHTTPException(JenkinsException):
+    """A special exception to call out the case of a broken HTTP response."""
+
+
+class TimeoutException(JenkinsException):
+    """A special exception to call out in the case of a socket timeout."""
+
+
+class PartialContentException(JenkinsException):
+    """A special exception raised when a streamed log could not be read completely.
+
+    ``start`` and ``skip`` can be passed back to
+    :meth:`Jenkins.stream_build_console_output` to resume where the transfer stopped.
+    """
+
+    def __init__(self, msg, start, skip):
+        super(PartialContentException, self).__init__(msg)
+        self.start = start
+        self.skip = skip
+
+
+class WrappedSession(requests.Session):
+    """A wrapper for requests.Session to override 'verify' property, ignoring REQUESTS_CA_BUNDLE environment variable.
+
+    This is a workaround for https://github.com/kennethreitz/requests/issues/3829 (will be fixed in requests 3.0.0)
+    """
+
+    def merge_environment_settings(self, url, proxies, stream, verify, *args, **kwargs):
+        if self.verify is False:
+            verify = False
+
+        return super(WrappedSession, self).merge_environment_settings(
+            url, proxies, stream, verify, *args, **kwargs
+        )
+
+
+class ConnectionPoolStats(object):
+    """Thread-safe counters describing how well pooled connections are being reused."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.discards = 0
+
+    def record(self, hits=0, misses=0, discards=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.discards += discards
+
+    def snapshot(self):
+        """Return the current counters.
+
+        :returns: ``dict`` with ``hits`` (reused keep-alive connections), ``misses`` (new
+                  connections) and ``discards`` (connections closed because the pool was full)
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "discards": self.discards}
+
+
+_pool_stats = ConnectionPoolStats()
+
+
+class RequestRecord(object):
+    """Outcome and timings of one HTTP request, as passed to request hooks.
+
+    Durations are in seconds. ``dns``, ``connect`` and ``tls`` are None when a
+    pooled connection was reused (and ``tls`` for plain HTTP), ``ttfb`` is the time
+    from sending the request until the response headers arrived and ``total``
+    includes reading the body unless the request was streamed.
+    """
+
+    def __init__(self, method, url, endpoint, retries=0):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.retries = retries
+        self.started = time.time()
+
+        self.status = None
+        self.bytes = 0
+        self.from_cache = False
+        self.reused_connection = None
+        self.error = None
+
+        self.dns = None
+        self.connect = None
+        self.tls = None
+        self.ttfb = None
+        self.total = None
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+_request_hooks = []
+_request_hooks_lock = threading.Lock()
+
+# RequestRecord of the request the current thread is sending, filled in by the connection classes
+_request_timing = threading.local()
+
+
+def add_request_hook(pre=None, post=None):
+    """Register callbacks invoked around every request made by :class:`Jenkins` and :class:`AsyncJenkins`.
+
+    ``pre(record)`` is called before the request is sent and ``post(record)`` once it
+    finished or failed, both with a :class:`RequestRecord`. Callbacks may run on any
+    worker thread at the same time and must be thread-safe.
+
+    :returns: Handle for :func:`remove_request_hook`
+    """
+
+    hook = (pre, post)
+
+    with _request_hooks_lock:
+        _request_hooks.append(hook)
+
+    return hook
+
+
+def remove_request_hook(hook):
+    with _request_hooks_lock:
+        _request_hooks.remove(hook)
+
+
+def _run_request_hooks(stage, record):
+    for hook in list(_request_hooks):
+        if hook[stage] is not None:
+            hook[stage](record)
+
+
+def tree_query(fields):
+    """Turn a field projection into the value of a ``tree=`` query parameter.
+
+    ``fields`` lists the wanted field names. The fields of nested objects and lists are
+    selected with a ``dict`` mapping the field to its own projection, e.g.
+    ``["number", {"builds": ["number", "result"]}]`` becomes
+    ``number,builds[number,result]``. Plain ``tree=`` syntax such as
+    ``"builds[number]{0,10}"`` is passed through as is.
+
+    :param fields: Field projection, ``list``
+    :returns: ``str``
+    """
+
+    parts = []
+
+    for field in fields:
+        if isinstance(field, dict):
+            parts.extend("%s[%s]" % (key, tree_query(value)) for key, value in field.items())
+        else:
+            parts.append(field)
+
+    return ",".join(parts)
+
+
+_JSON_ARRAY_SEPARATOR = re.compile(r"[ \t\r\n]*([,\]])[ \t\r\n]*")
+
+
+def iter_json_array(chunks, key):
+    """Incrementally parse a JSON object and generate the items of its ``key`` array.
+
+    ``chunks`` is an iterable of UTF-8 encoded ``bytes``, such as
+    ``response.iter_content()``. Only the item being parsed is held in memory, so
+    memory use depends on the size of the largest item rather than the length of the
+    array. Other members of the object are parsed and discarded.
+
+    :param chunks: The JSON document, in pieces of any size, ``iterable`` of ``bytes``
+    :param key: Name of the array member of the top level object, ``str``
+    :returns: generator of the decoded items
+    :raises ValueError: if the document is not valid JSON
+    """
+
+    scan_once = json.JSONDecoder().scan_once
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+
+    buffer = ""
+    position = 0
+    exhausted = False
+
+    def read(minimum=1):
+        """Append at least ``minimum`` characters to the buffer, False at the end of the data"""
+
+        nonlocal buffer, position, exhausted
+
+        # Drop what was consumed so the buffer only ever holds the current value
+        buffer = buffer[position:]
+        position = 0
+        target = len(buffer) + minimum
+
+        while len(buffer) < target and not exhausted:
+            try:
+                buffer += text_decoder.decode(next(chunks))
+            except StopIteration:
+                buffer += text_decoder.decode(b"", final=True)
+                exhausted = True
+
+        return len(buffer) > 0
+
+    def next_char():
+        """Skip whitespace and return the next character without consuming it"""
+
+        nonlocal position
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+
+            if position < len(buffer):
+                return buffer[position]
+
+            if exhausted or not read():
+                raise ValueError("Unexpected end of JSON data")
+
+    def value():
+        """Decode the value at the current position, reading more data as needed"""
+
+        nonlocal position
+
+        if position >= len(buffer) or buffer[position] in " \t\r\n":
+            next_char()
+
+        while True:
+            try:
+                result, end = scan_once(buffer, position)
+
+                # A number (or anything else) may continue in the next chunk
+                if end < len(buffer) or exhausted:
+                    position = end
+                    return result
+            except StopIteration:
+                if exhausted:
+                    raise ValueError("Expecting value in JSON data")
+            except ValueError:
+                if exhausted:
+                    raise
+
+            # Grow the buffer geometrically so large values are not parsed over and over
+            read(max(len(buffer) - position, STREAM_CHUNK_SIZE))
+
+    def expect(character):
+        nonlocal position
+
+        if next_char() != character:
+            raise ValueError("Expected %r in JSON data" % character)
+
+        position += 1
+
+    expect("{")
+
+    if next_char() == "}":
+        return
+
+    while True:
+        name = value()
+        expect(":")
+
+        if name == key and next_char() == "[":
+            position += 1
+
+            if next_char() == "]":
+                position += 1
+            else:
+                while True:
+                    yield value()
+
+                    # Most separators are complete in the buffer already
+                    match = _JSON_ARRAY_SEPARATOR.match(buffer, position)
+
+                    if match is None:
+                        if next_char() == "]":
+                            position += 1
+                            break
+
+                        expect(",")
+                    else:
+                        position = match.end()
+
+                        if match.group(1) == "]":
+                            break
+        else:
+            value()
+
+        if next_char() == "}":
+            return
+
+        expect(",")
+
+
+def response_encoding(response):
+    """Return the codec for the body of a ``requests.Response``, see :data:`ENDPOINT_ENCODINGS`"""
+
+    endpoint = (response.url or "").partition("?")[0].rstrip("/").rsplit("/", 1)[-1]
+
+    if endpoint in ENDPOINT_ENCODINGS:
+        return ENDPOINT_ENCODINGS[endpoint]
+
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return response.encoding
+
+    return DEFAULT_ENCODING
+
+
+def _is_crumb_rejection(response):
+    """Return True if a 403 ``requests.Response`` rejected the crumb rather than the user"""
+
+    if CRUMB_REJECTION in (response.reason or ""):
+        return True
+
+    try:
+        return CRUMB_REJECTION in response.text
+    except (req_exc.RequestException, RuntimeError):
+        # The body of a streamed response may already be gone
+        return False
+
+
+def url_template(server, url):
+    """Collapse a request URL into the endpoint it targets, e.g. ``job/*/N/consoleText``.
+
+    Job, node and user names and build numbers are replaced and only the names of
+    query parameters are kept, so requests can be grouped per endpoint.
+    """
+
+    if url.startswith(server):
+        url = url[len(server) :]
+
+    path, _, query = url.partition("?")
+
+    path = re.sub(r"(job/[^/]+/)+", "job/*/", path)
+    path = re.sub(r"(^|/)(computer|user)/(?!api/)[^/]+/", r"\1\2/*/", path)
+    path = re.sub(r"(^|/)\d+/", r"\1N/", path)
+
+    keys = sorted(parse_qs(query, keep_blank_values=True))
+
+    return (path or "/") + ("?" + "&".join(keys) if keys else "")
+
+
+class _TimingConnectionMixin(object):
+    """Mixin for urllib3 connections that records DNS, connect and TTFB timings.
+
+    Timings go to the :class:`RequestRecord` of the request being sent by the
+    current thread, if any.
+    """
+
+    def _new_conn(self):
+        record = getattr(_request_timing, "record", None)
+
+        if record is None:
+            return super(_TimingConnectionMixin, self)._new_conn()
+
+        host = self._dns_host
+        start = time.perf_counter()
+
+        try:
+            address = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except (socket.gaierror, UnicodeError):
+            # Leave reporting the failure to urllib3
+            address = None
+
+        resolved = time.perf_counter()
+        record.dns = resolved - start
+
+        try:
+            # Connect to the address just resolved so the lookup is not repeated
+            self._dns_host = address or host
+            sock = super(_TimingConnectionMixin, self)._new_conn()
+        except NewConnectionError:
+            if address is None:
+                raise
+
+            # The first address may be unreachable, let urllib3 try all of them
+            self._dns_host = host
+            sock = super(_TimingConnectionMixin, self)._new_conn()
+        finally:
+            self._dns_host = host
+
+        record.connect = time.perf_counter() - resolved
+
+        return sock
+
+    def request(self, *args, **kwargs):
+        self._jaf_request_sent = time.perf_counter()
+
+        result = super(_TimingConnectionMixin, self).request(*args, **kwargs)
+
+        # Lets a BackgroundTask know its request is on the wire
+        on_sent = getattr(_request_timing, "on_sent", None)
+
+        if on_sent is not None:
+            on_sent(args[0] if args else kwargs.get("method"))
+
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        response = super(_TimingConnectionMixin, self).getresponse(*args, **kwargs)
+
+        record = getattr(_request_timing, "record", None)
+
+        if record is not None and getattr(self, "_jaf_request_sent", None) is not None:
+            record.ttfb = time.perf_counter() - self._jaf_request_sent
+
+        return response
+
+
+class _TimingHTTPConnection(_TimingConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimingHTTPSConnection(_TimingConnectionMixin, HTTPSConnection):
+    def connect(self):
+        record = getattr(_request_timing, "record", None)
+        start = time.perf_counter()
+
+        super(_TimingHTTPSConnection, self).connect()
+
+        # Whatever connect() spent beyond resolving and connecting was the TLS handshake
+        if record is not None and record.connect is not None:
+            record.tls = max(0.0, time.perf_counter() - start - record.dns - record.connect)
+
+
+class _CountingPoolMixin(object):
+    """Mixin for urllib3 connection pools that feeds :data:`_pool_stats`."""
+
+    def _get_conn(self, timeout=None):
+        conn = super(_CountingPoolMixin, self)._get_conn(timeout)
+
+        # _new_conn() records the miss, so every other checkout reused a connection
+        if not getattr(conn, "_jaf_new", False):
+            _pool_stats.record(hits=1)
+
+        conn._jaf_new = False
+        return conn
+
+    def _new_conn(self):
+        conn = super(_CountingPoolMixin, self)._new_conn()
+        conn._jaf_new = True
+        _pool_stats.record(misses=1)
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None and self.pool is not None and self.pool.full():
+            _pool_stats.record(discards=1)
+
+        super(_CountingPoolMixin, self)._put_conn(conn)
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _TimingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimingHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools keep hit/miss/discard statistics.
+
+    A single instance is mounted on every :class:`Jenkins` session (see
+    :func:`get_connection_pool`) so that keep-alive connections are reused across
+    instances and worker threads instead of each session owning a small private pool.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(PooledHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+def configure_connection_pool(max_workers=0):
+    """Size the shared connection pool for ``max_workers`` concurrent worker threads.
+
+    One extra connection is reserved for the main thread and the pool never shrinks
+    below :data:`DEFAULT_POOL_MAXSIZE`. A pool that is already large enough is kept, so
+    its keep-alive connections survive from one command to the next in a long running
+    process. Otherwise a larger one replaces it and sessions created before this call
+    keep using the previous pool.
+
+    :param max_workers: Number of threads expected to issue requests at once, ``int``
+    :returns: The shared :class:`PooledHTTPAdapter`
+    """
+    global _connection_pool
+
+    pool_maxsize = max(max_workers + 1, DEFAULT_POOL_MAXSIZE)
+
+    with _connection_pool_lock:
+        if _connection_pool is None or _connection_pool._pool_maxsize < pool_maxsize:
+            _connection_pool = PooledHTTPAdapter(
+                pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=pool_maxsize
+            )
+
+        return _connection_pool
+
+
+def get_connection_pool():
+    """Return the shared :class:`PooledHTTPAdapter`, creating a default sized one if needed."""
+
+    with _connection_pool_lock:
+        if _connection_pool is not None:
+            return _connection_pool
+
+    return configure_connection_pool()
+
+
+def connection_pool_stats():
+    """Return reuse statistics for the shared connection pool, see :class:`ConnectionPoolStats`."""
+
+    return _pool_stats.snapshot()
+
+
+class ResponseCache(object):
+    """Persistent, size-bounded cache of successful GET responses.
+
+    Each entry is a single file in ``directory`` named after the hash of the request
+    URL and the identity of the user making it, holding a JSON header line followed by
+    the raw body. Entries are revalidated with ``If-None-Match``/``If-Modified-Since``
+    when the server sent an ``ETag``/``Last-Modified``, served without a request while
+    younger than ``max_age`` seconds, and never revalidated once marked immutable
+    (e.g. console output of a completed build). The least recently used entries are
+    evicted once the directory grows past ``max_size`` bytes.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_CACHE_MAX_SIZE, max_age=0):
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._size = sum(
+            entry.stat().st_size for entry in os.scandir(directory) if self._is_entry(entry)
+        )
+
+    def _is_entry(self, entry):
+        return entry.is_file() and entry.name.endswith(CACHE_ENTRY_SUFFIX)
+
+    def _path(self, identity, url):
+        key = hashlib.sha256(("%s\n%s" % (identity, url)).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + CACHE_ENTRY_SUFFIX)
+
+    def lookup(self, identity, url):
+        """Return the cached header ``dict`` for ``url`` or ``None``.
+
+        The body is not read; pass the returned ``dict`` to :meth:`load_body`.
+        """
+
+        path = self._path(identity, url)
+
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline().decode("utf-8"))
+                meta["_offset"] = f.tell()
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("url") != url:
+            return None
+
+        meta["_path"] = path
+        return meta
+
+    def is_fresh(self, meta):
+        """Return True if ``meta`` can be served without contacting the server."""
+
+        return meta["immutable"] or (time.time() - meta["stored"]) < self.max_age
+
+    def load_body(self, meta):
+        """Read the body of a looked up entry and mark it as recently used.
+
+        :returns: ``bytes`` or None if the entry vanished in the meantime
+        """
+
+        try:
+            with open(meta["_path"], "rb") as f:
+                f.seek(meta["_offset"])
+                body = f.read()
+
+            # mtime doubles as the LRU clock
+            os.utime(meta["_path"])
+        except OSError:
+            return None
+
+        return body
+
+    def store(self, identity, url, response, immutable=False):
+        """Save a successful ``requests.Response`` to ``url`` if it can ever be reused."""
+
+        headers = response.headers
+        validators = "ETag" in headers or "Last-Modified" in headers
+
+        if not (immutable or validators or self.max_age > 0):
+            return
+
+        body = response.content
+
+        # A single huge entry would flush everything else out of the cache
+        if len(body) > self.max_size // 4:
+            return
+
+        meta = {
+            "url": url,
+            "stored": time.time(),
+            "immutable": immutable,
+            "encoding": response.encoding,
+            "headers": dict(headers),
+        }
+
+        self._write(self._path(identity, url), meta, body)
+
+    def refresh(self, identity, meta):
+        """Record that a looked up entry was revalidated by a 304 response."""
+
+        body = self.load_body(meta)
+
+        if body is None:
+            return
+
+        path = meta["_path"]
+        meta = {key: value for key, value in meta.items() if not key.startswith("_")}
+        meta["stored"] = time.time()
+
+        self._write(path, meta, body)
+
+    def _write(self, path, meta, body):
+        temp_path = None
+
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n")
+                f.write(body)
+                size = f.tell()
+
+            with self._lock:
+                try:
+                    self._size -= os.path.getsize(path)
+                except OSError:
+                    pass
+
+                os.replace(temp_path, path)
+                self._size += size
+
+                if self._size > self.max_size:
+                    self._evict()
+        except OSError:
+            # The cache is an optimisation; a full or read-only disk must not fail requests
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is below 90% of its bound.
+
+        Must be called with ``_lock`` held.
+        """
+
+        entries = []
+
+        for entry in os.scandir(self.directory):
+            if self._is_entry(entry):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if self._size <= self.max_size * 0.9:
+                break
+
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+
+_response_cache = None
+
+
+def configure_response_cache(directory=None, max_size=DEFAULT_CACHE_MAX_SIZE, max_age=0):
+    """Enable the on-disk response cache for :class:`Jenkins` instances created afterwards.
+
+    :param directory: Cache directory, or None to disable caching, ``str``
+    :param max_size: Upper bound for the total size of cached entries in bytes, ``int``
+    :param max_age: Seconds a cached response is served without revalidation, ``int``
+    :returns: The shared :class:`ResponseCache` or None
+    """
+    global _response_cache
+
+    _response_cache = ResponseCache(directory, max_size, max_age) if directory else None
+
+    return _response_cache
+
+
+def get_response_cache():
+    """Return the shared :class:`ResponseCache`, or None if caching is disabled."""
+
+    return _response_cache
+
+
+class SessionMemo(object):
+    """Thread-safe memo of per-server, per-identity values that are costly to derive.
+
+    Values such as the root page, the crumb and the auth scheme that worked are
+    computed once per ``(server, identity, name)`` and then shared by every
+    :class:`Jenkins` instance using the same credentials until ``ttl`` seconds have
+    passed or :meth:`invalidate` is called. Each key has its own lock, so only
+    threads waiting for the same value are serialised.
+    """
+
+    def __init__(self, ttl=DEFAULT_MEMO_TTL):
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._values = {}
+
+    def get(self, key, compute):
+        """Return the memoized value for ``key``, calling ``compute()`` if it is missing or stale.
+
+        A ``None`` result is returned but not memoized, so the next caller tries again.
+        """
+
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            item = self._values.get(key)
+
+            if item is not None and item[0] > time.monotonic():
+                return item[1]
+
+            value = compute()
+
+            if value is not None:
+                self._values[key] = (time.monotonic() + self.ttl, value)
+
+            return value
+
+    def invalidate(self, server, identity):
+        """Forget every value memoized for ``identity`` on ``server``."""
+
+        with self._lock:
+            for key in list(self._values):
+                if key[:2] == (server, identity):
+                    del self._values[key]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+_session_memo = SessionMemo()
+
+
+class BackgroundTask(object):
+    """A call dispatched to the :class:`BackgroundExecutor`.
+
+    ``future`` is a :class:`concurrent.futures.Future` for the result of the call.
+    ``submitted``, ``started``, ``sent`` and ``finished`` are ``time.perf_counter()``
+    values, None until reached. ``sent`` is when the first request that is not a GET or
+    HEAD (i.e. the POST doing the actual work, not a crumb lookup) was written out.
+    """
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+        self.future = Future()
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.sent = None
+        self.finished = None
+
+        self._released = threading.Event()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def done(self):
+        return self.future.done()
+
+    def wait_sent(self, timeout=None):
+        """Wait until the call sent its request or finished, return False on timeout"""
+
+        return self._released.wait(timeout)
+
+    @property
+    def queued_seconds(self):
+        return None if self.started is None else self.started - self.submitted
+
+    @property
+    def run_seconds(self):
+        return None if self.finished is None else self.finished - self.started
+
+    def _mark_sent(self, method):
+        if self.sent is None and method not in ("GET", "HEAD"):
+            self.sent = time.perf_counter()
+            self._released.set()
+
+    def _run(self):
+        if not self.future.set_running_or_notify_cancel():
+            self._released.set()
+            return
+
+        self.started = time.perf_counter()
+        _request_timing.on_sent = self._mark_sent
+
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as ex:
+            self.future.set_exception(ex)
+        else:
+            self.future.set_result(result)
+        finally:
+            _request_timing.on_sent = None
+            self.finished = time.perf_counter()
+            self._released.set()
+
+
+class BackgroundExecutor(object):
+    """Runs fire-and-forget calls, such as ``execute_script(wait=False)``, on daemon threads.
+
+    At most ``max_workers`` calls run at once, further calls wait in a queue. Worker
+    threads are started on demand and are daemons, so a call whose response never comes
+    (e.g. a script starting a long running process) cannot keep JAF from exiting: at exit
+    :meth:`shutdown` only waits for every pending call to have sent its request.
+    """
+
+    def __init__(self, max_workers=DEFAULT_BACKGROUND_WORKERS):
+        self.max_workers = max_workers
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._tasks = []
+        self._atexit_registered = False
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule ``fn(*args, **kwargs)`` and return its :class:`BackgroundTask`"""
+
+        task = BackgroundTask(fn, args, kwargs)
+
+        with self._lock:
+            self._tasks = [pending for pending in self._tasks if not pending.done()]
+            self._tasks.append(task)
+
+            if len(self._threads) < min(self.max_workers, len(self._tasks)):
+                thread = threading.Thread(
+                    target=self._worker, name="jaf-background-%d" % len(self._threads)
+                )
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+
+        self._queue.put(task)
+
+        return task
+
+    def shutdown(self, timeout=None):
+        """Wait until every submitted call has sent its request or finished
+
+        Calls that failed are reported on stderr, as nobody else may be looking at them.
+
+        :param timeout: Seconds to wait for each call, None to wait as long as it takes
+        """
+
+        with self._lock:
+            tasks = list(self._tasks)
+
+        for task in tasks:
+            task.wait_sent(timeout)
+
+            if task.done() and not task.future.cancelled() and task.future.exception():
+                sys.stderr.write("Background request failed: %s\n" % task.future.exception())
+
+        with self._lock:
+            self._tasks = [pending for pending in self._tasks if pending not in tasks]
+
+    def _worker(self):
+        while True:
+            self._queue.get()._run()
+
+
+_background_executor = None
+_background_executor_lock = threading.Lock()
+
+
+def configure_background_executor(max_workers=DEFAULT_BACKGROUND_WORKERS):
+    """Set how many fire-and-forget calls may run at once, see :class:`BackgroundExecutor`.
+
+    Calls already submitted keep running on the previous executor.
+
+    :param max_workers: Maximum number of concurrent calls, ``int``
+    :returns: The shared :class:`BackgroundExecutor`
+    """
+    global _background_executor
+
+    with _background_executor_lock:
+        _background_executor = BackgroundExecutor(max_workers)
+
+        return _background_executor
+
+
+def get_background_executor():
+    """Return the shared :class:`BackgroundExecutor`, creating a default sized one if needed."""
+
+    with _background_executor_lock:
+        if _background_executor is not None:
+            return _background_executor
+
+    return configure_background_executor()
+
+
+class _LogSink(object):
+    """Passes build log chunks on to ``sink`` (if any) and watches them for ``marker``"""
+
+    def __init__(self, sink, marker=None):
+        self.sink = sink
+        self.marker = marker
+        self.found = False
+
+        self._tail = b""
+
+    def write(self, chunk):
+        if self.sink is not None:
+            self.sink.write(chunk)
+
+        if self.marker and not self.found:
+            window = self._tail + chunk
+            self.found = self.marker in window
+            self._tail = window[-(len(self.marker) - 1) :] if len(self.marker) > 1 else b""
+
+
+class BuildTracker(object):
+    """Follows a triggered build from the queue until it finishes.
+
+    The queue item returned by :meth:`Jenkins.build_job` is polled until an executor has
+    picked it up. While the build runs its log is followed through
+    ``logText/progressiveText`` (and written to ``sink``), whose ``X-More-Data`` header
+    also tells when the build is over, and the result is read with a
+    ``tree=building,result,id,number`` projection instead of the full build document.
+    Every wait backs off exponentially from ``initial_interval`` to ``max_interval`` and
+    starts over whenever the build made progress, so short builds are seen to finish
+    almost immediately and long ones cost few requests.
+
+    Without a queue item (Jenkins did not send a ``Location`` header) the ``lastBuild`` of
+    the job is followed instead.
+
+    :param jenkins: :class:`Jenkins` the build was triggered on
+    :param name: Job name, ``str``
+    :param queue_item: Queue item number returned by :meth:`Jenkins.build_job`, ``int``
+    :param sink: Binary file-like object the build log is written to, or ``None``
+    :param timeout: Seconds to wait in total before raising :class:`TimeoutException`,
+                    ``None`` to wait as long as it takes
+    """
+
+    def __init__(
+        self,
+        jenkins,
+        name,
+        queue_item=None,
+        sink=None,
+        initial_interval=BUILD_POLL_INITIAL_INTERVAL,
+        max_interval=BUILD_POLL_MAX_INTERVAL,
+        timeout=None,
+    ):
+        self.jenkins = jenkins
+        self.name = name
+        self.queue_item = queue_item
+        self.sink = sink
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+        # Build number once the build has started and log offset reached so far
+        self.number = None
+        self.offset = 0
+
+        folder_url, short_name = jenkins._get_job_folder(name)
+        self._job_url = folder_url + "job/" + short_name + "/"
+        self._log_complete = False
+
+    def _sleep(self, interval):
+        """Sleep for ``interval`` seconds and return the next, longer, interval"""
+
+        if self.deadline is not None and time.monotonic() + interval > self.deadline:
+            raise TimeoutException("Timed out waiting for job[%s]" % self.name)
+
+        time.sleep(interval)
+
+        return min(interval * 2, self.max_interval)
+
+    def wait_for_start(self):
+        """Wait until the build has left the queue.
+
+        :returns: Build number, ``int``
+        :raises JenkinsException: if the queue item was cancelled
+        """
+
+        interval = self.initial_interval
+
+        while self.number is None:
+            if self.queue_item is None:
+                try:
+                    self.number = self.jenkins.get_build_status(self.name, "lastBuild")["number"]
+                    break
+                except JenkinsException:
+                    pass
+            else:
+                item = self.jenkins.get_queue_item(self.queue_item)
+
+                if item.get("cancelled"):
+                    raise JenkinsException(
+                        "queue item[%s] of job[%s] was cancelled" % (self.queue_item, self.name)
+                    )
 
-from libs import quik
+                if item.get("executable"):
+                    self.number = item["executable"]["number"]
+                    break
 
-try:
-    import requests_kerberos
-except ImportError:
-    requests_kerberos = None
+            interval = self._sleep(interval)
 
-if sys.version_info < (2, 7, 0):
-    warnings.warn("Support for python 2.6 is deprecated and will be removed.")
+        return self.number
 
-DEFAULT_HEADERS = {"Content-Type": "text/xml; charset=utf-8"}
+    def wait_for_output(self, marker):
+        """Follow the build log until ``marker`` appears in it.
 
-# REST Endpoints
-INFO = "api/json"
-CRUMB_URL = "crumbIssuer/api/json"
-JOBS_QUERY = "?tree=%s"
-JOBS_QUERY_TREE = "jobs[url,color,name,%s]"
-JOB_INFO = "%(folder_url)sjob/%(short_name)s/api/json?depth=%(depth)s"
-JOB_NAME = "%(folder_url)sjob/%(short_name)s/api/json?tree=name"
-ALL_BUILDS = "%(folder_url)sjob/%(short_name)s/api/json?tree=allBuilds[number,url]"
-CREATE_JOB = "%(folder_url)screateItem?name=%(short_name)s"
-CONFIG_JOB = "%(folder_url)sjob/%(short_name)s/config.xml"
-BUILD_JOB = "%(folder_url)sjob/%(short_name)s/build"
-BUILD_WITH_PARAMS_JOB = "%(folder_url)sjob/%(short_name)s/buildWithParameters"
-BUILD_INFO = "%(folder_url)sjob/%(short_name)s/%(number)s/api/json?depth=%(depth)s"
-STOP_BUILD = "%(folder_url)sjob/%(short_name)s/%(number)s/stop"
-DELETE_JOB = "%(folder_url)sjob/%(short_name)s/doDelete"
-DISABLE_JOB = "%(folder_url)sjob/%(short_name)s/disable"
-DELETE_BUILD = "%(folder_url)sjob/%(short_name)s/%(number)s/doDelete"
-GET_CREDENTIAL_LIST = "%(folder_url)sjob/%(short_name)s/descriptorByName/%(credential_provider)s/fillCredentialsIdItems"
-GET_API_TOKEN_LIST = "user/%(user)s/configure"
-CREATE_API_TOKEN = (
-    "user/%(user)s/descriptorByName/jenkins.security.ApiTokenProperty/generateNewToken"
-)
-DELETE_API_TOKEN = "user/%(user)s/descriptorByName/jenkins.security.ApiTokenProperty/revoke"
-BUILD_CONSOLE_OUTPUT = "%(folder_url)s%(number)s/consoleText"
-SCRIPT_URL = "%(node)sscriptText"
-WHOAMI_URL = "whoAmI/api/json"
-NODE_LIST = "computer/api/json?depth=%(depth)s"
-NODE_RAW = "computer/?depth=%(depth)s"
-NODE_INFO = "computer/%(name)s/api/json?depth=%(depth)s"
+        :param marker: Text to wait for, ``str`` or ``bytes``
+        :returns: True once ``marker`` was seen, False if the build finished without it
+        """
 
+        if isinstance(marker, str):
+            marker = marker.encode("utf8")
 
-class JenkinsException(Exception):
-    """General exception type for jenkins-API-related failures."""
+        self.wait_for_start()
 
+        return self._follow_log(marker)
 
-class NotFoundException(JenkinsException):
-    """A special exception to call out the case of receiving a 404."""
+    def wait_for_completion(self):
+        """Wait until the build has finished, writing its log to ``sink`` on the way.
 
+        :returns: ``building``, ``result``, ``id`` and ``number`` of the build, ``dict``
+        """
 
-class EmptyResponseException(JenkinsException):
-    """A special exception to call out the case receiving an empty response."""
+        self.wait_for_start()
 
+        if self.sink is not None:
+            self._follow_log()
 
-class BadHTTPException(JenkinsException):
-    """A special exception to call out the case of a broken HTTP response."""
+        interval = self.initial_interval
 
+        while True:
+            status = self.jenkins.get_build_status(self.name, self.number)
 
-class TimeoutException(JenkinsException):
-    """A special exception to call out in the case of a socket timeout."""
+            if not status["building"]:
+                return status
 
+            interval = self._sleep(interval)
 
-class WrappedSession(requests.Session):
-    """A wrapper for requests.Session to override 'verify' property, ignoring REQUESTS_CA_BUNDLE environment variable.
+    def _follow_log(self, marker=None):
+        sink = _LogSink(self.sink, marker)
+        interval = self.initial_interval
 
-    This is a workaround for https://github.com/kennethreitz/requests/issues/3829 (will be fixed in requests 3.0.0)
-    """
+        while not self._log_complete:
+            start = self.offset
 
-    def merge_environment_settings(self, url, proxies, stream, verify, *args, **kwargs):
-        if self.verify is False:
-            verify = False
+            try:
+                self.offset, more_data = self.jenkins.stream_build_console_output(
+                    self._job_url, self.number, sink, start=self.offset
+                )
+            except PartialContentException:
+                raise
+            except JenkinsException:
+                # A build that has only just started may not have written to its log yet,
+                # make sure it exists at all (this raises if it does not)
+                if self.offset:
+                    raise
 
-        return super(WrappedSession, self).merge_environment_settings(
-            url, proxies, stream, verify, *args, **kwargs
-        )
+                more_data = self.jenkins.get_build_status(self.name, self.number)["building"]
+
+            if hasattr(self.sink, "flush"):
+                self.sink.flush()
+
+            if sink.found:
+                return True
+
+            if not more_data:
+                self._log_complete = True
+                break
+
+            if self.offset > start:
+                interval = self.initial_interval
+
+            interval = self._sleep(interval)
+
+        return False
 
 
 class Jenkins(object):
@@ -149,13 +1332,8 @@ class Jenkins(object):
 
     _timeout_warning_issued = False
 
-    # Hold root url page result for permission checks to save requests.
-    _cache_result = None
-    _cache_status = None
     username = None
 
-    _thread_lock = threading.Lock()
-
     def __init__(
         self,
         url,
@@ -181,9 +1359,15 @@ class Jenkins(object):
         else:
             self.server = url + "/"
 
+        # Never add the auth headers below to the shared default
+        headers = dict(headers)
+
         self.auth = None
         self.crumb = None
 
+        # Root page of the last basic_access_check, for the permission checks
+        self._root_page = None
+
         if cookie:
             headers["Cookie"] = cookie
             self._auth_resolved = True
@@ -198,6 +1382,8 @@ class Jenkins(object):
 
             headers[self.crumb["crumbRequestField"]] = self.crumb["crumb"]
 
+        self._explicit_crumb = bool(crumb)
+
         if authheader:
             headers["Authorization"] = authheader
             self._auth_resolved = True
@@ -223,6 +1409,18 @@ class Jenkins(object):
         self.timeout = timeout
         self._session = WrappedSession()
 
+        # Cached responses and memoized values are only shared between instances using
+        # the same credentials
+        self._response_cache = get_response_cache()
+        self._cache_identity = hashlib.sha256(
+            repr((username, password, authheader, cookie)).encode("utf-8")
+        ).hexdigest()
+
+        # Share keep-alive connections with every other Jenkins instance and thread
+        pool = get_connection_pool()
+        self._session.mount("http://", pool)
+        self._session.mount("https://", pool)
+
         for key in headers:
             self._session.headers[key] = headers[key]
 
@@ -255,30 +1453,74 @@ class Jenkins(object):
 
         return str(urljoin(self.server, url_path))
 
+    def _info_url(self, depth_spec, tree_spec, variables, fields=None):
+        """Build an ``api/json`` URL projecting ``fields``, or with ``depth`` if there are none"""
+
+        if fields:
+            variables["tree"] = tree_query(fields)
+
+            return self._build_url(tree_spec, variables)
+
+        return self._build_url(depth_spec, variables)
+
+    def _memo_key(self, name):
+        return (self.server, self._cache_identity, name)
+
     def maybe_add_crumb(self, req):
         # We don't know yet whether we need a crumb
         if self.crumb is None:
-            try:
-                response = self.jenkins_open(
-                    requests.Request("GET", self._build_url(CRUMB_URL)), add_crumb=False
-                )
-                if not response:
-                    raise EmptyResponseException("Empty response for crumb")
-            except (NotFoundException, EmptyResponseException):
-                self.crumb = False
-            except JenkinsException:
-                pass
-            else:
-                try:
-                    self.crumb = json.loads(response)
-                except json.JSONDecodeError:
-                    raise JenkinsException(
-                        "Unexpected Response from Server.  Is this really a Jenkins server?"
-                    )
+            memoized = _session_memo.get(self._memo_key("crumb"), self._fetch_crumb)
+
+            if memoized is not None:
+                self.crumb, cookies = memoized
+
+                # Newer Jenkins versions bind the crumb to the session it was issued for
+                requests.utils.add_dict_to_cookiejar(self._session.cookies, cookies)
 
         if self.crumb:
             req.headers[self.crumb["crumbRequestField"]] = self.crumb["crumb"]
 
+    def _fetch_crumb(self):
+        """Request a crumb for :data:`_session_memo`.
+
+        :returns: Tuple of the crumb (``False`` if none is needed) and the session
+                  cookies it belongs to, or None if it could not be determined
+        """
+
+        try:
+            response = self.jenkins_open(
+                requests.Request("GET", self._build_url(CRUMB_URL)), add_crumb=False
+            )
+            if not response:
+                raise EmptyResponseException("Empty response for crumb")
+        except (NotFoundException, EmptyResponseException):
+            return False, {}
+        except JenkinsException:
+            return None
+
+        try:
+            crumb = json.loads(response)
+        except json.JSONDecodeError:
+            raise JenkinsException(
+                "Unexpected Response from Server.  Is this really a Jenkins server?"
+            )
+
+        return crumb, requests.utils.dict_from_cookiejar(self._session.cookies)
+
+    def _drop_crumb(self, req):
+        """Forget a crumb that was fetched (not passed in) and remove it from ``req``.
+
+        :returns: True if there was such a crumb
+        """
+
+        if self._explicit_crumb or not self.crumb:
+            return False
+
+        req.headers.pop(self.crumb["crumbRequestField"], None)
+        self.crumb = None
+
+        return True
+
     def _maybe_add_auth(self):
 
         if self._auth_resolved:
@@ -288,34 +1530,37 @@ class Jenkins(object):
             # If we only have one auth mechanism specified, just require it
             self._session.auth = self._auths[0][1]
         else:
-            # Attempt the list of auth mechanisms and keep the first that works
-            # otherwise default to the first one in the list (last popped).
-            # This is a hack to allow the transparent use of kerberos to work
-            # in future, we should require explicit request to use kerberos
-            failures = []
-            for name, auth in reversed(self._auths):
-                try:
-                    self.jenkins_open(
-                        requests.Request("GET", self._build_url(INFO), auth=auth),
-                        add_crumb=False,
-                        resolve_auth=False,
-                    )
-                    self._session.auth = auth
-                    break
-                except TimeoutException:
-                    raise
-                except Exception as exc:
-                    # assume authentication failure
-                    failures.append("auth(%s) %s" % (name, exc))
-                    continue
-            else:
-                raise JenkinsException(
-                    "Unable to authenticate with any scheme:\n%s" % "\n".join(failures)
-                )
+            scheme = _session_memo.get(self._memo_key("auth"), self._resolve_auth_scheme)
+            self._session.auth = dict(self._auths)[scheme]
 
         self._auth_resolved = True
         self.auth = self._session.auth
 
+    def _resolve_auth_scheme(self):
+        """Return the name of the first auth mechanism that works, for :data:`_session_memo`."""
+
+        # Attempt the list of auth mechanisms and keep the first that works
+        # otherwise default to the first one in the list (last popped).
+        # This is a hack to allow the transparent use of kerberos to work
+        # in future, we should require explicit request to use kerberos
+        failures = []
+        for name, auth in reversed(self._auths):
+            try:
+                self.jenkins_open(
+                    requests.Request("GET", self._build_url(INFO), auth=auth),
+                    add_crumb=False,
+                    resolve_auth=False,
+                )
+                return name
+            except TimeoutException:
+                raise
+            except Exception as exc:
+                # assume authentication failure
+                failures.append("auth(%s) %s" % (name, exc))
+                continue
+
+        raise JenkinsException("Unable to authenticate with any scheme:\n%s" % "\n".join(failures))
+
     def _response_handler(self, response):
         """Handle response objects"""
 
@@ -326,13 +1571,13 @@ class Jenkins(object):
         # when accessing .text property
         return response
 
-    def _request(self, req):
+    def _request(self, req, stream=False, immutable=False):
 
         r = self._session.prepare_request(req)
         # requests.Session.send() does not honor env settings by design
         # see https://github.com/requests/requests/issues/2807
         _settings = self._session.merge_environment_settings(
-            r.url, {}, None, self._session.verify, None
+            r.url, {}, stream, self._session.verify, None
         )
         _settings["timeout"] = self.timeout
 
@@ -343,23 +1588,130 @@ class Jenkins(object):
         than checking for a build first.
         """
 
-        if r.url.endswith("consoleText"):
+        if r.url.endswith("consoleText") or "/logText/progressiveText" in r.url:
             _settings["allow_redirects"] = False
 
         """
         End of ugly hack to prevent infinite redirect.
         """
 
-        return self._session.send(r, **_settings)
+        if not _request_hooks:
+            return self._send(r, _settings, stream, immutable)
+
+        record = RequestRecord(
+            r.method, r.url, url_template(self.server, r.url), getattr(req, "_jaf_retries", 0)
+        )
+
+        _run_request_hooks(0, record)
+
+        _request_timing.record = record
+        start = time.perf_counter()
+
+        try:
+            response = self._send(r, _settings, stream, immutable)
+
+            record.status = response.status_code
+            record.from_cache = getattr(response, "from_cache", False)
+
+            if stream:
+                record.bytes = int(response.headers.get("Content-Length") or 0)
+            else:
+                record.bytes = len(response.content)
+
+            return response
+        except Exception as ex:
+            record.error = ex.__class__.__name__
+            raise
+        finally:
+            record.total = time.perf_counter() - start
+
+            if record.ttfb is not None:
+                record.reused_connection = record.connect is None
+
+            _request_timing.record = None
+            _run_request_hooks(1, record)
+
+    def _send(self, r, _settings, stream=False, immutable=False):
+        """Send a prepared request, going through the response cache if one is configured"""
+
+        cache = self._response_cache
+
+        # Streamed bodies are consumed by the caller and crumbs are tied to the session
+        if cache is None or stream or r.method != "GET" or r.url.endswith(CRUMB_URL):
+            return self._session.send(r, **_settings)
+
+        url = r.url
+        meta = cache.lookup(self._cache_identity, url)
+
+        if meta:
+            if cache.is_fresh(meta):
+                body = cache.load_body(meta)
+
+                if body is not None:
+                    return self._cached_response(r, meta, body)
+
+            headers = meta["headers"]
+
+            if "ETag" in headers:
+                r.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                r.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        response = self._session.send(r, **_settings)
+
+        if response.status_code == 304 and meta:
+            body = cache.load_body(meta)
+
+            if body is not None:
+                cache.refresh(self._cache_identity, meta)
+                return self._cached_response(r, meta, body)
+
+            # Entry was evicted while the request was in flight
+            r.headers.pop("If-None-Match", None)
+            r.headers.pop("If-Modified-Since", None)
+            response = self._session.send(r, **_settings)
+
+        if response.status_code == 200:
+            cache.store(self._cache_identity, url, response, immutable)
+
+        return response
+
+    def _cached_response(self, prepared_request, meta, body):
+        """Build a ``requests.Response`` from a :class:`ResponseCache` entry."""
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = meta["url"]
+        response.headers = requests.structures.CaseInsensitiveDict(meta["headers"])
+        response.encoding = meta["encoding"]
+        response.request = prepared_request
+        response._content = body
+        response.from_cache = True
 
-    def jenkins_open(self, req, add_crumb=True, resolve_auth=True):
+        return response
+
+    def jenkins_open(self, req, add_crumb=True, resolve_auth=True, immutable=False):
         """Return the HTTP response body from a ``requests.Request``.
 
+        The body is decoded once with the codec chosen by :func:`response_encoding`.
+
         :returns: ``str``
         """
-        return self.jenkins_request(req, add_crumb, resolve_auth).text
+        response = self.jenkins_request(req, add_crumb, resolve_auth, immutable=immutable)
+
+        return response.content.decode(response_encoding(response), errors="replace")
+
+    def jenkins_open_bytes(self, req, add_crumb=True, resolve_auth=True, immutable=False):
+        """Return the undecoded HTTP response body from a ``requests.Request``.
+
+        :returns: ``bytes``
+        """
+        return self.jenkins_request(req, add_crumb, resolve_auth, immutable=immutable).content
 
-    def jenkins_request(self, req, add_crumb=True, resolve_auth=True):
+    def jenkins_request(
+        self, req, add_crumb=True, resolve_auth=True, stream=False, immutable=False, retry=True
+    ):
         """Utility routine for opening an HTTP request to a Jenkins server.
 
         :param req: A ``requests.Request`` to submit.
@@ -367,6 +1719,15 @@ class Jenkins(object):
                           before submitting. Defaults to ``True``.
         :param resolve_auth: If True, maybe add authentication. Defaults to
                              ``True``.
+        :param stream: If True, the body is not read until the caller consumes
+                       it. The caller must close the response. Defaults to
+                       ``False``.
+        :param immutable: If True, a cached copy of the response never needs
+                          revalidation, e.g. the log of a completed build.
+                          Defaults to ``False``.
+        :param retry: If True, a request rejected with 403 for an invalid crumb
+                      is sent once more with a freshly fetched crumb. Defaults
+                      to ``True``.
         :returns: A ``requests.Response`` object.
         """
 
@@ -376,9 +1737,21 @@ class Jenkins(object):
             if add_crumb:
                 self.maybe_add_crumb(req)
 
-            return self._response_handler(self._request(req))
+            return self._response_handler(self._request(req, stream, immutable))
 
         except req_exc.HTTPError as e:
+            if e.response.status_code == 403 and _is_crumb_rejection(e.response):
+                # The memoized crumb, auth scheme or root page may have gone stale. Other
+                # 403s are plain denials, which retrying would only make more expensive
+                _session_memo.invalidate(self.server, self._cache_identity)
+
+                if retry and add_crumb and self._drop_crumb(req):
+                    req._jaf_retries = getattr(req, "_jaf_retries", 0) + 1
+
+                    return self.jenkins_request(
+                        req, add_crumb, resolve_auth, stream, immutable, retry=False
+                    )
+
             # Jenkins's funky authentication means its nigh impossible to
             # distinguish errors.
             if e.response.status_code in [401, 403, 500]:
@@ -433,17 +1806,56 @@ class Jenkins(object):
         except ValueError:
             raise JenkinsException("Could not parse JSON info for server[%s]" % self.server)
 
-    def get_all_jobs(self, folder_depth=None, folder_depth_per_request=10):
+    def _iter_info_items(self, item, key, query=None):
+        """Generate the items of the ``key`` array of :meth:`Jenkins.get_info`
+
+        The response is parsed while it is being received, unless a response cache is
+        configured, since the cache needs the whole body anyway.
+        """
+
+        if self._response_cache is not None:
+            yield from self.get_info(item, query).get(key) or []
+            return
+
+        url = quote("/".join((item, INFO)).lstrip("/"))
+        if query:
+            url += query
+        try:
+            response = self.jenkins_request(
+                requests.Request("GET", self._build_url(url)), stream=True
+            )
+        except (req_exc.HTTPError, BadStatusLine):
+            raise BadHTTPException("Error communicating with server[%s]" % self.server)
+
+        try:
+            yield from iter_json_array(response.iter_content(STREAM_CHUNK_SIZE), key)
+        except ValueError:
+            raise JenkinsException("Could not parse JSON info for server[%s]" % self.server)
+        finally:
+            response.close()
+
+    def get_all_jobs(
+        self,
+        folder_depth=None,
+        folder_depth_per_request=10,
+        extra_fields=None,
+        workers=DEFAULT_TRAVERSAL_WORKERS,
+    ):
         """Get list of all jobs recursively to the given folder depth.
 
         Each job is a dictionary with 'name', 'url', 'color' and 'fullname'
-        keys.
+        keys. Jobs are listed breadth-first: all jobs of a level before those
+        of the next one, ordered by their folder and then as the server lists
+        them. The order is the same whichever folder request finishes first.
 
         :param folder_depth: Number of levels to search, ``int``. By default
             None, which will search all levels. 0 limits to toplevel.
         :param folder_depth_per_request: Number of levels to fetch at once,
             ``int``. By default 10, which is usually enough to fetch all jobs
             using a single request and still easily fits into an HTTP request.
+        :param extra_fields: Additional ``tree`` fields to fetch for every job in
+            the same request, ``str``. e.g. ``"lastBuild[number,result]"``
+        :param workers: Maximum concurrent folder requests, ``int``
         :returns: list of jobs, ``[ { str: str} ]``
 
         .. note::
@@ -465,14 +1877,150 @@ class Jenkins(object):
             .. [#] Actually recent Jenkins includes a ``_class`` field
                 everywhere, but it's missing the requested fields.
         """
+        jobs = list(
+            self.iter_all_jobs(folder_depth, folder_depth_per_request, extra_fields, workers)
+        )
+
+        # iter_all_jobs yields a folder before its contents and the contents of one folder
+        # in order, so each job's path of positions within its parents can be rebuilt.
+        # Sorting by depth and then by that path gives the breadth-first order
+        positions = {}
+        counts = {}
+
+        for job in jobs:
+            parent = job["fullname"].rpartition("/")[0]
+            index = counts.get(parent, 0)
+            counts[parent] = index + 1
+            positions[job["fullname"]] = positions.get(parent, ()) + (index,)
+
+        return sorted(
+            jobs, key=lambda job: (len(positions[job["fullname"]]), positions[job["fullname"]])
+        )
+
+    def iter_all_jobs(
+        self,
+        folder_depth=None,
+        folder_depth_per_request=DEFAULT_FOLDER_DEPTH_PER_REQUEST,
+        extra_fields=None,
+        workers=DEFAULT_TRAVERSAL_WORKERS,
+    ):
+        """Generate all jobs recursively to the given folder depth, as they are fetched.
+
+        Works like :meth:`Jenkins.get_all_jobs`, but jobs are yielded as soon as they
+        have been parsed from the response, and folders deeper than
+        ``folder_depth_per_request`` are fetched by up to ``workers`` concurrent
+        requests. Responses are parsed while they arrive (see :func:`iter_json_array`),
+        so memory use depends on the size of the largest top level entry of a response
+        rather than on the number of jobs. A folder is always yielded before its
+        contents, otherwise the order depends on which response arrives first.
+
+        :param folder_depth: Number of levels to search, ``int``. By default
+            None, which will search all levels. 0 limits to toplevel.
+        :param folder_depth_per_request: Number of levels to fetch at once, ``int``
+        :param extra_fields: Additional ``tree`` fields to fetch for every job in
+            the same request, ``str``. e.g. ``"lastBuild[number,result]"``
+        :param workers: Maximum concurrent folder requests, ``int``
+        :returns: generator of jobs, ``{ str: str}``
+        """
+        extra_fields = "," + extra_fields if extra_fields else ""
+
         jobs_query = "jobs"
         for _ in range(folder_depth_per_request):
-            jobs_query = JOBS_QUERY_TREE % jobs_query
+            jobs_query = JOBS_QUERY_TREE % (extra_fields, jobs_query)
         jobs_query = JOBS_QUERY % jobs_query
 
-        jobs_list = []
-        jobs = [(0, [], self.get_info(query=jobs_query)["jobs"])]
-        for lvl, root, lvl_jobs in jobs:
+        # Workers put lists of (job, overflow level) and finally an exception or None when
+        # their folder is done
+        results = queue.Queue(max(1, TRAVERSAL_QUEUE_SIZE // TRAVERSAL_BATCH_SIZE))
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, workers))
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+
+            return False
+
+        def report_error(future):
+            # Errors _list_folder does not catch would otherwise leave the loop below waiting
+            if not future.cancelled() and future.exception() is not None:
+                put(future.exception())
+
+        def list_folder(lvl, path):
+            future = executor.submit(self._list_folder, lvl, path, jobs_query, folder_depth, put)
+            future.add_done_callback(report_error)
+
+        list_folder(0, [])
+        pending = 1
+
+        try:
+            while pending:
+                batch = results.get()
+
+                if not isinstance(batch, list):
+                    pending -= 1
+
+                    if batch is not None:
+                        raise batch
+
+                    continue
+
+                for job, overflow in batch:
+                    if overflow:
+                        list_folder(overflow, job["fullname"].split("/"))
+                        pending += 1
+
+                    yield job
+        finally:
+            # The caller may stop early, folders still being listed are not needed
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def _list_folder(self, lvl, path, jobs_query, folder_depth, put):
+        """Fetch the folder at ``path`` and pass lists of its jobs to ``put``
+
+        ``put`` returns False once the caller stopped listening. The last item put is None,
+        or the exception that ended the listing.
+        """
+
+        url_path = "".join(["/job/" + p for p in path])
+        entries = self._iter_info_items(url_path, "jobs", jobs_query)
+
+        batch = []
+
+        try:
+            for entry in entries:
+                batch.append(entry)
+
+                if len(batch) >= TRAVERSAL_BATCH_SIZE:
+                    if not put(list(self._walk_jobs(lvl, path, batch, folder_depth))):
+                        return
+
+                    batch = []
+
+            if put(list(self._walk_jobs(lvl, path, batch, folder_depth))):
+                put(None)
+        except Exception as ex:
+            put(ex)
+        finally:
+            entries.close()
+
+    def _walk_jobs(self, lvl, root, lvl_jobs, folder_depth):
+        """Generate ``(job, level)`` for the jobs of one response, level by level
+
+        ``level`` is the level of the children of a folder that Jenkins left out because
+        the query did not reach that deep, so they have to be fetched, and 0 otherwise.
+        """
+
+        jobs = deque([(lvl, root, lvl_jobs)])
+
+        while jobs:
+            lvl, root, lvl_jobs = jobs.popleft()
+
             if not isinstance(lvl_jobs, list):
                 lvl_jobs = [lvl_jobs]
             for job in lvl_jobs:
@@ -481,17 +2029,19 @@ class Jenkins(object):
                 # allow callers to easily reference unambiguously
                 if "fullname" not in job:
                     job["fullname"] = "/".join(path)
-                jobs_list.append(job)
+
+                overflow = 0
+
                 if "jobs" in job and isinstance(job["jobs"], list):  # folder
                     if folder_depth is None or lvl < folder_depth:
-                        children = job["jobs"]
                         # once folder_depth_per_request is reached, Jenkins
                         # returns empty objects
                         if any("url" not in child for child in job["jobs"]):
-                            url_path = "".join(["/job/" + p for p in path])
-                            children = self.get_info(url_path, query=jobs_query)["jobs"]
-                        jobs.append((lvl + 1, path, children))
-        return jobs_list
+                            overflow = lvl + 1
+                        else:
+                            jobs.append((lvl + 1, path, job["jobs"]))
+
+                yield job, overflow
 
     def get_nodes(self, depth=0):
         """Get a list of nodes connected to the Master
@@ -509,6 +2059,9 @@ class Jenkins(object):
                 requests.Request("GET", self._build_url(NODE_RAW, locals()))
             )
 
+            # bs4 is slow to import and only needed here and in list_api_tokens
+            from bs4 import BeautifulSoup
+
             soup = BeautifulSoup(raw_nodes, "html.parser")
 
             return_data = []
@@ -518,8 +2071,8 @@ class Jenkins(object):
                 Janky OS detection because for some reason hudson.node_monitors.ArchitectureMonitor isn't available via API if you aren't an admin
                 even though you can see this info as any authenticated user via the /computer url.
 
-                For now, we assume that all nodes are shown and no ajax paging occurs like on other pages (/users).  This appears to be the case. 
-                If ajax paging did occur, it would actually make this less jank because we could use that feature to get the info in a nice JSON 
+                For now, we assume that all nodes are shown and no ajax paging occurs like on other pages (/users).  This appears to be the case.
+                If ajax paging did occur, it would actually make this less jank because we could use that feature to get the info in a nice JSON
                 format.
                 """
 
@@ -549,16 +2102,18 @@ class Jenkins(object):
         except ValueError:
             raise JenkinsException("Could not parse JSON info for server[%s]" % self.server)
 
-    def get_node_info(self, name, depth=0):
+    def get_node_info(self, name, depth=0, fields=None):
         """Get node information dictionary
 
         :param name: Node name, ``str``
         :param depth: JSON depth, ``int``
+        :param fields: Only fetch these fields instead of everything down to ``depth``,
+                       see :func:`tree_query`, ``list``
         :returns: Dictionary of node info, ``dict``
         """
         try:
             response = self.jenkins_open(
-                requests.Request("GET", self._build_url(NODE_INFO, locals()))
+                requests.Request("GET", self._info_url(NODE_INFO, NODE_INFO_TREE, locals(), fields))
             )
             if response:
                 return json.loads(response)
@@ -587,32 +2142,47 @@ class Jenkins(object):
         return folder_url, short_name
 
     def basic_access_check(self):
-        with self._thread_lock:
-            if self._cache_result is None:
-                try:
-                    self._cache_result = self.jenkins_open(requests.Request("GET", self.server))
+        # Only the page of a successful request is memoized, failures are retried next time
+        statuses = []
 
-                    if "jenkins" not in self._cache_result.lower():
-                        self._cache_status = 500
-                    else:
-                        self._cache_status = 200
-                except JenkinsException as ex:
-                    if "[401]" in str(ex).split("\n")[0]:
-                        self._cache_status = 401
-                    else:
-                        self._cache_status = 500
-                except (req_exc.SSLError, req_exc.ConnectionError):
-                    self._cache_status = 500
+        def fetch():
+            status, root_page = self._fetch_root_page()
+            statuses.append(status)
 
-                except Exception:
-                    self._cache_status = 500
+            return root_page if status == 200 else None
+
+        self._root_page = _session_memo.get(self._memo_key("root"), fetch)
+
+        return statuses[0] if self._root_page is None else 200
+
+    def _fetch_root_page(self):
+        """Request the root page for :data:`_session_memo`.
 
-        return self._cache_status
+        :returns: Tuple of a status (200, 401 or 500) and the page text (or None)
+        """
+
+        try:
+            root_page = self.jenkins_open(requests.Request("GET", self.server))
+
+            if "jenkins" not in root_page.lower():
+                return 500, root_page
+            else:
+                return 200, root_page
+        except JenkinsException as ex:
+            if "[401]" in str(ex).split("\n")[0]:
+                return 401, None
+            else:
+                return 500, None
+        except (req_exc.SSLError, req_exc.ConnectionError):
+            return 500, None
+
+        except Exception:
+            return 500, None
 
     def can_read_jenkins(self):
         result = self.basic_access_check()
 
-        if result == 200 and self._cache_result and self._cache_result != "":
+        if result == 200 and self._root_page and self._root_page != "":
             return True
 
         return False
@@ -620,8 +2190,8 @@ class Jenkins(object):
     def is_admin(self):
         result = self.basic_access_check()
 
-        if result == 200 and self._cache_result and self._cache_result != "":
-            if 'href="/manage"' in self._cache_result:
+        if result == 200 and self._root_page and self._root_page != "":
+            if 'href="/manage"' in self._root_page:
                 return True
 
         return False
@@ -629,8 +2199,8 @@ class Jenkins(object):
     def can_create_job(self):
         result = self.basic_access_check()
 
-        if result == 200 and self._cache_result and self._cache_result != "":
-            if 'href="/view/all/newJob"' in self._cache_result:
+        if result == 200 and self._root_page and self._root_page != "":
+            if 'href="/view/all/newJob"' in self._root_page:
                 return True
 
         return False
@@ -638,8 +2208,8 @@ class Jenkins(object):
     def can_access_scriptler(self):
         result = self.basic_access_check()
 
-        if result == 200 and self._cache_result and self._cache_result != "":
-            if 'href="/scriptler"' in self._cache_result:
+        if result == 200 and self._root_page and self._root_page != "":
+            if 'href="/scriptler"' in self._root_page:
                 return True
 
         return False
@@ -655,16 +2225,21 @@ class Jenkins(object):
         except Exception:
             return False
 
-    def get_build_console_output(self, folder_url, number):
+    def get_build_console_output(self, folder_url, number, completed=False, as_bytes=False):
         """Get build console text.
 
         :param name: Job name, ``str``
         :param number: Build number, ``int``
-        :returns: Build console output,  ``str``
+        :param completed: Build has finished, so its log can be cached for good, ``bool``
+        :param as_bytes: Return the log undecoded, e.g. to write it to a file, ``bool``
+        :returns: Build console output,  ``str`` or ``bytes``
         """
+        jenkins_open = self.jenkins_open_bytes if as_bytes else self.jenkins_open
+
         try:
-            response = self.jenkins_open(
-                requests.Request("GET", self._build_url(BUILD_CONSOLE_OUTPUT, locals()))
+            response = jenkins_open(
+                requests.Request("GET", self._build_url(BUILD_CONSOLE_OUTPUT, locals())),
+                immutable=completed,
             )
             if response:
                 return response
@@ -673,11 +2248,107 @@ class Jenkins(object):
         except (req_exc.HTTPError, NotFoundException):
             raise JenkinsException("job[%s] number[%s] does not exist" % (folder_url, number))
 
-    def get_build_info(self, name, number, depth=0):
+    def stream_build_console_output(
+        self, folder_url, number, sink, start=0, skip=0, retries=STREAM_RETRIES
+    ):
+        """Stream build console text into ``sink`` without buffering the whole log.
+
+        The log is read through ``logText/progressiveText`` and written to ``sink``
+        chunk by chunk as it arrives. If the connection drops, the same offset is
+        requested again and the bytes already written are skipped, up to
+        ``retries`` times in a row.
+
+        :param folder_url: Job folder url, ``str``
+        :param number: Build number, ``int``
+        :param sink: Binary file-like object with a ``write`` method
+        :param start: Log offset to start from (``X-Text-Size`` of a previous call), ``int``
+        :param skip: Bytes of the response at ``start`` that were already written, ``int``
+        :param retries: Reconnection attempts before giving up, ``int``
+        :returns: Tuple of the log offset reached and whether the build is still
+                  producing output, ``(int, bool)``
+        :raises PartialContentException: if the log could not be read completely
+        """
+
+        attempts = 0
+        total = 0
+
+        while True:
+            written = 0
+
+            try:
+                request = requests.Request(
+                    "GET", self._build_url(BUILD_PROGRESSIVE_OUTPUT, locals())
+                )
+                request._jaf_retries = attempts
+
+                response = self.jenkins_request(request, stream=True)
+
+                try:
+                    if response.status_code != 200 or "X-Text-Size" not in response.headers:
+                        raise JenkinsException(
+                            "job[%s] number[%s] does not exist" % (folder_url, number)
+                        )
+
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        if written + len(chunk) <= skip:
+                            # Already delivered before the previous attempt failed
+                            written += len(chunk)
+                            continue
+                        elif written < skip:
+                            chunk = chunk[skip - written :]
+                            written = skip
+
+                        written += len(chunk)
+                        total += len(chunk)
+                        sink.write(chunk)
+
+                    offset = int(response.headers["X-Text-Size"])
+                    more_data = response.headers.get("X-More-Data", "").lower() == "true"
+                finally:
+                    response.close()
+
+            except NotFoundException:
+                raise JenkinsException("job[%s] number[%s] does not exist" % (folder_url, number))
+            except (req_exc.ConnectionError, req_exc.ChunkedEncodingError, TimeoutException) as ex:
+                attempts += 1
+                skip = max(skip, written)
+
+                if attempts > retries:
+                    if skip == 0 and total == 0:
+                        raise
+
+                    raise PartialContentException(
+                        "Incomplete console output for job[%s] number[%s]: %s"
+                        % (folder_url, number, ex),
+                        start,
+                        skip,
+                    )
+
+                continue
+
+            if total == 0 and offset == 0:
+                raise JenkinsException("job[%s] number[%s] does not exist" % (folder_url, number))
+
+            return offset, more_data
+
+    def get_build_status(self, name, number):
+        """Get whether a build is running, its result and its id.
+
+        Much cheaper than the full :meth:`Jenkins.get_build_info` for polling a running build.
+
+        :param name: Job name, ``str``
+        :param number: Build number, ``int``
+        :returns: ``building``, ``result``, ``id`` and ``number`` of the build, ``dict``
+        """
+        return self.get_build_info(name, number, fields=BUILD_STATUS_FIELDS)
+
+    def get_build_info(self, name, number, depth=0, fields=None):
         """Get build information dictionary.
         :param name: Job name, ``str``
         :param name: Build number, ``int``
         :param depth: JSON depth, ``int``
+        :param fields: Only fetch these fields instead of everything down to ``depth``,
+                       e.g. ``["building", "result"]``, see :func:`tree_query`, ``list``
         :returns: dictionary of build information, ``dict``
         Example::
             >>> next_build_number = server.get_job_info('build_name')['nextBuildNumber']
@@ -690,13 +2361,15 @@ class Jenkins(object):
         folder_url, short_name = self._get_job_folder(name)
         try:
             response = self.jenkins_open(
-                requests.Request("GET", self._build_url(BUILD_INFO, locals()))
+                requests.Request(
+                    "GET", self._info_url(BUILD_INFO, BUILD_INFO_TREE, locals(), fields)
+                )
             )
             if response:
                 return json.loads(response)
             else:
                 raise JenkinsException("job[%s] number[%s] does not exist" % (name, number))
-        except req_exc.HTTPError:
+        except (req_exc.HTTPError, NotFoundException):
             raise JenkinsException("job[%s] number[%s] does not exist" % (name, number))
         except ValueError:
             raise JenkinsException(
@@ -712,28 +2385,110 @@ class Jenkins(object):
         folder_url, short_name = self._get_job_folder(name)
         self.jenkins_open(requests.Request("POST", self._build_url(DELETE_BUILD, locals())))
 
-    def delete_all_job_builds(self, name):
+    def delete_all_job_builds(
+        self, name, workers=DEFAULT_DELETE_WORKERS, use_script=None, progress=None
+    ):
         """Attempt to delete all Jenkins builds for job
 
+        Every build is deleted, not only the ones listed by :meth:`Jenkins.get_job_info`.
+        Through the script console a single Groovy call deletes all of them, otherwise up
+        to ``workers`` ``doDelete`` requests are made at a time.
+
         :param name: Name of Jenkins job, ``str``
+        :param workers: Maximum concurrent delete requests, ``int``
+        :param use_script: Delete the builds with a Groovy script, ``None`` to do so if the
+                           script console is accessible, ``bool``
+        :param progress: Called as ``progress(deleted, failed, total)`` as builds are
+                         deleted, or ``None``
+        :returns: Number of builds deleted, ``int``
+        :raises JenkinsException: if one or more builds could not be deleted
         """
 
-        job_info = self.get_job_info(name)
-
-        errors = False
-
-        for build in job_info["builds"]:
+        if use_script or (use_script is None and self.can_access_script_console()):
             try:
-                self.delete_build(name, build["number"])
+                deleted, failures = self._delete_all_job_builds_script(name, progress)
             except JenkinsException:
-                errors = True
+                if use_script:
+                    raise
+
+                # The script console is reachable but would not run the script
+                deleted, failures = self._delete_all_job_builds_concurrently(
+                    name, workers, progress
+                )
+        else:
+            deleted, failures = self._delete_all_job_builds_concurrently(name, workers, progress)
+
+        if failures:
+            raise JenkinsException(
+                "One or more builds was not successfully deleted:\n"
+                + "\n".join("\t#%s: %s" % failure for failure in failures)
+            )
+
+        return deleted
+
+    def _delete_all_job_builds_script(self, name, progress):
+        loader = quik.FileLoader(os.path.join("data", "groovy"))
+        script_template = loader.load_template("delete_builds_template.groovy")
+
+        output = self.execute_script(
+            script_template.render({"job_name": name.replace("\\", "\\\\").replace("'", "\\'")})
+        )
+
+        if output.strip() == "missing":
+            raise JenkinsException("job[%s] does not exist" % name)
+
+        total = re.search(r"^total (\d+)\r?$", output, re.M)
+        summary = re.search(r"^deleted (\d+) failed (\d+)\r?$", output, re.M)
+
+        if not total or not summary:
+            raise JenkinsException(
+                "Unexpected output deleting the builds of job[%s]:\n%s" % (name, output)
+            )
+
+        failures = re.findall(r"^failed (\d+) (.*?)\r?$", output, re.M)
+
+        if progress:
+            progress(int(summary.group(1)), int(summary.group(2)), int(total.group(1)))
+
+        return int(summary.group(1)), failures
+
+    def _delete_all_job_builds_concurrently(self, name, workers, progress):
+        builds = self.get_job_info(name, fields=[{"allBuilds": ["number"]}]).get("allBuilds") or []
+
+        deleted = 0
+        failures = []
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {
+                executor.submit(self.delete_build, name, build["number"]): build["number"]
+                for build in builds
+            }
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    deleted += 1
+                except (JenkinsException, req_exc.RequestException) as ex:
+                    failures.append((futures[future], str(ex).split("\n")[0]))
+
+                if progress:
+                    progress(deleted, len(failures), len(builds))
 
-        if errors:
-            raise JenkinsException("One or more builds was not successfully deleted")
+        return deleted, sorted(failures)
 
     def execute_script(self, script, wait=True, node=None):
+        """Run a Groovy script through the script console
+
+        :param script: Groovy script, ``str``
+        :param wait: If False, send the script from the :class:`BackgroundExecutor` and
+                     return without waiting for its output
+        :param node: Node (Slave) to run the script on, the master if None
+        :returns: The output of the script, ``str``, or a :class:`BackgroundTask` if not
+                  waiting
+        """
+
         if not wait:
-            Process(target=self.execute_script, args=(script, True), kwargs={"node": node}).start()
+            return get_background_executor().submit(self.execute_script, script, True, node=node)
         else:
             try:
                 if node:
@@ -749,6 +2504,92 @@ class Jenkins(object):
             except (req_exc.HTTPError, NotFoundException):
                 raise JenkinsException("Something went wrong")
 
+    def execute_script_batch(self, scripts, wait=True, node=None):
+        """Run several Groovy scripts through as few script console requests as possible
+
+        The scripts are packed into one payload (or more, if they exceed
+        MAX_BATCH_SCRIPT_SIZE) that evaluates each of them in its own GroovyShell and prints
+        delimiters with the status and duration of every script around its output.
+
+        :param scripts: Groovy scripts to run in order, ``list`` of ``str``
+        :param wait: If False, send the payloads without waiting for the output
+        :param node: Node (Slave) to run the scripts on, the master if None
+        :returns: ``list`` of ``dict`` with the ``output`` of every script, whether it raised
+                  an ``error`` and the ``seconds`` it took (None if it did not finish), or a
+                  ``list`` of :class:`BackgroundTask` (one per request) if not waiting
+        """
+
+        loader = quik.FileLoader(os.path.join("data", "groovy"))
+        template = loader.load_template("batch_template.groovy")
+        marker = "JAF-BATCH-" + uuid.uuid4().hex
+
+        items = []
+
+        for script in scripts:
+            encoded = base64.b64encode(script.encode("utf-8")).decode("ascii")
+            items.append(
+                "[%s]"
+                % ", ".join(
+                    "'%s'" % encoded[i : i + GROOVY_LITERAL_SIZE]
+                    for i in range(0, len(encoded), GROOVY_LITERAL_SIZE)
+                )
+            )
+
+        batches = []
+
+        for item in items:
+            if batches and sum(len(i) for i in batches[-1]) + len(item) <= MAX_BATCH_SCRIPT_SIZE:
+                batches[-1].append(item)
+            else:
+                batches.append([item])
+
+        results = []
+
+        for batch in batches:
+            payload = template.render({"items": ", ".join(batch), "marker": marker})
+
+            if not wait:
+                results.append(self.execute_script(payload, False, node=node))
+                continue
+
+            results.extend(
+                self._split_batch_output(
+                    self.execute_script(payload, node=node), marker, len(batch)
+                )
+            )
+
+        return results
+
+    def _split_batch_output(self, output, marker, count):
+        results = [{"output": "", "error": False, "seconds": None} for _ in range(count)]
+        delimiter = re.compile(
+            r"^%s (begin|end) (\d+)(?: (ok|error) (\d+))?\r?$" % re.escape(marker), re.M
+        )
+
+        current = None
+        position = 0
+
+        for match in delimiter.finditer(output or ""):
+            index = int(match.group(2))
+
+            if current is not None:
+                results[current]["output"] = output[position : match.start()].strip()
+
+            if match.group(1) == "begin":
+                current = index
+            else:
+                current = None
+                results[index]["error"] = match.group(3) == "error"
+                results[index]["seconds"] = int(match.group(4)) / 1e9
+
+            position = match.end()
+
+        # A script that never finished keeps whatever it printed
+        if current is not None:
+            results[current]["output"] = output[position:].strip()
+
+        return results
+
     def get_whoAmI(self):
         try:
             data = json.loads(
@@ -800,7 +2641,7 @@ class Jenkins(object):
                 )
             return actual
 
-    def get_job_info(self, name, depth=0, fetch_all_builds=False):
+    def get_job_info(self, name, depth=0, fetch_all_builds=False, fields=None):
         """Get job information dictionary.
 
         :param name: Job name, ``str``
@@ -812,16 +2653,24 @@ class Jenkins(object):
                                  an additional API call which may
                                  return significant amounts of
                                  data. ``bool``
+        :param fields: Only fetch these fields instead of everything down to ``depth``,
+                       e.g. ``["name", {"builds": ["number"]}]``, see
+                       :func:`tree_query`, ``list``
         :returns: dictionary of job information
         """
         folder_url, short_name = self._get_job_folder(name)
+
+        if fields and fetch_all_builds:
+            # Needed to tell whether builds are missing
+            fields = list(fields) + [{"firstBuild": ["number"]}]
+
         try:
             response = self.jenkins_open(
-                requests.Request("GET", self._build_url(JOB_INFO, locals()))
+                requests.Request("GET", self._info_url(JOB_INFO, JOB_INFO_TREE, locals(), fields))
             )
             if response:
                 if fetch_all_builds:
-                    return self._add_missing_builds(json.loads(response))
+                    return self._add_missing_builds(name, json.loads(response))
                 else:
                     return json.loads(response)
             else:
@@ -831,6 +2680,28 @@ class Jenkins(object):
         except ValueError:
             raise JenkinsException("Could not parse JSON info for job[%s]" % name)
 
+    def _add_missing_builds(self, name, data):
+        """Replace the (at most 100) builds in ``data`` with every build of the job
+
+        Jenkins gives no indication that builds were left out, so the oldest build
+        returned is compared with the first build of the job.
+        """
+        if not data.get("builds") or not data.get("firstBuild"):
+            return data
+
+        if data["builds"][-1]["number"] == data["firstBuild"]["number"]:
+            return data
+
+        folder_url, short_name = self._get_job_folder(name)
+        response = self.jenkins_open(requests.Request("GET", self._build_url(ALL_BUILDS, locals())))
+
+        if response:
+            data["builds"] = json.loads(response)["allBuilds"]
+        else:
+            raise JenkinsException("Could not fetch all builds from job[%s]" % name)
+
+        return data
+
     def create_job(self, name, config_xml):
         """Create a new Jenkins job
         :param name: Name of Jenkins job, ``str``
@@ -914,11 +2785,40 @@ class Jenkins(object):
         :param name: name of job
         :param parameters: parameters for job, or ``None``, ``dict``
         :param token: Jenkins API token
+        :returns: Number of the queue item, ``None`` if Jenkins did not report it, ``int``
         """
-        return self.jenkins_open(
+        response = self.jenkins_request(
             requests.Request("POST", self.build_job_url(name, parameters, token))
         )
 
+        match = re.search(r"/queue/item/(\d+)/?$", response.headers.get("Location", ""))
+
+        return int(match.group(1)) if match else None
+
+    def get_queue_item(self, number):
+        """Get the state of a queue item, see :meth:`Jenkins.build_job`.
+        :param number: Queue item number, ``int``
+        :returns: ``cancelled``, ``why`` and, once the build started, ``executable``, ``dict``
+        """
+        try:
+            return json.loads(
+                self.jenkins_open(requests.Request("GET", self._build_url(QUEUE_ITEM, locals())))
+            )
+        except (req_exc.HTTPError, NotFoundException):
+            raise JenkinsException("queue item[%s] does not exist" % number)
+        except ValueError:
+            raise JenkinsException("Could not parse JSON info for queue item[%s]" % number)
+
+    def track_build(self, name, queue_item=None, sink=None, timeout=None):
+        """Follow a build triggered with :meth:`Jenkins.build_job`.
+        :param name: Job name, ``str``
+        :param queue_item: Queue item number returned by :meth:`Jenkins.build_job`, ``int``
+        :param sink: Binary file-like object the build log is written to, or ``None``
+        :param timeout: Seconds to wait in total, ``None`` to wait as long as it takes
+        :returns: :class:`BuildTracker`
+        """
+        return BuildTracker(self, name, queue_item, sink, timeout=timeout)
+
     def disable_job(self, name):
         """Disable Jenkins job.
 
@@ -1128,6 +3028,8 @@ class Jenkins(object):
                 requests.Request("GET", self._build_url(GET_API_TOKEN_LIST, locals()))
             )
 
+            from bs4 import BeautifulSoup
+
             soup = BeautifulSoup(raw_tokens, "html.parser")
 
             tokens_html = soup.find_all("div", {"name": "tokenStore"})
@@ -1272,3 +3174,375 @@ class Jenkins(object):
                     data={"tokenUuid": filtered_tokens[0]["uuid"]},
                 )
             )
+
+
+def _import_aiohttp():
+    """Import the optional aiohttp package into the module namespace on first use.
+
+    :returns: True if aiohttp is available
+    """
+    global aiohttp
+
+    if aiohttp is None:
+        try:
+            import aiohttp as module
+        except ImportError:
+            return False
+
+        aiohttp = module
+
+    return True
+
+
+class RequestScheduler(object):
+    """Bound the number of in-flight requests issued from an asyncio event loop.
+
+    Every :class:`AsyncJenkins` request runs inside :meth:`slot`, so no matter how
+    many coroutines are scheduled at most ``max_concurrency`` requests are on the
+    wire at once.
+
+    :param max_concurrency: Maximum simultaneous requests, ``int``
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_ASYNC_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = None
+
+    def slot(self):
+        """Return the semaphore guarding a single request (``async with scheduler.slot():``)"""
+
+        import asyncio
+
+        # Created lazily so it binds to the loop that is actually running
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self._semaphore
+
+    async def imap_unordered(self, func, iterable):
+        """Run ``func(item)`` for every item, yielding results as they complete.
+
+        At most ``max_concurrency`` tasks exist at any time, so arbitrarily long
+        iterables (including generators) can be processed without creating a task
+        per item up front.
+
+        :param func: Coroutine function taking one item
+        :param iterable: Items to process
+        """
+
+        import asyncio
+
+        items = iter(iterable)
+        pending = set()
+
+        while True:
+            while len(pending) < self.max_concurrency:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+
+                pending.add(asyncio.ensure_future(func(item)))
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                yield task.result()
+
+
+class AsyncResponse(object):
+    """Minimal response object returned by :meth:`AsyncJenkins.jenkins_request`"""
+
+    def __init__(self, url, status_code, reason, headers, content, encoding):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(response_encoding(self), errors="replace")
+
+
+class AsyncJenkins(object):
+    """Asyncio transport for a :class:`Jenkins` instance.
+
+    URL building, authentication and crumb handling are delegated to the wrapped
+    synchronous instance (resolved once, up front); requests themselves are sent
+    through a single ``aiohttp`` session bounded by a :class:`RequestScheduler`.
+    The read-only methods mirror their :class:`Jenkins` counterparts as coroutines.
+
+    Must be used as an async context manager::
+
+        async with AsyncJenkins(server, max_concurrency=200) as async_server:
+            info = await async_server.get_job_info("my_job")
+
+    :param jenkins: Configured :class:`Jenkins` instance
+    :param max_concurrency: Maximum in-flight requests, ``int``
+    """
+
+    def __init__(self, jenkins, max_concurrency=DEFAULT_ASYNC_CONCURRENCY):
+        if not _import_aiohttp():
+            raise JenkinsException(
+                "The aiohttp package is required for the asynchronous transport."
+            )
+
+        self.jenkins = jenkins
+        self.server = jenkins.server
+        self.scheduler = RequestScheduler(max_concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, _type, value, traceback):
+        await self.close()
+
+    async def open(self):
+        """Resolve authentication and crumb synchronously, then open the aiohttp session"""
+
+        import asyncio
+
+        if self._session is not None:
+            return
+
+        loop = asyncio.get_event_loop()
+
+        # Reuse the synchronous logic (including its auth probing) exactly once
+        await loop.run_in_executor(None, self._prepare)
+
+        auth = None
+        session_auth = self.jenkins._session.auth
+
+        if isinstance(session_auth, requests.auth.HTTPBasicAuth):
+            auth = aiohttp.BasicAuth(
+                self._to_str(session_auth.username), self._to_str(session_auth.password)
+            )
+        elif session_auth is not None:
+            raise JenkinsException(
+                "The asynchronous transport only supports basic, API token and cookie authentication."
+            )
+
+        headers = dict(self.jenkins._session.headers)
+        headers.pop("Connection", None)
+
+        if self.jenkins.crumb:
+            headers[self.jenkins.crumb["crumbRequestField"]] = self.jenkins.crumb["crumb"]
+
+        timeout = self.jenkins.timeout
+
+        if not isinstance(timeout, (int, float)):
+            timeout = None
+
+        self._session = aiohttp.ClientSession(
+            headers=headers,
+            auth=auth,
+            cookies=self.jenkins._session.cookies.get_dict(),
+            connector=aiohttp.TCPConnector(limit=self.scheduler.max_concurrency, ssl=False),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            trace_configs=[self._trace_config()],
+            # Connect through the same HTTP(S)_PROXY/NO_PROXY settings requests honours
+            trust_env=True,
+        )
+
+    def _trace_config(self):
+        """aiohttp tracing that fills in the :class:`RequestRecord` passed as ``trace_request_ctx``.
+
+        aiohttp does not separate the TLS handshake from connecting, so ``tls`` stays None.
+        """
+
+        trace_config = aiohttp.TraceConfig()
+
+        def timer(name, since=None):
+            async def callback(session, context, params):
+                record = context.trace_request_ctx
+
+                if isinstance(record, RequestRecord):
+                    now = time.perf_counter()
+                    setattr(context, name, now)
+
+                    if since is not None and hasattr(context, since):
+                        setattr(record, name, now - getattr(context, since))
+
+            return callback
+
+        async def reused(session, context, params):
+            if isinstance(context.trace_request_ctx, RequestRecord):
+                context.trace_request_ctx.reused_connection = True
+
+        trace_config.on_request_start.append(timer("sent"))
+        trace_config.on_dns_resolvehost_start.append(timer("dns_start"))
+        trace_config.on_dns_resolvehost_end.append(timer("dns", "dns_start"))
+        trace_config.on_connection_create_start.append(timer("connect_start"))
+        trace_config.on_connection_create_end.append(timer("connect", "connect_start"))
+        trace_config.on_connection_reuseconn.append(reused)
+        trace_config.on_request_end.append(timer("ttfb", "sent"))
+
+        return trace_config
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _prepare(self):
+        self.jenkins._maybe_add_auth()
+        self.jenkins.maybe_add_crumb(requests.Request("GET", self.server))
+
+    def _to_str(self, value):
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def jenkins_request(self, req, add_crumb=True, resolve_auth=True):
+        """Asynchronous equivalent of :meth:`Jenkins.jenkins_request`.
+
+        Authentication and crumbs are resolved when the session is opened, so
+        ``add_crumb`` and ``resolve_auth`` are accepted only for signature parity.
+
+        :param req: A ``requests.Request`` to submit.
+        :returns: An :class:`AsyncResponse` object.
+        """
+
+        import asyncio
+
+        await self.open()
+
+        # Same infinite redirect workaround as Jenkins._request
+        allow_redirects = not req.url.endswith("consoleText")
+
+        record = None
+        result = None
+
+        if _request_hooks:
+            record = RequestRecord(req.method, req.url, url_template(self.server, req.url))
+
+        try:
+            async with self.scheduler.slot():
+                if record is not None:
+                    _run_request_hooks(0, record)
+                    start = time.perf_counter()
+
+                try:
+                    async with self._session.request(
+                        req.method,
+                        req.url,
+                        headers=req.headers or None,
+                        data=req.data or None,
+                        params=req.params or None,
+                        allow_redirects=allow_redirects,
+                        trace_request_ctx=record,
+                    ) as response:
+                        content = await response.read()
+                        result = AsyncResponse(
+                            str(response.url),
+                            response.status,
+                            response.reason,
+                            response.headers,
+                            content,
+                            response.charset,
+                        )
+                except Exception as ex:
+                    if record is not None:
+                        record.error = ex.__class__.__name__
+                    raise
+                finally:
+                    if record is not None:
+                        record.total = time.perf_counter() - start
+
+                        # Not set if the request failed or was cancelled (which is not an
+                        # Exception, so record.error may still be None)
+                        if result is not None:
+                            record.status = result.status_code
+                            record.bytes = len(result.content)
+                            record.reused_connection = bool(record.reused_connection)
+
+                        _run_request_hooks(1, record)
+        except asyncio.TimeoutError as e:
+            raise TimeoutException("Error in request: %s" % (e))
+        except aiohttp.ClientSSLError as e:
+            raise req_exc.SSLError(str(e))
+        except aiohttp.ClientConnectionError as e:
+            raise req_exc.ConnectionError(str(e))
+
+        if result.status_code in [401, 403, 500]:
+            msg = "Error in request. " + "Possibly authentication failed [%s]: %s" % (
+                result.status_code,
+                result.reason,
+            )
+            if result.content:
+                msg += "\n" + result.text
+            raise JenkinsException(msg)
+        elif result.status_code == 404:
+            raise NotFoundException("Requested item could not be found")
+        elif result.status_code >= 400:
+            raise BadHTTPException(
+                "Error communicating with server[%s]: %s" % (self.server, result.status_code)
+            )
+
+        return result
+
+    async def jenkins_open(self, req, add_crumb=True, resolve_auth=True):
+        """Return the HTTP response body from a ``requests.Request``.
+
+        :returns: ``str``
+        """
+        return (await self.jenkins_request(req, add_crumb, resolve_auth)).text
+
+    async def get_job_info(self, name, depth=0, fields=None):
+        """Asynchronous equivalent of :meth:`Jenkins.get_job_info`"""
+
+        folder_url, short_name = self.jenkins._get_job_folder(name)
+        try:
+            response = await self.jenkins_open(
+                requests.Request(
+                    "GET", self.jenkins._info_url(JOB_INFO, JOB_INFO_TREE, locals(), fields)
+                )
+            )
+            if response:
+                return json.loads(response)
+            else:
+                raise JenkinsException("job[%s] does not exist" % name)
+        except (BadHTTPException, NotFoundException):
+            raise JenkinsException("job[%s] does not exist" % name)
+        except ValueError:
+            raise JenkinsException("Could not parse JSON info for job[%s]" % name)
+
+    async def get_build_info(self, name, number, depth=0, fields=None):
+        """Asynchronous equivalent of :meth:`Jenkins.get_build_info`"""
+
+        folder_url, short_name = self.jenkins._get_job_folder(name)
+        try:
+            response = await self.jenkins_open(
+                requests.Request(
+                    "GET", self.jenkins._info_url(BUILD_INFO, BUILD_INFO_TREE, locals(), fields)
+                )
+            )
+            if response:
+                return json.loads(response)
+            else:
+                raise JenkinsException("job[%s] number[%s] does not exist" % (name, number))
+        except BadHTTPException:
+            raise JenkinsException("job[%s] number[%s] does not exist" % (name, number))
+        except ValueError:
+            raise JenkinsException(
+                "Could not parse JSON info for job[%s] number[%s]" % (name, number)
+            )
+
+    async def get_build_console_output(self, folder_url, number):
+        """Asynchronous equivalent of :meth:`Jenkins.get_build_console_output`"""
+
+        try:
+            response = await self.jenkins_open(
+                requests.Request("GET", self.jenkins._build_url(BUILD_CONSOLE_OUTPUT, locals()))
+            )
+            if response:
+                return response
+            else:
+                raise JenkinsException("job[%s] number[%s] does not exist" % (folder_url, number))
+        except (BadHTTPException, NotFoundException):
+            raise JenkinsException("job[%s] number[%s] does not exist" % (folder_url, number))
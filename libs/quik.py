@@ -4,9 +4,13 @@
 # from https://raw.githubusercontent.com/avelino/quik/master/quik.py
 # Modified by Shelby Spencer
 
+import hashlib
 import operator
 import os
+import pickle
 import re
+import tempfile
+import threading
 from io import StringIO
 
 VERSION = (0, 2, 3)
@@ -81,10 +85,76 @@ class NullLoader:
         raise self.load_text(name)
 
 
+# Compiled templates shared by every FileLoader in the process:
+# {absolute path: (template, mtime)}
+_compiled_templates = {}
+_compiled_templates_lock = threading.Lock()
+
+# Directory compiled templates are also pickled to, see configure_compiled_cache()
+_compiled_cache_dir = None
+
+
+def configure_compiled_cache(directory):
+    """Also store compiled templates as pickles in directory, so later processes skip parsing
+
+    Pickles are named after the template path, its modification time and the quik version,
+    so editing a template or upgrading quik never loads a stale compilation. The directory
+    must only be writable by trusted users, as loading a pickle can execute code.
+    Pass None to disable.
+    """
+
+    global _compiled_cache_dir
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    _compiled_cache_dir = directory
+
+
+def _compiled_cache_file(filename, mtime):
+    key = "{0}\0{1!r}\0{2}".format(filename, mtime, __version__)
+    return os.path.join(
+        _compiled_cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".pickle"
+    )
+
+
+def _load_compiled(filename, mtime):
+    if not _compiled_cache_dir:
+        return None
+
+    try:
+        with open(_compiled_cache_file(filename, mtime), "rb") as f:
+            template = pickle.load(f)
+    except Exception:
+        # Missing, truncated or written by an incompatible version: just parse again
+        return None
+
+    return template if isinstance(template, Template) else None
+
+
+def _store_compiled(filename, mtime, template):
+    if not _compiled_cache_dir:
+        return
+
+    try:
+        fd, temp_name = tempfile.mkstemp(dir=_compiled_cache_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(template, f, pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temp_name, _compiled_cache_file(filename, mtime))
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+    except (OSError, pickle.PicklingError, RecursionError):
+        # The on-disk cache is only an optimisation
+        pass
+
+
 class FileLoader:
     def __init__(self, basedir, debugging=False):
         self.basedir = basedir
-        self.known_templates = {}
         self.debugging = debugging
         if debugging:
             print("creating caching file loader with basedir: {0}".format(basedir))
@@ -105,18 +175,34 @@ class FileLoader:
         if self.debugging:
             print("Loading template... {0}".format(name))
 
-        mtime = os.path.getmtime(self.filename_of(name))
-        if self.known_templates.get(name, None):
-            template, prev_mtime = self.known_templates[name]
+        filename = os.path.abspath(self.filename_of(name))
+        mtime = os.path.getmtime(filename)
+
+        with _compiled_templates_lock:
+            cached = _compiled_templates.get(filename)
+
+        if cached:
+            template, prev_mtime = cached
             if mtime <= prev_mtime:
                 if self.debugging:
                     print("loading parsed template from cache")
                 return template
-        if self.debugging:
-            print("loading text from disk")
-        template = Template(self.load_text(name))
-        template.ensure_compiled()
-        self.known_templates[name] = (template, mtime)
+
+        template = _load_compiled(filename, mtime)
+
+        if template is not None:
+            if self.debugging:
+                print("loading compiled template from disk")
+        else:
+            if self.debugging:
+                print("loading text from disk")
+            template = Template(self.load_text(name))
+            template.ensure_compiled()
+            _store_compiled(filename, mtime, template)
+
+        with _compiled_templates_lock:
+            _compiled_templates[filename] = (template, mtime)
+
         return template
 
 
@@ -590,6 +676,15 @@ def boolean_value(variable_value):
     return not (variable_value is None)
 
 
+# Module level functions rather than lambdas, so that compiled templates can be pickled
+def logical_or(a, b):
+    return boolean_value(a) or boolean_value(b)
+
+
+def logical_and(a, b):
+    return boolean_value(a) and boolean_value(b)
+
+
 class BinaryOperator(_Element):
 
     BINARY_OP = re.compile(r"\s*(>=|<=|<|==|!=|>|%|\|\||&&|or|and|\+|\-|\*|\/|\%)\s*(.*)$", re.S)
@@ -612,13 +707,13 @@ class BinaryOperator(_Element):
         "==": operator.eq,
         "!=": operator.ne,
         "%": operator.mod,
-        "||": lambda a, b: boolean_value(a) or boolean_value(b),
-        "&&": lambda a, b: boolean_value(a) and boolean_value(b),
-        "or": lambda a, b: boolean_value(a) or boolean_value(b),
-        "and": lambda a, b: boolean_value(a) and boolean_value(b),
+        "||": logical_or,
+        "&&": logical_and,
+        "or": logical_or,
+        "and": logical_and,
         "+": operator.add,
         "-": operator.sub,
-        "/": lambda a, b: a / b,
+        "/": operator.truediv,
         "*": operator.mul,
     }
     PRECEDENCE = {
@@ -0,0 +1,55 @@
+import unittest
+
+from libs.JAF.plugin_UploadFile import MIN_CHUNK_SIZE, _ChunkSizer
+
+
+class ChunkSizerTest(unittest.TestCase):
+    def _run(self, sizer, server_limit, chunks, seconds=0.1):
+        """Send chunks through sizer to a server rejecting anything over server_limit"""
+
+        failures = 0
+        sizes = []
+
+        for _ in range(chunks):
+            size = sizer.next_size()
+            sizes.append(size)
+
+            if size > server_limit:
+                failures += 1
+                sizer.failed(size)
+            else:
+                sizer.succeeded(size, seconds)
+
+        return failures, sizes
+
+    def test_form_size_limit_is_not_probed_repeatedly(self):
+        failures, sizes = self._run(_ChunkSizer(128 * 1024), server_limit=60000, chunks=200)
+
+        self.assertLessEqual(failures, 2)
+
+        # Sizes settle close to the limit rather than collapsing
+        self.assertGreater(min(sizes[-100:]), 60000 // 2)
+
+    def test_limit_below_initial_size(self):
+        failures, sizes = self._run(_ChunkSizer(128 * 1024), server_limit=10000, chunks=200)
+
+        self.assertLessEqual(failures, 4)
+        self.assertTrue(all(size <= 10000 for size in sizes[-100:]))
+
+    def test_sizes_grow_without_failures(self):
+        failures, sizes = self._run(_ChunkSizer(128 * 1024), server_limit=10**9, chunks=10)
+
+        self.assertEqual(failures, 0)
+        self.assertEqual(sizes[-1], 128 * 1024)
+
+    def test_slow_requests_shrink_chunks(self):
+        sizer = _ChunkSizer(128 * 1024)
+
+        for _ in range(10):
+            sizer.succeeded(sizer.next_size(), 60.0)
+
+        self.assertEqual(sizer.next_size(), MIN_CHUNK_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
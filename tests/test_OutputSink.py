@@ -0,0 +1,212 @@
+import gzip
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from libs.JAF.OutputSink import BUFFER_SIZE, OutputSink, ReorderBuffer, open_output_file
+
+
+class _FailingStream(io.RawIOBase):
+    def writable(self):
+        return True
+
+    def write(self, data):
+        raise OSError("No space left on device")
+
+
+def _spooled(data):
+    spool = tempfile.SpooledTemporaryFile(max_size=16)
+    spool.write(data)
+    spool.seek(0)
+
+    return spool
+
+
+class OutputSinkTest(unittest.TestCase):
+    def test_writes_and_records_keep_their_order(self):
+        stream = io.BytesIO()
+        sink = OutputSink(stream)
+        expected = []
+
+        for i in range(2000):
+            if i % 3:
+                sink.write("line %d\n" % i)
+                expected.append(b"line %d\n" % i)
+            else:
+                data = b"%d" % i * (BUFFER_SIZE // 1000)
+                sink.write_record(["record %d\n" % i, _spooled(data), None, b"\n"])
+                expected.append(b"record %d\n%s\n" % (i, data))
+
+        sink.close()
+
+        self.assertEqual(stream.getvalue(), b"".join(expected))
+        self.assertFalse(stream.closed)
+
+    def test_spooled_files_are_closed_once_copied(self):
+        sink = OutputSink(io.BytesIO())
+        spool = _spooled(b"x" * 100)
+
+        sink.write_record([spool])
+        sink.flush()
+
+        self.assertTrue(spool.closed)
+        sink.close()
+
+    def test_binary_writes_share_the_order(self):
+        stream = io.BytesIO()
+        sink = OutputSink(stream)
+
+        sink.write("text ")
+        sink.buffer.write(b"bytes ")
+        sink.write("text")
+        sink.close()
+
+        self.assertEqual(stream.getvalue(), b"text bytes text")
+
+    def test_gzip_output_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "output.txt.gz")
+            sink = open_output_file(path)
+
+            sink.write("café\n" * 1000)
+            sink.write_record([_spooled(b"spooled\n")])
+            sink.close()
+
+            with gzip.open(path, "rb") as f:
+                self.assertEqual(f.read(), "café\n".encode("utf-8") * 1000 + b"spooled\n")
+
+    def test_text_stream_in_memory_is_written_right_away(self):
+        stream = io.StringIO()
+        sink = OutputSink(stream)
+
+        sink.write("café ")
+        sink.write_record([b"caf\xc3", _spooled(b"\xa9\n")])
+
+        self.assertEqual(stream.getvalue(), "café café\n")
+        sink.close()
+
+    def test_writer_error_is_raised_by_flush(self):
+        sink = OutputSink(_FailingStream())
+        sink.write("lost")
+
+        with self.assertRaisesRegex(OSError, "No space left"):
+            sink.flush()
+
+        sink.close()
+
+    def test_writer_error_is_raised_by_close(self):
+        sink = OutputSink(_FailingStream())
+        sink.write_record([_spooled(b"lost")])
+
+        with self.assertRaisesRegex(OSError, "No space left"):
+            sink.close()
+
+    def test_writer_error_is_raised_by_later_writes(self):
+        sink = OutputSink(_FailingStream())
+        spool = _spooled(b"lost")
+        sink.write_record([spool])
+
+        # The writer thread closes the spooled file once it gave up on it
+        while not spool.closed:
+            time.sleep(0.01)
+
+        with self.assertRaisesRegex(OSError, "No space left"):
+            sink.write("more")
+
+        sink.close()
+
+
+class ReorderBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.BytesIO()
+        self.sink = OutputSink(self.stream)
+        self.addCleanup(self.sink.close)
+
+    def _written(self):
+        self.sink.flush()
+
+        return self.stream.getvalue()
+
+    def _reserve_in_thread(self, reorder_buffer):
+        tickets = []
+        thread = threading.Thread(target=lambda: tickets.append(reorder_buffer.reserve()))
+        thread.daemon = True
+        thread.start()
+        thread.join(5 * ReorderBuffer.POLL_INTERVAL)
+
+        return thread, tickets
+
+    def test_records_are_written_in_ticket_order(self):
+        reorder_buffer = self.sink.reorder_buffer(4)
+        tickets = [reorder_buffer.reserve() for _ in range(4)]
+
+        for ticket in (2, 3, 1):
+            reorder_buffer.write_record(tickets[ticket], ["%d\n" % ticket])
+
+        self.assertEqual(self._written(), b"")
+
+        reorder_buffer.write_record(tickets[0], ["0\n"])
+
+        self.assertEqual(self._written(), b"0\n1\n2\n3\n")
+
+    def test_reserve_waits_for_the_window(self):
+        reorder_buffer = self.sink.reorder_buffer(2)
+        first = reorder_buffer.reserve()
+        reorder_buffer.reserve()
+
+        thread, tickets = self._reserve_in_thread(reorder_buffer)
+        self.assertTrue(thread.is_alive())
+
+        reorder_buffer.write_record(first, [b"first\n"])
+        thread.join(5)
+
+        self.assertEqual(tickets, [2])
+
+    def test_record_without_output_releases_its_ticket(self):
+        reorder_buffer = self.sink.reorder_buffer(2)
+        first, second = reorder_buffer.reserve(), reorder_buffer.reserve()
+
+        reorder_buffer.write_record(first, None)
+        reorder_buffer.write_record(second, ["second\n"])
+
+        for ticket in (2, 3):
+            thread, tickets = self._reserve_in_thread(reorder_buffer)
+            self.assertEqual(tickets, [ticket])
+
+        self.assertEqual(self._written(), b"second\n")
+
+    def test_close_stops_waiting_reserve_calls(self):
+        reorder_buffer = self.sink.reorder_buffer(1)
+        reorder_buffer.reserve()
+        errors = []
+
+        def reserve():
+            try:
+                reorder_buffer.reserve()
+            except RuntimeError as ex:
+                errors.append(ex)
+
+        thread = threading.Thread(target=reserve)
+        thread.start()
+        self.sink.close()
+        thread.join(5)
+
+        self.assertEqual(len(errors), 1)
+
+    def test_close_closes_held_back_files(self):
+        reorder_buffer = self.sink.reorder_buffer(2)
+        reorder_buffer.reserve()
+        spool = _spooled(b"held back")
+
+        reorder_buffer.write_record(reorder_buffer.reserve(), [spool])
+        self.sink.close()
+
+        self.assertTrue(spool.closed)
+        self.assertEqual(self.stream.getvalue(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+from benchmarks.mock_jenkins import MockJenkins, MockJenkinsConfig
+from libs.JAF import JAFError, iter_plugin, run_plugin
+from libs.JAF.BasePlugin import CommandContext, at_command_exit
+
+
+class RunPluginOptionsTest(unittest.TestCase):
+    def test_invalid_options_raise_with_the_message(self):
+        streams = sys.stdout, sys.stderr
+
+        with self.assertRaisesRegex(JAFError, "^Specified Server is not a valid URL.$"):
+            run_plugin("ListJobs", server="not a url")
+
+        with self.assertRaisesRegex(JAFError, "invalid int value"):
+            run_plugin("ListJobs", server="http://jenkins/", thread_number="many")
+
+        with self.assertRaisesRegex(JAFError, "unrecognized options: colour"):
+            run_plugin("ListJobs", server="http://jenkins/", colour=True)
+
+        self.assertEqual((sys.stdout, sys.stderr), streams)
+
+    def test_unknown_command(self):
+        with self.assertRaisesRegex(JAFError, "Unknown command"):
+            run_plugin("NoSuchCommand")
+
+
+class CommandContextTest(unittest.TestCase):
+    def test_handlers_belong_to_the_context_of_their_thread(self):
+        calls = []
+        registered = threading.Barrier(2)
+
+        def run(name):
+            context = CommandContext()
+
+            with context:
+                at_command_exit(lambda: calls.append(name))
+                registered.wait()
+
+                if name == "first":
+                    context.run_exit_handlers()
+                    self.assertEqual(calls, ["first"])
+
+                registered.wait()
+
+            context.run_exit_handlers()
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in ("first", "second")]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(calls), ["first", "second"])
+
+
+class ConcurrentRunsTest(unittest.TestCase):
+    def test_concurrent_runs_keep_their_results_and_cleanup_apart(self):
+        config = MockJenkinsConfig(jobs=20, folders=2, folder_depth=2, latency=0.002)
+
+        with tempfile.TemporaryDirectory() as directory, MockJenkins(config) as server:
+            options = {"server": server.url, "credential": "user:password"}
+            expected = run_plugin("ListJobs", options)
+            results = {}
+
+            def run(index):
+                # Every run writes a trace file, which its own exit handler closes
+                trace_file = os.path.join(directory, "%d.jsonl" % index)
+                results[index] = list(iter_plugin("ListJobs", options, trace_file=trace_file))
+
+            threads = [threading.Thread(target=run, args=(index,)) for index in range(4)]
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            for index in range(4):
+                self.assertEqual(results[index], expected)
+
+                with open(os.path.join(directory, "%d.jsonl" % index)) as f:
+                    self.assertTrue(f.read().endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.mock_jenkins import MockJenkins
+from libs.JAF import run_plugin
+
+
+class RunScriptBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        for name in ("first.groovy", "second.groovy"):
+            with open(os.path.join(self.directory.name, name), "w") as f:
+                f.write("println '%s'\n" % name)
+
+        self.batch_file = os.path.join(self.directory.name, "batch.txt")
+
+        with open(self.batch_file, "w") as f:
+            f.write(
+                "first.groovy\n# skipped\n\n%s\n"
+                % os.path.join(self.directory.name, "second.groovy")
+            )
+
+    def test_relative_paths_are_relative_to_the_batch_file(self):
+        """Scripts listed in a batch file are found wherever jaf.py is run from"""
+
+        self.assertNotEqual(os.getcwd(), self.directory.name)
+
+        with MockJenkins() as server:
+            results = run_plugin(
+                "RunScript",
+                server=server.url,
+                credential="user:password",
+                batch_file=self.batch_file,
+            )
+
+        self.assertEqual(
+            [result["name"] for result in results],
+            ["first.groovy", os.path.join(self.directory.name, "second.groovy")],
+        )
+        self.assertFalse(any(result["error"] for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
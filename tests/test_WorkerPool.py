@@ -0,0 +1,129 @@
+import itertools
+import threading
+import time
+import unittest
+
+from libs.JAF.BasePlugin import TaskTimeoutError, WorkerPool
+
+
+class _Items:
+    """Counts how many items the pool has taken from it"""
+
+    def __init__(self, count=None):
+        self.taken = 0
+        self._numbers = range(count) if count is not None else itertools.count()
+
+    def __iter__(self):
+        for number in self._numbers:
+            self.taken += 1
+            yield number
+
+
+def _settle():
+    """Give the feeding thread and the workers time to get as far as they can"""
+
+    time.sleep(10 * WorkerPool.POLL_INTERVAL)
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def test_every_item_is_processed_once(self):
+        pool = WorkerPool(lambda number: number * 2, workers=4)
+
+        results = list(pool.map_unordered(range(100)))
+
+        self.assertEqual(sorted(results), [(number, number * 2) for number in range(100)])
+        self.assertEqual(pool.stats()["completed"], 100)
+        self.assertEqual(pool.stats()["submitted"], 100)
+
+    def test_items_are_not_taken_ahead_of_busy_workers(self):
+        items = _Items(1000)
+        pool = WorkerPool(lambda number: self.release.wait(), workers=2, queue_size=3)
+        results = []
+
+        consumer = threading.Thread(target=results.extend, args=(pool.map_unordered(items),))
+        consumer.start()
+        _settle()
+
+        # Two items being worked on, three queued and one waiting to be queued
+        self.assertLessEqual(items.taken, 2 + 3 + 1)
+
+        self.release.set()
+        consumer.join()
+        self.assertEqual(len(results), 1000)
+
+    def test_results_not_taken_by_the_caller_hold_up_the_workers(self):
+        items = _Items(1000)
+        pool = WorkerPool(lambda number: number, workers=2, queue_size=3)
+        results = pool.map_unordered(items)
+
+        next(results)
+        _settle()
+
+        # Results and tasks queued, one waiting on each side and one per worker
+        self.assertLessEqual(items.taken, 1 + 3 + 3 + 1 + 1 + 2)
+
+        self.assertEqual(len(list(results)), 999)
+
+    def test_slow_task_times_out(self):
+        def func(number):
+            if number == 0:
+                self.release.wait()
+
+            return number
+
+        pool = WorkerPool(func, workers=2, task_timeout=0.3)
+
+        results = dict(pool.map_unordered(range(10)))
+
+        self.assertIsInstance(results.pop(0), TaskTimeoutError)
+        self.assertEqual(results, {number: number for number in range(1, 10)})
+        self.assertEqual(pool.stats()["timed_out"], 1)
+
+    def test_task_error_is_raised(self):
+        def func(number):
+            if number == 5:
+                raise ValueError(number)
+
+            return number
+
+        with self.assertRaises(ValueError):
+            list(WorkerPool(func, workers=3).map_unordered(range(100)))
+
+    def test_system_exit_in_a_task_is_raised(self):
+        def func(number):
+            exit(3)
+
+        with self.assertRaises(SystemExit) as raised:
+            list(WorkerPool(func, workers=2).map_unordered(range(10)))
+
+        self.assertEqual(raised.exception.code, 3)
+
+    def test_error_while_producing_items_is_raised(self):
+        def items():
+            yield 1
+            raise KeyError("items")
+
+        with self.assertRaises(KeyError):
+            list(WorkerPool(lambda number: number, workers=2).map_unordered(items()))
+
+    def test_closing_the_results_early_stops_feeding(self):
+        items = _Items()
+        results = WorkerPool(lambda number: number, workers=2).map_unordered(items)
+
+        for _ in range(3):
+            next(results)
+
+        results.close()
+        _settle()
+        taken = items.taken
+        _settle()
+
+        self.assertEqual(items.taken, taken)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,423 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from benchmarks.mock_jenkins import MockJenkins, MockJenkinsConfig
+from libs import jenkinslib
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers POSTs with the status and body the test set on the server, counting requests"""
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+
+        if self.path.startswith("/" + jenkinslib.CRUMB_URL):
+            self._reply(200, json.dumps({"crumb": "abc", "crumbRequestField": "Jenkins-Crumb"}))
+        else:
+            time.sleep(self.server.get_delay)
+            self._reply(*self.server.get_reply)
+
+    def do_POST(self):
+        self.server.requests.append(("POST", self.path))
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply(*self.server.post_reply)
+
+    def _reply(self, status, body):
+        body = body.encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html;charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ScriptedServer:
+    def __init__(self, post_reply=(200, "")):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+        self.httpd.requests = []
+        self.httpd.post_reply = post_reply
+        self.httpd.get_reply = (200, "{}")
+        self.httpd.get_delay = 0
+        self.url = "http://127.0.0.1:%d/" % self.httpd.server_address[1]
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _pieces(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TreeQueryTest(unittest.TestCase):
+    def test_nested_projection(self):
+        self.assertEqual(
+            jenkinslib.tree_query(["number", {"builds": ["number", {"actions": ["causes"]}]}]),
+            "number,builds[number,actions[causes]]",
+        )
+
+    def test_plain_tree_syntax_is_passed_through(self):
+        self.assertEqual(
+            jenkinslib.tree_query(["name", "builds[number]{0,10}"]), "name,builds[number]{0,10}"
+        )
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    document = {
+        "_class": "hudson.model.Hudson",
+        "before": {"jobs": ["not", "these"], "text": "a ] , [ { \\"},
+        "jobs": [
+            {"name": "caf\u00e9 \u2603", "url": "http://jenkins/job/1/", "jobs": [{}, {}]},
+            {"name": "two", "color": None, "builds": [1, 2.5, True, "x]"]},
+            [],
+            "three",
+        ],
+        "after": 1,
+    }
+
+    def _parse(self, chunk_size, indent=None, key="jobs"):
+        data = json.dumps(self.document, indent=indent).encode("utf-8")
+
+        return list(jenkinslib.iter_json_array(_pieces(data, chunk_size), key))
+
+    def test_items_match_json_loads_for_any_chunk_size(self):
+        for chunk_size in (1, 2, 3, 7, 64, 10**6):
+            for indent in (None, 2):
+                self.assertEqual(self._parse(chunk_size, indent), self.document["jobs"])
+
+    def test_missing_key_yields_nothing(self):
+        self.assertEqual(self._parse(5, key="views"), [])
+
+    def test_empty_array(self):
+        self.assertEqual(list(jenkinslib.iter_json_array([b'{"jobs": [ ]}'], "jobs")), [])
+
+    def test_invalid_json_raises(self):
+        for data in (b'{"jobs": [1, 2', b'{"jobs": [1 2]}', b"[1, 2]", b'{"jobs": [1,]}'):
+            with self.assertRaises(ValueError, msg=data):
+                list(jenkinslib.iter_json_array(_pieces(data, 3), "jobs"))
+
+    def test_items_are_generated_before_the_end_of_the_data(self):
+        def chunks():
+            yield b'{"jobs": [{"name": "first"}, '
+            raise AssertionError("read past the first item")
+
+        items = jenkinslib.iter_json_array(chunks(), "jobs")
+
+        self.assertEqual(next(items), {"name": "first"})
+
+
+class _Response:
+    def __init__(self, body, headers=None):
+        self.content = body
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_stored_entry_is_looked_up_per_identity(self):
+        cache = jenkinslib.ResponseCache(self.directory.name)
+        cache.store("alice", "http://jenkins/api/json", _Response(b"body", {"ETag": '"1"'}))
+
+        meta = cache.lookup("alice", "http://jenkins/api/json")
+
+        self.assertEqual(cache.load_body(meta), b"body")
+        self.assertEqual(meta["headers"]["ETag"], '"1"')
+        self.assertIsNone(cache.lookup("bob", "http://jenkins/api/json"))
+
+    def test_response_without_validators_is_not_stored(self):
+        cache = jenkinslib.ResponseCache(self.directory.name)
+        cache.store("alice", "http://jenkins/api/json", _Response(b"body"))
+
+        self.assertIsNone(cache.lookup("alice", "http://jenkins/api/json"))
+
+    def test_freshness(self):
+        cache = jenkinslib.ResponseCache(self.directory.name)
+        cache.store("alice", "http://jenkins/log", _Response(b"log"), immutable=True)
+        cache.store("alice", "http://jenkins/api/json", _Response(b"{}", {"ETag": '"1"'}))
+
+        self.assertTrue(cache.is_fresh(cache.lookup("alice", "http://jenkins/log")))
+        self.assertFalse(cache.is_fresh(cache.lookup("alice", "http://jenkins/api/json")))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = jenkinslib.ResponseCache(self.directory.name, max_size=4000)
+
+        for i in range(10):
+            url = "http://jenkins/%d" % i
+            cache.store("alice", url, _Response(b"x" * 900), immutable=True)
+
+            # mtime is the LRU clock, make the order unambiguous
+            os.utime(cache.lookup("alice", url)["_path"], (i, i))
+
+        self.assertIsNone(cache.lookup("alice", "http://jenkins/0"))
+        self.assertIsNotNone(cache.lookup("alice", "http://jenkins/9"))
+
+        total = sum(entry.stat().st_size for entry in os.scandir(self.directory.name))
+        self.assertLessEqual(total, 4000)
+
+
+class SessionMemoTest(unittest.TestCase):
+    def test_value_is_computed_once(self):
+        memo = jenkinslib.SessionMemo()
+        calls = []
+
+        for _ in range(3):
+            value = memo.get(("server", "id", "crumb"), lambda: calls.append(1) or "value")
+
+        self.assertEqual(value, "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_none_is_not_memoized(self):
+        memo = jenkinslib.SessionMemo()
+        calls = []
+
+        memo.get(("server", "id", "crumb"), lambda: calls.append(1))
+        memo.get(("server", "id", "crumb"), lambda: calls.append(1))
+
+        self.assertEqual(len(calls), 2)
+
+    def test_expired_value_is_recomputed(self):
+        memo = jenkinslib.SessionMemo(ttl=-1)
+
+        memo.get(("server", "id", "crumb"), lambda: "old")
+
+        self.assertEqual(memo.get(("server", "id", "crumb"), lambda: "new"), "new")
+
+    def test_invalidate_only_forgets_one_identity(self):
+        memo = jenkinslib.SessionMemo()
+        memo.get(("server", "a", "crumb"), lambda: "a")
+        memo.get(("server", "b", "crumb"), lambda: "b")
+
+        memo.invalidate("server", "a")
+
+        self.assertEqual(memo.get(("server", "a", "crumb"), lambda: "a2"), "a2")
+        self.assertEqual(memo.get(("server", "b", "crumb"), lambda: "b2"), "b")
+
+
+class SplitBatchOutputTest(unittest.TestCase):
+    marker = "JAF-BATCH-0123"
+
+    def _split(self, output, count):
+        jenkins = jenkinslib.Jenkins("http://127.0.0.1:1/", timeout=1)
+
+        return jenkins._split_batch_output(output, self.marker, count)
+
+    def test_outputs_are_split_per_script(self):
+        output = (
+            "{0} begin 0\nfirst\n{0} end 0 ok 1500000\n"
+            "{0} begin 1\r\nsecond\r\n{0} end 1 error 2000000\r\n"
+        ).format(self.marker)
+
+        first, second = self._split(output, 2)
+
+        self.assertEqual(first, {"output": "first", "error": False, "seconds": 0.0015})
+        self.assertEqual(second, {"output": "second", "error": True, "seconds": 0.002})
+
+    def test_unfinished_script_keeps_its_output(self):
+        output = "{0} begin 0\n{0} end 0 ok 0\n{0} begin 1\npartial".format(self.marker)
+
+        first, second, third = self._split(output, 3)
+
+        self.assertEqual(second, {"output": "partial", "error": False, "seconds": None})
+        self.assertEqual(third, {"output": "", "error": False, "seconds": None})
+
+    def test_no_output(self):
+        self.assertEqual(self._split(None, 1), [{"output": "", "error": False, "seconds": None}])
+
+
+class GetAllJobsTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore", ResourceWarning)
+
+    def test_order_does_not_depend_on_concurrent_requests(self):
+        config = MockJenkinsConfig(jobs=5, folders=3, folder_depth=3, latency=0.001)
+
+        with MockJenkins(config) as server:
+            jenkins = jenkinslib.Jenkins(server.url, timeout=5)
+
+            # One request for the whole tree, against one per folder on eight threads
+            expected = [job["fullname"] for job in jenkins.get_all_jobs(workers=1)]
+            jobs = jenkins.get_all_jobs(folder_depth_per_request=1, workers=8)
+
+        self.assertEqual([job["fullname"] for job in jobs], expected)
+
+        depths = [job["fullname"].count("/") for job in jobs]
+        self.assertEqual(depths, sorted(depths))
+
+
+class IterAllJobsErrorTest(unittest.TestCase):
+    def _iter_all_jobs(self, iter_info_items):
+        jenkins = jenkinslib.Jenkins("http://127.0.0.1:1/", timeout=1)
+        jenkins._iter_info_items = iter_info_items
+        errors = []
+
+        def run():
+            try:
+                list(jenkins.iter_all_jobs())
+            except Exception as ex:
+                errors.append(ex)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive(), "iter_all_jobs did not return")
+
+        return errors
+
+    def test_invalid_entry_is_raised(self):
+        def iter_info_items(url_path, key, tree):
+            yield {"url": "http://127.0.0.1:1/job/nameless/"}
+
+        errors = self._iter_all_jobs(iter_info_items)
+
+        self.assertEqual([type(error) for error in errors], [KeyError])
+
+    def test_error_escaping_the_worker_is_raised(self):
+        def iter_info_items(url_path, key, tree):
+            raise RuntimeError("not a generator")
+
+        errors = self._iter_all_jobs(iter_info_items)
+
+        self.assertEqual([type(error) for error in errors], [RuntimeError])
+
+
+class RootPageMemoTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore", ResourceWarning)
+        jenkinslib._session_memo.clear()
+
+    def _check(self, server):
+        jenkins = jenkinslib.Jenkins(server.url, authheader="Basic dXNlcjp0b2tlbg==", timeout=5)
+
+        return jenkins.basic_access_check()
+
+    def _root_requests(self, server):
+        return len([request for request in server.requests if request == ("GET", "/")])
+
+    def test_failed_fetch_is_retried_and_success_is_memoized(self):
+        with ScriptedServer() as server:
+            server.httpd.get_reply = (401, "Unauthorized")
+            self.assertEqual(self._check(server), 401)
+
+            server.httpd.get_reply = (503, "Service Unavailable")
+            self.assertEqual(self._check(server), 500)
+
+            server.httpd.get_reply = (200, "<title>Dashboard [Jenkins]</title>")
+            self.assertEqual(self._check(server), 200)
+            requests_made = self._root_requests(server)
+
+            self.assertEqual(self._check(server), 200)
+
+        self.assertEqual(self._root_requests(server), requests_made)
+
+
+class AsyncJenkinsTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore", ResourceWarning)
+        jenkinslib._session_memo.clear()
+
+    def _open(self, server_url, url, cancel_after=None):
+        async def request():
+            jenkins = jenkinslib.Jenkins(server_url, timeout=5)
+
+            async with jenkinslib.AsyncJenkins(jenkins) as async_server:
+                task = asyncio.ensure_future(
+                    async_server.jenkins_open(requests.Request("GET", url))
+                )
+
+                if cancel_after is not None:
+                    await asyncio.sleep(cancel_after)
+                    task.cancel()
+
+                return await task
+
+        return asyncio.new_event_loop().run_until_complete(request())
+
+    def test_requests_go_through_the_configured_proxy(self):
+        with ScriptedServer() as proxy:
+            environment = {"HTTP_PROXY": proxy.url, "NO_PROXY": "", "no_proxy": ""}
+
+            with mock.patch.dict(os.environ, environment):
+                self.assertEqual(
+                    self._open("http://jenkins.invalid/", "http://jenkins.invalid/api/json"),
+                    "{}",
+                )
+
+        self.assertIn(("GET", "http://jenkins.invalid/api/json"), proxy.requests)
+
+    def test_cancelled_request_stays_cancelled_when_timed(self):
+        records = []
+        hook = jenkinslib.add_request_hook(post=records.append)
+        self.addCleanup(jenkinslib.remove_request_hook, hook)
+
+        with ScriptedServer() as server:
+            server.httpd.get_delay = 1
+
+            with self.assertRaises(asyncio.CancelledError):
+                self._open(server.url, server.url + "slow", cancel_after=0.2)
+
+        self.assertEqual(
+            [record.status for record in records if record.url.endswith("slow")], [None]
+        )
+
+
+class CrumbRetryTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore", ResourceWarning)
+        jenkinslib._session_memo.clear()
+
+    def _post(self, server):
+        jenkins = jenkinslib.Jenkins(server.url, authheader="Basic dXNlcjp0b2tlbg==", timeout=5)
+
+        with self.assertRaises(jenkinslib.JenkinsException):
+            jenkins.jenkins_open(requests.Request("POST", server.url + "scriptText"))
+
+    def _count(self, server, method):
+        return len([request for request in server.requests if request[0] == method])
+
+    def test_crumb_rejection_is_retried_with_a_new_crumb(self):
+        with ScriptedServer((403, "No valid crumb was included in the request")) as server:
+            self._post(server)
+
+        self.assertEqual(self._count(server, "POST"), 2)
+        self.assertEqual(self._count(server, "GET"), 2)
+
+    def test_access_denied_is_not_retried(self):
+        with ScriptedServer((403, "user is missing the Overall/Administer permission")) as server:
+            self._post(server)
+            self._post(server)
+
+        self.assertEqual(self._count(server, "POST"), 2)
+
+        # The memoized crumb survives the denial
+        self.assertEqual(self._count(server, "GET"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()